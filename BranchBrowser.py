@@ -1,13 +1,19 @@
 import base64
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 from enum import Enum
+import gc
+import hashlib
 from io import StringIO
 import json
 import os
+import queue
 import re
 import sys
 import threading
 import tkinter as tk
+from urllib.parse import parse_qs, quote, urlparse
 from tkinter import BOTTOM, RIGHT, X, Y, Scrollbar, font
 from tkinter import messagebox
 import tkinter.ttk as ttk
@@ -17,100 +23,379 @@ import configparser
 import requests
 import win32cred
 from handlers.exceptions_handler import ExceptionsHandler
-from message_type import MessageType
+from message_type import MessageType, print_message
 import subprocess
 from delete_with_submodules_dialog import DeleteWithSubmodulesDialog
+from async_transport import DEFAULT_MAX_CONCURRENCY, configure_async_transport, get_async_transport
+from github_transport import (DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_READ_TIMEOUT,
+                              configure_transport, get_transport, install_pygithub_transport)
+from branch_index import BranchIndex
+from branch_search import BranchSearchIndex, collect_branch_paths
+from rate_limiter import DEFAULT_WRITE_INTERVAL
+from response_cache import DEFAULT_MAX_ENTRIES
+from snapshot_store import SnapshotStore
+from gitmodules_cache import DEFAULT_GITMODULES_CACHE_ENTRIES, GitmodulesCache
+from handle_cache import HandleCache
+from submodule_hierarchy import create_branch_hierarchy, resolve_submodules_hierarchy
+from task_panel import TaskPanel
+from task_runtime import DEFAULT_TASK_WORKERS, configure_task_runtime, get_task_runtime
+from ui_dispatcher import post_to_ui, start_dispatcher
 
 
 token = ''
 GIT_HOSTNAME = 'github.com'
 GITMODULES_FILENAME = '.gitmodules'
+OFFLINE_READ_ONLY_MESSAGE = 'GitHub API is unreachable. Working offline from last known data (read-only).'
+TOOLTIP_RESOLVING_TEXT = 'Resolving submodules...'
+TOOLTIP_CACHE_SIZE = 256
+TOOLTIP_WORKERS = 2 # Tooltips are resolved on a small pool of their own, clicks never start more threads
+QUOTA_REFRESH_INTERVAL_MS = 5000
+# Tree nodes inserted per event loop tick, wider levels are inserted over several ticks
+TREE_INSERT_CHUNK_SIZE = 200
+TREE_PLACEHOLDER_TAG = "placeholder"
+SEARCH_DEBOUNCE_MS = 200
+SEARCH_MODE_SUBSTRING = "Substring"
+SEARCH_MODE_FUZZY = "Fuzzy"
+SEARCH_MODE_REGEX = "Regex"
+# Search results inserted (opened) first, the rest follows collapsed
+SEARCH_TOP_RESULTS = 100
+LOG_MAX_LINES = 5000
+LOG_DRAIN_INTERVAL_MS = 50
+LOG_DRAIN_BATCH_SIZE = 500
+MAX_PER_PAGE = 100 # Largest page size of the GitHub REST API
+# Rows of the submodule selector branch list rendered at a time, the next page once scrolled to its end
+BRANCHES_LISTBOX_PAGE_SIZE = 200
+# Lists branches under refPrefix with their head commits, 100 per page, following the cursor until the last page.
+# Names are returned relative to refPrefix.
+BRANCHES_GRAPHQL_QUERY = '''
+query($owner: String!, $name: String!, $refPrefix: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: $refPrefix, first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name target { oid ... on Commit { committedDate } } }
+    }
+  }
+}
+'''
 
 
 exceptions_handler = ExceptionsHandler()
 
 
 class GitHubClient:
-    def __init__(self, hostname, token):
-        self.github = Github(base_url=f"https://api.{hostname}", login_or_token=token)
+    def __init__(self, hostname, token, use_graphql=True, snapshot_store=None, gitmodules_cache=None, per_page=MAX_PER_PAGE):
+        # PyGithub shares the pooled, timeout-bounded transport with GitHubRepoSubmoduleManager
+        install_pygithub_transport()
+        self.hostname = hostname
+        self.snapshot_store = snapshot_store # Last known data, used for instant startup and offline mode
+        self.token_key = token_snapshot_key(token) # The user of the token is saved under it, the token itself is never saved
+        self.gitmodules_cache = gitmodules_cache if gitmodules_cache is not None else GitmodulesCache()
+        self.offline = False
+        self.handles = HandleCache() # Repository objects shared by all methods
+        self.branch_lists = HandleCache() # (organization, repository, prefix) -> branch names, shared by the dialogs
+        self.per_page = per_page
+        self.github = Github(base_url=f"https://api.{hostname}", login_or_token=token, per_page=per_page)
+        self.graphql_url = f"https://api.{hostname}/graphql"
+        self.graphql_headers = {
+            'Authorization': f'bearer {token}',
+            'Content-Type': 'application/json',
+        }
+        # Plain REST calls sent concurrently over the async transport, next to PyGithub
+        self.rest_url = f"https://api.{hostname}"
+        self.rest_headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github+json',
+        }
+        self.use_graphql = use_graphql # REST API is used when disabled or when host has no GraphQL endpoint
         self.user = self.github.get_user()
-        self.username = self.user.login # this will throw exception if token is invalid
+        try:
+            self.username = self.user.login # this will throw exception if token is invalid
+        except (requests.ConnectionError, requests.Timeout):
+            # API is unreachable, continue read-only from the last known data if there is any
+            self.username = self.load_snapshot('username', self.token_key)
+            if self.username is None:
+                raise
+            self.offline = True
+            print_message(MessageType.WARNING, OFFLINE_READ_ONLY_MESSAGE)
+        else:
+            self.save_snapshot('username', self.token_key, self.username)
 
     def get_username(self):
         return self.username
 
-    def get_organizations_names(self):
+    # Switch to another token, handles created with the previous one are dropped
+    def set_token(self, token):
+        self.github = Github(base_url=self.rest_url, login_or_token=token, per_page=self.per_page)
+        self.graphql_headers['Authorization'] = f'bearer {token}'
+        self.rest_headers['Authorization'] = f'token {token}'
+        self.token_key = token_snapshot_key(token)
+        self.handles.invalidate()
+        self.branch_lists.invalidate()
+        self.user = self.github.get_user()
+        self.username = self.user.login
+        self.save_snapshot('username', self.token_key, self.username)
+
+    # Lazy handle, no request is made until one of its endpoints is called
+    def get_repo_handle(self, org_name, repo_name):
+        return self.handles.get(('repository', org_name, repo_name), lambda: self.github.get_repo(f"{org_name}/{repo_name}", lazy=True))
+
+    # Data is saved per user and host, so a token of another account never shows the data of the previous one.
+    # The user of a token is saved per host, it has to be known before the data of the user can be loaded.
+    def snapshot_host(self, kind):
+        return self.hostname if kind == 'username' else f'{self.username}@{self.hostname}'
+
+    def load_snapshot(self, kind, scope=''):
+        if self.snapshot_store is None:
+            return None
+        return self.snapshot_store.load(self.snapshot_host(kind), kind, scope)
+
+    def save_snapshot(self, kind, scope, data):
+        if self.snapshot_store is not None:
+            self.snapshot_store.save(self.snapshot_host(kind), kind, scope, data)
+
+    # Return last known data when cached is requested or when offline, otherwise fetch it and save it as snapshot.
+    # If the API turns out to be unreachable, last known data is returned instead.
+    def fetch_with_snapshot(self, kind, scope, fetch, cached=False):
+        if cached or self.offline:
+            data = self.load_snapshot(kind, scope)
+            if data is not None:
+                return data
+        try:
+            data = fetch()
+        except (requests.ConnectionError, requests.Timeout):
+            data = self.load_snapshot(kind, scope)
+            if data is None:
+                raise
+            print_message(MessageType.WARNING, f"GitHub API is unreachable. Showing last known {kind} for <b>{scope or self.hostname}</b>.")
+            return data
+        self.save_snapshot(kind, scope, data)
+        return data
+
+    def get_organizations_names(self, cached=False):
         orgs = []
         try:
-            orgs = [org.login for org in self.user.get_orgs()]
+            orgs = self.fetch_with_snapshot('organizations', '', lambda: [org.login for org in self.user.get_orgs()], cached)
         except Exception as e:
             handle_and_print_exception(e, 'No organizations found.')
         return orgs
     
-    def get_organization_repos_names(self, org_name):
+    def get_organization_repos_names(self, org_name, cached=False):
         repos = []
         try:
-            repos = [repo.name for repo in self.github.get_organization(org_name).get_repos()]
+            repos = self.fetch_with_snapshot('repositories', org_name,
+                                             lambda: [repo['name'] for repo in self.rest_list(f"/orgs/{org_name}/repos")], cached)
         except Exception as e:
             err_desc = f"Authenticated user ('{self.username}') lacks the necessary permissions to access the list of repositories for organization: {org_name}"
             handle_and_print_exception(e, err_desc)
         return repos
     
-    def get_organization_repo_branches(self, org_name, repo_name):
+    # With a prefix (e.g. 'Features/team3/') only the branches in that namespace are fetched, filtered on the server.
+    # When cached is requested, a list fetched earlier in the session is returned, a namespace is then also
+    # filtered from the cached list of all branches. Fetched lists are always kept for later cached calls.
+    def get_organization_repo_branches(self, org_name, repo_name, prefix='', cached=False):
         branches = []
         try:
-            branches = [branch.name for branch in self.github.get_organization(org_name).get_repo(repo_name).get_branches()]
+            key = (org_name, repo_name, prefix)
+            if not cached:
+                # A list fetched while a branch is created or deleted may miss the change and isn't kept
+                generation = self.branch_lists.generation
+                branches = self.fetch_organization_repo_branches(org_name, repo_name, prefix)
+                self.branch_lists.put(key, branches, generation=generation)
+                return branches
+            all_branches = self.branch_lists.peek((org_name, repo_name, '')) if prefix else None
+            if all_branches is not None:
+                return [branch for branch in all_branches if branch.startswith(prefix)]
+            branches = self.branch_lists.get(key, lambda: self.fetch_organization_repo_branches(org_name, repo_name, prefix))
         except Exception as e:
             err_desc = f"Authenticated user ('{self.username}') lacks the necessary permissions to access the list of branches for repository: '{org_name}{repo_name}'."
             handle_and_print_exception(e, err_desc)
         return branches
     
-    def get_organization_repo_branch_gitmodules_content(self, org_name, repo_name, branch_name):
-        file_content = None
+    # List cached earlier in the session, None when it has to be fetched
+    def get_cached_organization_repo_branches(self, org_name, repo_name, prefix=''):
+        return self.branch_lists.peek((org_name, repo_name, prefix))
+
+    # Only the lists of the changed repository are dropped, lists of other repositories stay valid
+    def invalidate_organization_repo_branches(self, org_name, repo_name):
+        self.branch_lists.invalidate(lambda key: key[:2] == (org_name, repo_name))
+
+    def fetch_organization_repo_branches(self, org_name, repo_name, prefix=''):
+        if prefix:
+            return [branch_name for branch_name, _, _ in self.get_repo_branches_heads_matching(org_name, repo_name, prefix)]
+        return [branch['name'] for branch in self.rest_list(f"/repos/{org_name}/{repo_name}/branches")]
+
+    # Single git ref lookup, enough to validate everything cached per commit
+    def get_organization_repo_branch_head_sha(self, org_name, repo_name, branch_name):
+        repo = self.get_repo_handle(org_name, repo_name)
+        return repo.get_git_ref(f"heads/{branch_name}").object.sha
+
+    # Returns submodule tuples parsed from .gitmodules at the branch head, see parse_gitmodules.
+    # .gitmodules at a commit never changes, so it's fetched only once per commit (also when it doesn't exist).
+    def get_organization_repo_branch_submodules(self, org_name, repo_name, branch_name):
         try:
-            org = self.github.get_organization(org_name)
-            repo = org.get_repo(repo_name)
-            file_content = repo.get_contents(GITMODULES_FILENAME, ref=branch_name)
+            head_sha = self.get_organization_repo_branch_head_sha(org_name, repo_name, branch_name)
+            cache_repo = f"{self.hostname}/{org_name}/{repo_name}"
+            submodules = self.gitmodules_cache.get(cache_repo, head_sha)
+            if submodules is not None:
+                return submodules
+
+            try:
+                file_content = self.get_repo_handle(org_name, repo_name).get_contents(GITMODULES_FILENAME, ref=head_sha)
+                submodules = parse_gitmodules(file_content.decoded_content.decode('utf-8'))
+            except GithubException as e:
+                if e.status != 404:
+                    raise
+                submodules = [] # No .gitmodules on this commit
+            self.gitmodules_cache.put(cache_repo, head_sha, submodules)
+            return submodules
         except Exception as e:
-            if isinstance(e, GithubException) and e.status == 404:
-                return None
-            else:
-                handle_and_print_exception(e)
-        return file_content.decoded_content.decode('utf-8') if file_content else None
+            handle_and_print_exception(e, f"Unable to get submodules of '{org_name}/{repo_name}' on branch '{branch_name}'.")
+            raise
+
+    # Submodules of several (repo, branch) pairs at once, see get_organization_repo_branch_submodules.
+    # Head refs, and then the .gitmodules files missing from the cache, are requested concurrently over the async transport.
+    def get_organization_repos_branches_submodules(self, org_name, repo_branches):
+        try:
+            ref_responses = self.rest_get_many([f"/repos/{org_name}/{repo_name}/git/ref/heads/{quote(branch_name)}"
+                                                for repo_name, branch_name in repo_branches])
+            head_shas = []
+            for response in ref_responses:
+                response.raise_for_status()
+                head_shas.append(response.json()['object']['sha'])
+
+            cache_repos = [f"{self.hostname}/{org_name}/{repo_name}" for repo_name, _ in repo_branches]
+            submodules_list = [self.gitmodules_cache.get(cache_repo, head_sha) for cache_repo, head_sha in zip(cache_repos, head_shas)]
+            missing = [index for index, submodules in enumerate(submodules_list) if submodules is None]
+            content_responses = self.rest_get_many([f"/repos/{org_name}/{repo_branches[index][0]}/contents/{GITMODULES_FILENAME}?ref={head_shas[index]}"
+                                                    for index in missing], accept='application/vnd.github.raw')
+            for index, response in zip(missing, content_responses):
+                if response.status_code == 404:
+                    submodules = [] # No .gitmodules on this commit
+                else:
+                    response.raise_for_status()
+                    submodules = parse_gitmodules(response.content.decode('utf-8'))
+                self.gitmodules_cache.put(cache_repos[index], head_shas[index], submodules)
+                submodules_list[index] = submodules
+            return submodules_list
+        except Exception as e:
+            handle_and_print_exception(e, f"Unable to get submodules of {len(repo_branches)} branches in '{org_name}'.")
+            raise
+
+    # List a REST collection with the largest page size. Once the first page tells the number of the last page
+    # (Link header), all remaining pages are requested concurrently over the async transport and joined in order.
+    def rest_list(self, path):
+        async_transport = get_async_transport()
+        url = f"{self.rest_url}{path}{'&' if '?' in path else '?'}per_page={self.per_page}"
+        first_page = async_transport.request('GET', url, self.rest_headers)
+        first_page.raise_for_status()
+        items = first_page.json()
+        pages = async_transport.gather([('GET', f"{url}&page={page}", self.rest_headers, None)
+                                        for page in range(2, last_page_number(first_page) + 1)])
+        for page in pages:
+            page.raise_for_status()
+            items.extend(page.json())
+        return items
+
+    # GET several REST API paths concurrently, responses in the same order
+    def rest_get_many(self, paths, accept=None):
+        headers = dict(self.rest_headers, Accept=accept) if accept else self.rest_headers
+        return get_async_transport().gather([('GET', f"{self.rest_url}{path}", headers, None) for path in paths])
 
     def get_organization_repo_branch_commit_sha(self, org_name, repo_name, branch_name):
         try:
-            return self.github.get_organization(org_name).get_repo(repo_name).get_branch(branch_name).commit.sha
+            return self.get_repo_handle(org_name, repo_name).get_branch(branch_name).commit.sha
         except Exception as e:
             error_desc = f"Commit SHA not found.The branch may be empty, or the user ('{self.username}') lacks permissions to access the commit history for '{org_name}{repo_name}{branch_name}'."
             handle_and_print_exception(e, error_desc)
             return
 
     def organization_repo_create_branch(self, org_name, repo_name, new_branch_name, source_commit_sha):
+        if self.offline:
+            print_message(MessageType.ERROR, OFFLINE_READ_ONLY_MESSAGE)
+            return
         # refs/heads/new-branch is used to create a new branch
         try:
-            self.github.get_organization(org_name).get_repo(repo_name).create_git_ref(ref=f"refs/heads/{new_branch_name}", sha=source_commit_sha)
+            self.get_repo_handle(org_name, repo_name).create_git_ref(ref=f"refs/heads/{new_branch_name}", sha=source_commit_sha)
+            # Cached branch lists no longer match the repository
+            self.invalidate_organization_repo_branches(org_name, repo_name)
+            return True
         except Exception as e:
-            error_desc = f"The new branch name ('{self.branch_name}') may already exist, or the user lacks permission to create branches."
+            error_desc = f"The new branch name ('{new_branch_name}') may already exist, or the user lacks permission to create branches."
             handle_and_print_exception(e, error_desc)
+        return False
             
     def organization_repo_delete_branch(self, org_name, repo_name, branch_name):
+        if self.offline:
+            print_message(MessageType.ERROR, OFFLINE_READ_ONLY_MESSAGE)
+            return
         try:
             # Fetch the branch reference
-            ref = self.github.get_organization(org_name).get_repo(repo_name).get_git_ref(f"heads/{branch_name}")
+            ref = self.get_repo_handle(org_name, repo_name).get_git_ref(f"heads/{branch_name}")
         except Exception as e:
             handle_and_print_exception(e, f"The specified Git reference for the branch '{branch_name}' does not exist.")
+            return False
         try:
             # Delete the branch by deleting its reference
             ref.delete()
+            self.invalidate_organization_repo_branches(org_name, repo_name)
+            return True
         except Exception as e:
             handle_and_print_exception(e, f"Unable to delete branch {branch_name}.")
+        return False
 
-    def get_repo_branches_structure(self, org_name, repo_name):
-        repo = self.github.get_organization(org_name).get_repo(repo_name)
+    def graphql_query(self, query, variables):
+        response = get_transport().request('POST', self.graphql_url, headers=self.graphql_headers,
+                                           data=json.dumps({'query': query, 'variables': variables}))
+        response.raise_for_status()
+        result = response.json()
+        if result.get('errors'):
+            # Same shape as REST errors so exceptions handler can read the message
+            raise GithubException(response.status_code, result['errors'][0], response.headers)
+        return result['data']
+
+    # Retrieve branches as (name, head commit sha, commit date) tuples in one GraphQL cursor stream
+    def get_repo_branches_heads_graphql(self, org_name, repo_name, prefix=''):
+        branches = []
+        cursor = None
+        while True:
+            data = self.graphql_query(BRANCHES_GRAPHQL_QUERY, {'owner': org_name, 'name': repo_name, 'refPrefix': f'refs/heads/{prefix}', 'cursor': cursor})
+            refs = data['repository']['refs']
+            for node in refs['nodes']:
+                target = node['target'] or {}
+                branches.append((f"{prefix}{node['name']}", target.get('oid'), target.get('committedDate')))
+            if not refs['pageInfo']['hasNextPage']:
+                return branches
+            cursor = refs['pageInfo']['endCursor']
+
+    # Retrieve branches as (name, head commit sha, commit date) tuples, GraphQL first and REST as fallback.
+    # With a prefix only the branches in that namespace are listed, filtered on the server.
+    def get_repo_branches_heads(self, org_name, repo_name, prefix=''):
+        if self.use_graphql:
+            try:
+                return self.get_repo_branches_heads_graphql(org_name, repo_name, prefix)
+            except Exception as e:
+                if getattr(getattr(e, 'response', None), 'status_code', None) == 404:
+                    self.use_graphql = False # Host doesn't provide GraphQL API, don't try again
+                handle_and_print_exception(e, f"GraphQL branch listing failed for '{org_name}/{repo_name}'. Falling back to REST API.")
+        if prefix:
+            return self.get_repo_branches_heads_matching(org_name, repo_name, prefix)
+        # REST branch list has no commit dates
+        return [(branch['name'], branch['commit']['sha'], None) for branch in self.rest_list(f"/repos/{org_name}/{repo_name}/branches")]
+
+    # REST matching-refs lists only the refs starting with the prefix, also without commit dates
+    def get_repo_branches_heads_matching(self, org_name, repo_name, prefix):
+        refs = self.rest_list(f"/repos/{org_name}/{repo_name}/git/matching-refs/heads/{quote(prefix)}")
+        return [(ref['ref'][len('refs/heads/'):], ref['object']['sha'], None) for ref in refs]
+
+    def get_repo_branches_structure(self, org_name, repo_name, cached=False, prefix=''):
+        scope = f'{org_name}/{repo_name}:{prefix}' if prefix else f'{org_name}/{repo_name}'
+        return self.fetch_with_snapshot('branches', scope,
+                                        lambda: self.build_repo_branches_structure(org_name, repo_name, prefix), cached)
+
+    def build_repo_branches_structure(self, org_name, repo_name, prefix=''):
         structure = {}
-        for branch in repo.get_branches():
-            parts = branch.name.split('/')
+        for branch_name, _, _ in self.get_repo_branches_heads(org_name, repo_name, prefix):
+            parts = branch_name.split('/')
             node = structure
             for part in parts:
                 if part not in node:
@@ -119,9 +404,18 @@ class GitHubClient:
         return structure
     
     #Retrieve the names of teams in the specified organization.
-    def get_organization_teams(self, org_name):
-        org = self.github.get_organization(org_name)
-        return [team.name for team in org.get_teams()]
+    def get_organization_teams(self, org_name, cached=False):
+        return self.fetch_with_snapshot('teams', org_name,
+                                        lambda: [team['name'] for team in self.rest_list(f"/orgs/{org_name}/teams")], cached)
+
+class SubmoduleChange:
+    def __init__(self, repo_sub, path, branch=None, sha=None, delete=False):
+        self.repo_sub = repo_sub # Submodule name, also the name of submodule repository
+        self.path = path
+        self.branch = branch # Branch to set in .gitmodules, None keeps the one already set
+        self.sha = sha # Commit to point to, None means head of the submodule branch
+        self.delete = delete
+
 
 class GitHubRepoSubmoduleManager:
     def __init__(self, owner, repo_top, token):
@@ -136,11 +430,26 @@ class GitHubRepoSubmoduleManager:
 
     def make_request(self, method, url, data=None):
         try:
-            response = requests.request(method, url, headers=self.headers, data=json.dumps(data))
+            response = get_transport().request(method, url, headers=self.headers, data=json.dumps(data))
             response.raise_for_status()
             return response.json()
         except Exception as e:
             handle_and_print_exception(e, f"Unable to make request [{method}] on {url}")
+
+    # Same as make_request for several URLs, sent concurrently over the async transport
+    def make_requests(self, method, urls):
+        responses = get_async_transport().gather([(method, url, self.headers, None) for url in urls], return_exceptions=True)
+        results = []
+        for url, response in zip(urls, responses):
+            try:
+                if isinstance(response, BaseException):
+                    raise response
+                response.raise_for_status()
+                results.append(response.json())
+            except Exception as e:
+                handle_and_print_exception(e, f"Unable to make request [{method}] on {url}")
+                results.append(None)
+        return results
             
     def fix_config_file_formatting(self, content):
         # Remove \n in front of [ - because of duplicates
@@ -151,182 +460,163 @@ class GitHubRepoSubmoduleManager:
         return content.rstrip('\n')+'\n'
 
     def delete_submodule(self, repo_top_branch, repo_sub, path_to_submodule):
-        # Get the commit hash of the parent repository
-        parent_tree_sha = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/branches/{repo_top_branch}')['commit']['sha']
+        self.update_submodules(repo_top_branch, [SubmoduleChange(repo_sub, path_to_submodule, delete=True)])
 
-        # Get parent root tree list and try to find .gitmodules
-        parent_tree_list = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees/{parent_tree_sha}')['tree']
-        gitmodules_entry = next((entry for entry in parent_tree_list if entry['path'] == GITMODULES_FILENAME), None)
+    def add_or_update_submodule(self, repo_top_branch, repo_sub, path_to_submodule, sub_branch = None):
+        return len(self.update_submodules(repo_top_branch, [SubmoduleChange(repo_sub, path_to_submodule, sub_branch)])) > 0
 
-        gitmodules_config = configparser.ConfigParser(allow_no_value=True)
-        if gitmodules_entry:
-            # Get file blob for .gitmodules
-            gitmodules_entry_blob = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/blobs/{gitmodules_entry["sha"]}')
-            gitmodules_content = base64.b64decode(gitmodules_entry_blob['content'].rstrip('\n')).decode('utf-8')
-            gitmodules_config.read_string(gitmodules_content)
+    def update_submodules(self, repo_top_branch, changes):
+        """
+        Apply submodule additions, deletions and re-pointing to a branch in a single commit.
 
-            if f'submodule "{repo_sub}"' in gitmodules_config:
-                del gitmodules_config[f'submodule "{repo_sub}"']
-            else:
-                # Nothing to delete
-                return
+        Parent tree and .gitmodules are read once, .gitmodules content is inlined in the new tree
+        (no separate blob request) and the branch is moved with one commit and one ref update.
 
-            # If .gitmodules is now empty, delete it
-            if len(gitmodules_config) == 1: # 1 is empty config for some strange reason (maybe becaouse of default config functionality)
-                git_modules_blob_sha = None # This will delete file from tree
-            else: # Update file
-                gitmodules_output = StringIO()
-                gitmodules_config.write(gitmodules_output)
-                content_encoded = base64.b64encode(self.fix_config_file_formatting(gitmodules_output.getvalue()).encode('utf-8')).decode('utf-8') + '\n'
-                # Create new .gitmodules file blob data
-                gitmodules_entry_blob_data = {
-                    "content": content_encoded,
-                    "encoding": "base64"
-                }
+        Args:
+            repo_top_branch (str): Branch of the top repository to change.
+            changes (list): SubmoduleChange items.
 
-                git_modules_blob_sha = self.make_request('POST', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/blobs', gitmodules_entry_blob_data)['sha']
+        Returns:
+            list: Names of the submodules that were changed, empty if nothing had to be committed.
+        """
+        # Get the commit of the parent branch and its root tree
+        parent_commit = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/branches/{repo_top_branch}')['commit']
+        parent_commit_sha = parent_commit['sha']
+        parent_tree_sha = parent_commit['commit']['tree']['sha']
+
+        # Get the whole tree at once, so submodules in nested folders don't need additional requests
+        parent_tree = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees/{parent_tree_sha}?recursive=1')
+        if parent_tree.get('truncated'):
+            # Tree is too large to be listed at once, only folders on the paths of the changed entries are read
+            tree_entries = self.read_tree_entries(parent_tree_sha, [GITMODULES_FILENAME] + [change.path for change in changes])
         else:
-            # No gitmodules file, nothing to delete
-            return
+            tree_entries = {entry['path']: entry for entry in parent_tree['tree']}
 
-        # Filter out the deleted submodule entry
-        new_tree_entries = [
-            entry for entry in parent_tree_list
-            if entry['path'] != path_to_submodule
-        ]
-
-        # Check if .gitmodules entry exists and update it, otherwise add it
-        gitmodules_updated = False
-        for entry in new_tree_entries:
-            if entry['path'] == GITMODULES_FILENAME:
-                entry['sha'] = git_modules_blob_sha
-                gitmodules_updated = True
-                break
-
-        if not gitmodules_updated:
-            new_tree_entries.append({
-                "path": ".gitmodules",
-                "mode": "100644",
-                "type": "blob",
-                "sha": git_modules_blob_sha,
-            })
-
-        # Create a git tree that updates/deletes the gitmodule file and deletes submodule reference in tree
-        data = {
-            'base_tree': parent_tree_sha,
-            'tree': new_tree_entries
-        }
-
-        parent_tree_sha_new = self.make_request('POST', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees', data)['sha']
-
-        commit_message = f'Deleted {repo_sub} submodule'
-        
-        # Tree is recreated, just commit and update head
-        self.commit_tree_and_update_head(repo_top_branch, parent_tree_sha, parent_tree_sha_new, commit_message)
-
-    def add_or_update_submodule(self, repo_top_branch, repo_sub, path_to_submodule, sub_branch = None):
-        # Get the commit hash of the parent repository
-        parent_tree_sha = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/branches/{repo_top_branch}')['commit']['sha']
-
-        # Get parent root tree list and try to find .gitmodules
-        parent_tree_list = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees/{parent_tree_sha}')['tree']
-        gitmodules_entry = next((entry for entry in parent_tree_list if entry['path'] == GITMODULES_FILENAME), None)
-        path_to_submodule_splitted = path_to_submodule.split('/')
-
-        tree_list = parent_tree_list
-        for path_part in path_to_submodule_splitted:
-            submodule_entry = next((entry for entry in tree_list if entry['path'] == path_part), None)
-            if submodule_entry and submodule_entry['type'] == 'tree':
-                # Get the tree 
-                tree_sha = submodule_entry['sha']
-                tree_list = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees/{tree_sha}')['tree']
-            
         gitmodules_config = configparser.ConfigParser(allow_no_value=True)
-        add_submodule_section = False
-        update_submodule_branch = False
+        gitmodules_entry = tree_entries.get(GITMODULES_FILENAME)
         if gitmodules_entry:
             # Get file blob for .gitmodules
             gitmodules_entry_blob = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/blobs/{gitmodules_entry["sha"]}')
             gitmodules_content = base64.b64decode(gitmodules_entry_blob['content'].rstrip('\n')).decode('utf-8')
             gitmodules_config.read_string(gitmodules_content)
 
-            # Check do we have this submodule in gitmodules
-            if f'submodule "{repo_sub}"' in gitmodules_config:
-                if sub_branch and gitmodules_config[f'submodule "{repo_sub}"']['branch'] != sub_branch: # If submodule branch is specified and different it meand that we must update it
-                    gitmodules_config[f'submodule "{repo_sub}"']['branch'] = sub_branch
-                    update_submodule_branch = True
+        # Heads of all submodule branches given without a commit are read at once
+        head_keys = list(dict.fromkeys((change.repo_sub, change.branch) for change in changes
+                                       if not change.delete and change.branch and not change.sha))
+        head_branches = self.make_requests('GET', [f'https://{self.hostname}/repos/{self.owner}/{repo_sub}/branches/{sub_branch}'
+                                                   for repo_sub, sub_branch in head_keys])
+        head_shas = {key: branch['commit']['sha'] for key, branch in zip(head_keys, head_branches) if branch}
+
+        gitmodules_changed = False
+        new_tree_entries = {} # By path, so later change of the same submodule (e.g. delete and add again) wins
+        added, updated, deleted = [], [], []
+        for change in changes:
+            section = f'submodule "{change.repo_sub}"'
+            submodule_entry = tree_entries.get(change.path)
+
+            if change.delete:
+                if section not in gitmodules_config:
+                    continue # Nothing to delete
+                del gitmodules_config[section]
+                gitmodules_changed = True
+                if submodule_entry:
+                    # sha None deletes submodule reference from tree
+                    new_tree_entries[change.path] = {'path': change.path, 'mode': '160000', 'type': 'commit', 'sha': None}
+                deleted.append(change.repo_sub)
+                continue
+
+            sub_branch = change.branch
+            section_added = False
+            section_updated = False
+            if section in gitmodules_config:
+                if sub_branch and gitmodules_config[section].get('branch') != sub_branch: # If submodule branch is specified and different it means that we must update it
+                    gitmodules_config[section]['branch'] = sub_branch
+                    section_updated = True
                 else: # We take current branch set in gitmodules file
-                    sub_branch = gitmodules_config[f'submodule "{repo_sub}"']['branch']
+                    sub_branch = gitmodules_config[section].get('branch')
+            elif sub_branch:
+                gitmodules_config.add_section(section)
+                gitmodules_config.set(section, 'path', change.path)
+                gitmodules_config.set(section, 'url', f'../{change.repo_sub}.git')
+                gitmodules_config.set(section, 'branch', sub_branch)
+                section_added = True
+
+            if sub_branch is None:
+                # We should either get sub branch if (adding new submodule)/(updating branch) or have it in .gitmodules file if updating just submodule pointer
+                continue
+
+            # Get the commit hash from the submodule repository if it's not given
+            target_sub_sha = change.sha or head_shas.get((change.repo_sub, sub_branch)) or self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{change.repo_sub}/branches/{sub_branch}')['commit']['sha']
+            if not (section_added or section_updated) and submodule_entry and submodule_entry['sha'] == target_sub_sha:
+                continue # Submodule pointer didn't change
+
+            new_tree_entries[change.path] = {'path': change.path, 'mode': '160000', 'type': 'commit', 'sha': target_sub_sha}
+            gitmodules_changed = gitmodules_changed or section_added or section_updated
+            (added if section_added else updated).append(change.repo_sub)
+
+        if gitmodules_changed:
+            if not gitmodules_config.sections():
+                # .gitmodules is now empty, delete it
+                new_tree_entries[GITMODULES_FILENAME] = {'path': GITMODULES_FILENAME, 'mode': '100644', 'type': 'blob', 'sha': None}
             else:
-                # Add submodule section to existing file
-                add_submodule_section = True
-        else:
-            # Add submodule section to new file
-            add_submodule_section = True
-
-        if sub_branch == None:
-            # We should either get sub branch if (adding new submodule)/(updating branch) or have it in .gitmodules file if updating just submodule pointer
-            return False
-
-        if add_submodule_section: # No matter whether file is updated or added new blob must be created anyway (old file blob is left for child changeset)
-            gitmodules_config.add_section(f'submodule "{repo_sub}"')
-            gitmodules_config.set(f'submodule "{repo_sub}"', 'path', path_to_submodule)
-            gitmodules_config.set(f'submodule "{repo_sub}"', 'url', f'../{repo_sub}.git')
-            gitmodules_config.set(f'submodule "{repo_sub}"', 'branch', sub_branch)
-
-        if add_submodule_section or update_submodule_branch:
-            gitmodules_output = StringIO()
-            gitmodules_config.write(gitmodules_output)
-            content_encoded = base64.b64encode(self.fix_config_file_formatting(gitmodules_output.getvalue()).encode('utf-8')).decode('utf-8') + '\n'
-            # Create .gitmodules file
-            gitmodules_entry_blob_data = {
-                "content": content_encoded,
-                "encoding": "base64"
-            }
-
-            git_modules_blob_sha = self.make_request('POST', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/blobs', gitmodules_entry_blob_data)['sha']
-            gitmodules_tree_entry =  {
-                    "path": ".gitmodules",
-                    "mode": "100644",
-                    "type": "blob",
-                    "sha": git_modules_blob_sha,
+                gitmodules_output = StringIO()
+                gitmodules_config.write(gitmodules_output)
+                new_tree_entries[GITMODULES_FILENAME] = {
+                    'path': GITMODULES_FILENAME,
+                    'mode': '100644',
+                    'type': 'blob',
+                    'content': self.fix_config_file_formatting(gitmodules_output.getvalue()),
                 }
-            
-        # Get the commit hash from the submodule repository
-        target_sub_sha = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{repo_sub}/branches/{sub_branch}')['commit']['sha'] 
 
-        # Create a git tree that updates the submodule reference
+        if not new_tree_entries:
+            return []
+
+        # Create a git tree with all submodule references and .gitmodules changes
         data = {
             'base_tree': parent_tree_sha,
-            'tree': [
-                {
-                    'path': path_to_submodule,
-                    'mode': '160000',
-                    'type': 'commit',
-                    'sha': target_sub_sha
-                }
-            ]
+            'tree': list(new_tree_entries.values())
         }
-
-        # Only if we added submodule or updated submodule branc add gitmodules blob
-        if add_submodule_section or update_submodule_branch:
-            # Add update of gitmodules
-            data['tree'].append(gitmodules_tree_entry)
-        else:
-            # Check if submodule pointer changed
-            if submodule_entry['sha'] == target_sub_sha:
-                # Nothing to update
-                return False
-
         parent_tree_sha_new = self.make_request('POST', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees', data)['sha']
 
-        operation_string = 'Added' if add_submodule_section else 'Updated'
-        commit_message = f'{operation_string} {repo_sub} submodule'
-        
+        operations = [('Added', added), ('Updated', updated), ('Deleted', deleted)]
+        commit_message = '; '.join(f'{operation} {", ".join(names)} submodule{"s" if len(names) > 1 else ""}'
+                                   for operation, names in operations if names)
+
         # Tree is recreated, just commit and update head
-        self.commit_tree_and_update_head(repo_top_branch, parent_tree_sha, parent_tree_sha_new, commit_message)
+        self.commit_tree_and_update_head(repo_top_branch, parent_commit_sha, parent_tree_sha_new, commit_message)
+
+        return added + updated + deleted
 
-        return True
+    def read_tree_entries(self, tree_sha, paths):
+        """
+        Read the tree entries of the given paths folder by folder, without the recursive listing.
+
+        Args:
+            tree_sha (str): SHA of the root tree.
+            paths (list): Paths of the entries, relative to the root.
+
+        Returns:
+            dict: Entries of all folders read on the way by their full path, paths that don't exist are missing.
+        """
+        entries = {}
+        read_folders = set()
+        for path in paths:
+            parts = path.split('/')
+            for depth in range(len(parts)):
+                folder = '/'.join(parts[:depth])
+                if folder in read_folders:
+                    continue
+                folder_entry = entries.get(folder) if folder else {'type': 'tree', 'sha': tree_sha}
+                if folder_entry is None or folder_entry['type'] != 'tree':
+                    break # Path doesn't exist
+                folder_tree = self.make_request('GET', f'https://{self.hostname}/repos/{self.owner}/{self.repo_top}/git/trees/{folder_entry["sha"]}')
+                if folder_tree.get('truncated'):
+                    raise Exception(f"Folder '{folder}' of repository '{self.repo_top}' has too many entries to be read.")
+                for entry in folder_tree['tree']:
+                    entry_path = f'{folder}/{entry["path"]}' if folder else entry['path']
+                    entries[entry_path] = dict(entry, path=entry_path)
+                read_folders.add(folder)
+        return entries
 
     def commit_tree_and_update_head(self, parent_branch, parent_tree_sha, parent_tree_sha_new, commit_message):
         # Commit the tree
@@ -354,6 +644,12 @@ class TreeviewTooltip:
         self.tooltip_func = tooltip_func
         self.tooltip_opened = False
         self.tip_window = None
+        self.tip_label = None
+        self.tooltip_request = 0 # Increased on every show/hide, results of older requests are ignored
+        # Tooltip texts by (org, repo, branch, head commit sha), branch with new commits gets resolved again
+        self.tooltip_cache = OrderedDict()
+        self.tooltip_cache_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=TOOLTIP_WORKERS, thread_name_prefix='tooltip')
         self.treeview.bind("<Button-1>", self.on_left_click)
         self.treeview.bind("<Leave>", self.on_leave)
 
@@ -371,25 +667,61 @@ class TreeviewTooltip:
         else:
             self.hide_tooltip()
 
+    # Opens the tooltip right away and resolves its text in the background
     def show_tooltip(self, item, x, y):
+        org_name = self.org_combo.get()
+        repo_name = self.repo_combo.get()
+        branch_name = get_path(self.treeview, item)
+        self.tooltip_request += 1
+
+        self.tooltip_opened = True
+        self.tip_window = tw = tk.Toplevel(self.treeview)
+        tw.wm_overrideredirect(True)
+        tw.wm_geometry(f"+{x+20+self.treeview.winfo_rootx()}+{y+10+self.treeview.winfo_rooty()}")
+        self.tip_label = tk.Label(tw, text=TOOLTIP_RESOLVING_TEXT, justify=tk.LEFT, background="#ffffe0", relief=tk.SOLID, borderwidth=1, font=font.Font(family="Consolas", size=8))
+        self.tip_label.pack(ipadx=1)
+
+        self.executor.submit(self.resolve_tooltip, self.tooltip_request, org_name, repo_name, branch_name)
+
+    # Runs on worker thread
+    def resolve_tooltip(self, request, org_name, repo_name, branch_name):
+        if request != self.tooltip_request:
+            return # Queued behind other requests and closed or replaced in the meantime
         text = None
         try:
-            text = self.tooltip_func(self.github_client, self.org_combo, self.repo_combo, self.treeview, item)
+            head_sha = self.github_client.get_organization_repo_branch_head_sha(org_name, repo_name, branch_name)
+            key = (org_name, repo_name, branch_name, head_sha)
+            with self.tooltip_cache_lock:
+                text = self.tooltip_cache.get(key)
+                if text is not None:
+                    self.tooltip_cache.move_to_end(key)
+            # Don't resolve if user already clicked another node or left the tree
+            if text is None and request == self.tooltip_request:
+                text = self.tooltip_func(self.github_client, org_name, repo_name, branch_name)
+                if text:
+                    with self.tooltip_cache_lock:
+                        self.tooltip_cache[key] = text
+                        if len(self.tooltip_cache) > TOOLTIP_CACHE_SIZE:
+                            self.tooltip_cache.popitem(last=False)
         except Exception as e:
             handle_and_print_exception(e)
+        post_to_ui(self.on_tooltip_resolved, request, text, key='tooltip')
+
+    def on_tooltip_resolved(self, request, text):
+        if request != self.tooltip_request or not self.tip_window:
+            return # Tooltip was closed or replaced in the meantime
         if text:
-            self.tooltip_opened = True
-            self.tip_window = tw = tk.Toplevel(self.treeview)
-            tw.wm_overrideredirect(True)
-            tw.wm_geometry(f"+{x+20+self.treeview.winfo_rootx()}+{y+10+self.treeview.winfo_rooty()}")
-            label = tk.Label(tw, text=text, justify=tk.LEFT, background="#ffffe0", relief=tk.SOLID, borderwidth=1, font=font.Font(family="Consolas", size=8))
-            label.pack(ipadx=1)
+            self.tip_label.config(text=text)
+        else:
+            self.hide_tooltip()
 
     def hide_tooltip(self):
+        self.tooltip_request += 1
         if self.tip_window:
             self.tooltip_opened = False
             self.tip_window.destroy()
             self.tip_window = None
+            self.tip_label = None
 
     def on_leave(self, event):
         self.hide_tooltip()
@@ -403,16 +735,12 @@ def get_path(tree, item):
     return '/'.join(reversed(path))
 
 
-def tooltip_text(github_client, org_combo, repo_combo, treeview, item):
-    # This function should return the tooltip text for the given item
-    org_name = org_combo.get()
-    repo_name = repo_combo.get()
-    branch_name = get_path(treeview, item)
+def tooltip_text(github_client, org_name, repo_name, branch_name):
+    # This function should return the tooltip text for the given branch, it's called from worker thread
     submodules_info = None
     try:
-        # get submodules info
-        submodules_info = get_submodules_info(github_client, org_name, repo_name, branch_name)
-        submodules_info =[sub_m_info + (get_submodules_info(github_client, org_name, sub_m_info[1], sub_m_info[2]),) for sub_m_info in submodules_info]
+        # get submodules info of all levels
+        submodules_info = get_submodules_hierarchy(github_client, org_name, repo_name, branch_name)
         submodules_hierarchy_string = f"R:{repo_name} B:{branch_name}\n" + build_hierarchy(submodules_info, format_output, get_sublist)
         return submodules_hierarchy_string
     except Exception as e:
@@ -427,6 +755,19 @@ class App:
         self.default_repo = repo
         self.default_team = team
         self.last_tree_item_rightclicked = None
+        self.pending_tree_nodes = {} # Item id -> children not inserted yet (item has a placeholder child)
+        self.tree_items = {} # Full path ('Release/1.0') -> id of the inserted tree item
+        self.tree_item_paths = {} # Item id -> full path
+        self.fetch_in_flight = False # A fetch_data task is queued or running
+        self.fetch_requested = False # Refresh asked for while fetching, one more fetch runs after it
+        self.tree_work_queue = deque()
+        self.tree_work_scheduled = False
+        self.branch_search_index = BranchSearchIndex({}) # Replaced on the search thread once the index of a new structure is built
+        self.search_index_generation = 0 # Incremented for every shown structure, older builds are dropped
+        self.search_after_id = None
+        self.search_generation = 0
+        # Searches run one at a time off the UI thread, a newer search makes the queued ones stale
+        self.search_executor = ThreadPoolExecutor(max_workers=1)
         self.setup_ui()
         self.setup_actions()
         self.username = self.github_client.get_username()
@@ -437,34 +778,98 @@ class App:
             print_message(MessageType.INFO, "Credentials for <b>'BranchBrowser'</b> have been saved successfully.")
         self.github = github
 
-    def filter_branches_by_string(self, structure, search_string):
-        filtered_structure = {}
-        for key, subbranches in structure.items():
-            # If the branch name exactly matches the search string, include this branch and all its subbranches
-            if key.lower() == search_string.lower() or search_string.lower() in key.lower():
-                filtered_structure[key] = subbranches
-            else:
-                # Check subbranches recursively if the current branch doesn't match
-                filtered_subbranches = self.filter_branches_by_string(subbranches, search_string)
-                if filtered_subbranches:
-                    filtered_structure[key] = filtered_subbranches
-
-        return filtered_structure
-        
+    # Search is applied once typing pauses for SEARCH_DEBOUNCE_MS
     def on_search_input_change(self, *args):
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def apply_search(self):
+        self.search_after_id = None
+        self.search_generation += 1
         search_term = self.search_var.get()
-        filtered_structure = self.filter_branches_by_string(self.branches_structure, search_term)
+        if not search_term:
+            self.show_search_results(self.search_generation, self.branches_structure or {}, False)
+            return
+        self.search_executor.submit(self.run_search, self.search_generation, self.branch_search_index, search_term, self.search_mode.get())
+
+    # Runs on the search thread, top results are posted to the UI thread first and the rest after them
+    def run_search(self, generation, search_index, search_term, search_mode):
+        if generation != self.search_generation:
+            return
+        try:
+            if search_mode == SEARCH_MODE_FUZZY:
+                path_ids = search_index.fuzzy_search(search_term, SEARCH_TOP_RESULTS)
+            elif search_mode == SEARCH_MODE_REGEX:
+                path_ids = search_index.regex_search(search_term)
+            else:
+                path_ids = search_index.search(search_term)
+        except re.error as e:
+            post_to_ui(self.show_search_message, generation, f"Invalid regular expression: {e}", key='search_top')
+            return
+        top_path_ids = path_ids[:SEARCH_TOP_RESULTS]
+        post_to_ui(self.show_search_results, generation, search_index.structure(top_path_ids), True, key='search_top')
+
+        if search_mode == SEARCH_MODE_FUZZY and len(path_ids) == SEARCH_TOP_RESULTS:
+            path_ids = search_index.fuzzy_search(search_term)
+        if len(path_ids) > len(top_path_ids) and generation == self.search_generation:
+            post_to_ui(self.show_search_results, generation, search_index.structure(path_ids), False, False, key='search_rest')
+
+    def show_search_message(self, generation, message):
+        if generation == self.search_generation:
+            self.branches_tree.heading("#0", text=message, anchor=tk.W)
+
+    def show_search_results(self, generation, filtered_structure, expand, replace=True):
+        if generation != self.search_generation:
+            return
         if not filtered_structure:
             message = "No results found."
             self.branches_tree.heading("#0", text=message, anchor=tk.W)
         else:
             message = f'Branches on {self.org_combo.get()}/{self.repo_combo.get()}'
             self.branches_tree.heading("#0", text=message)
-        self.branches_tree.delete(*self.branches_tree.get_children())
-        self.populate_tree(self.branches_tree, filtered_structure)
-        for item in self.branches_tree.get_children():
-            self.recurse_children(item,True)
-        self.github = github
+        if replace:
+            # Work queued by the previous search is replaced, the diff is taken against what the tree holds now
+            self.tree_work_queue.clear()
+            self.sync_tree(self.branches_tree, '', filtered_structure, expand)
+        else:
+            # Queued after the inserts of the top results, so the diff sees them
+            self.schedule_tree_work(lambda: self.sync_tree(self.branches_tree, '', filtered_structure, expand))
+
+    # Apply structure to the children of parent as a diff: missing items are inserted, extra items deleted,
+    # kept items are left in place with their open state (opened when expand is set)
+    def sync_tree(self, tree, parent, structure, expand):
+        existing = {}
+        for item in tree.get_children(parent):
+            text = tree.item(item, 'text')
+            if text in structure and TREE_PLACEHOLDER_TAG not in tree.item(item, 'tags'):
+                existing[text] = item
+            else:
+                self.forget_tree_item(tree, item)
+                tree.delete(item)
+
+        for index, (text, children) in enumerate(structure.items()):
+            item = existing.get(text)
+            if item is None:
+                self.schedule_tree_work(lambda index=index, text=text, children=children: self.insert_tree_node(tree, parent, text, children, expand, index))
+            elif not children:
+                continue
+            elif item in self.pending_tree_nodes:
+                self.pending_tree_nodes[item] = children
+                if expand:
+                    tree.item(item, open=True)
+                    self.materialize_tree_item(tree, item, expand)
+            else:
+                if expand:
+                    tree.item(item, open=True)
+                self.schedule_tree_work(lambda item=item, children=children: self.sync_tree(tree, item, children, expand))
+
+    # Drop bookkeeping of an item and its inserted descendants before it's deleted
+    def forget_tree_item(self, tree, item):
+        self.pending_tree_nodes.pop(item, None)
+        self.tree_items.pop(self.tree_item_paths.pop(item, None), None)
+        for child in tree.get_children(item):
+            self.forget_tree_item(tree, child)
 
     def setup_ui(self):
         self.menu_bar = tk.Menu(self.root)
@@ -492,13 +897,23 @@ class App:
         self.search_var = tk.StringVar()
         self.search_label = tk.Label(self.search_bar_frame, text="Search:")
         self.search_label.pack(side="left", padx=10, pady=10)
+        self.search_mode = tk.StringVar(value=SEARCH_MODE_SUBSTRING)
+        search_mode_combo = ttk.Combobox(self.search_bar_frame, textvariable=self.search_mode, state='readonly', width=10,
+                                         values=(SEARCH_MODE_SUBSTRING, SEARCH_MODE_FUZZY, SEARCH_MODE_REGEX))
+        search_mode_combo.pack(side="right", padx=(0, 10), pady=10)
         search_entry = tk.Entry(self.search_bar_frame, textvariable=self.search_var)
         search_entry.pack(pady=10, padx=10, fill=tk.X)
+        # Team view fetches only the default team's feature branches from GitHub
+        self.team_view = tk.BooleanVar(value=False)
+        self.team_view_check = tk.Checkbutton(self.treeview_frame, text=f"Only {self.default_team} branches", variable=self.team_view,
+                                              command=self.refresh_tree_in_background, anchor='w')
+        self.team_view_check.pack(fill=tk.X, side='top', padx=10)
 
         self.branches_tree = ttk.Treeview(self.treeview_frame, selectmode="none", yscrollcommand=self.vertical_scrollbar.set, xscrollcommand=self.horizontal_scrollbar.set)
         self.branches_tree.pack(fill=tk.BOTH, expand=True)
         self.branches_tree.column("#0", stretch=False)
         self.search_var.trace_add("write", self.on_search_input_change)
+        self.search_mode.trace_add("write", self.on_search_input_change)
         self.vertical_scrollbar.config(command=self.branches_tree.yview)
         self.horizontal_scrollbar.config(command=self.branches_tree.xview)
         
@@ -507,11 +922,17 @@ class App:
         self.menu = tk.Menu(self.contents_frame, tearoff=0)
 
         self.username = self.github_client.get_username()
-        self.username_label = tk.Label(self.contents_frame, text=f"Logged in as: {self.username}")
+        username_text = f"Logged in as: {self.username}"
+        if self.github_client.offline:
+            username_text += " (offline, read-only)"
+        self.username_label = tk.Label(self.contents_frame, text=username_text)
         self.username_label.pack(side='top', fill='x')
+        self.quota_label = tk.Label(self.contents_frame, text="API quota: unknown")
+        self.quota_label.pack(side='top', fill='x')
+        self.update_quota_label()
 
 
-        self.orgs = self.github_client.get_organizations_names()
+        self.orgs = self.github_client.get_organizations_names(cached=True)
         self.org_label = tk.Label(self.contents_frame, text="Organization:")
         self.org_label.pack(side='top', fill='x')
         self.org_combo = ttk.Combobox(self.contents_frame, values=self.orgs)
@@ -527,6 +948,10 @@ class App:
         # Initialize the tooltip functionality for the treeview
         TreeviewTooltip(self.github_client, self.org_combo, self.repo_combo, self.branches_tree, tooltip_text)
 
+        # Background work with progress and cancellation, replaces the modal "Processing..." popups
+        self.task_panel = TaskPanel(self.contents_frame, get_task_runtime())
+        self.task_panel.pack(side='top', fill='x')
+
         self.log_label = tk.Label(self.contents_frame, text="Log:")
         self.log_label.pack(side='top', fill='x')
         log_text = tk.Text(self.contents_frame, state='disabled')  # Create a Text widget
@@ -538,7 +963,15 @@ class App:
         log_text.config(yscrollcommand=self.vertical_log_scrollbar.set)
                 
         # Redirect stdout to the Text widget
-        sys.stdout = TextHandler(log_text)
+        sys.stdout = TextHandler(log_text, (App.load_config() or {}).get("log_max_lines", LOG_MAX_LINES))
+
+    # Shows the last reported GitHub API quota, refreshed periodically on the UI thread
+    def update_quota_label(self):
+        quota = get_transport().rate_limiter.quota()
+        if quota is not None:
+            reset_time = datetime.datetime.fromtimestamp(quota['reset']).strftime('%H:%M:%S')
+            self.quota_label.config(text=f"API quota ({quota['resource']}): {quota['remaining']}/{quota['limit']}, resets at {reset_time}")
+        self.root.after(QUOTA_REFRESH_INTERVAL_MS, self.update_quota_label)
 
     def recurse_children(self, item, open):
         self.branches_tree.item(item, open=open)  
@@ -547,7 +980,16 @@ class App:
 
     def expand_all(self):
         item_sel = self.last_tree_item_rightclicked
-        self.recurse_children(item_sel, True)
+        self.schedule_tree_work(lambda: self.expand_tree_item(self.branches_tree, item_sel))
+
+    # Opens an item and everything below it, not inserted subtrees are inserted already opened
+    def expand_tree_item(self, tree, item):
+        tree.item(item, open=True)
+        if item in self.pending_tree_nodes:
+            self.materialize_tree_item(tree, item, expand=True)
+            return
+        for child in tree.get_children(item):
+            self.schedule_tree_work(lambda child=child: self.expand_tree_item(tree, child))
 
     def collapse_all(self):
         item_sel = self.last_tree_item_rightclicked
@@ -555,57 +997,237 @@ class App:
 
     def setup_actions(self):
         self.branches_tree.bind('<Button-3>', self.on_right_click)
-        self.org_combo.bind('<<ComboboxSelected>>', self.update_repos)
-        self.repo_combo.bind('<<ComboboxSelected>>', self.update_tree)
+        self.branches_tree.bind('<<TreeviewOpen>>', self.on_tree_open)
+        self.org_combo.bind('<<ComboboxSelected>>', self.on_org_selected)
+        self.repo_combo.bind('<<ComboboxSelected>>', self.on_repo_selected)
         if self.default_org in self.orgs:
             org_index = self.orgs.index(self.default_org)
             self.org_combo.current(org_index)
-            self.update_repos(None)
+            self.update_repos(None, cached=True)
 
     # Refresh branches tree view with the latest branch structure for selected organization and repository
-    def refresh_branches_by_config(self):
+    def refresh_branches_by_config(self, cached=False):
         org_name = self.org_combo.get()
         repo_name = self.repo_combo.get()
-        self.branches_structure = self.github_client.get_repo_branches_structure(org_name, repo_name)
+        self.show_branches_structure(self.github_client.get_repo_branches_structure(org_name, repo_name, cached, self.branches_prefix()))
+
+    # Namespace of the branches shown in the tree, empty for all branches
+    def branches_prefix(self):
+        return f"Features/{self.default_team}/" if self.team_view.get() else ''
+
+    def show_branches_structure(self, branches_structure):
+        self.branches_structure = branches_structure
+        # Paths are collected here, our own writes change the structure in place later on
+        paths = []
+        collect_branch_paths(self.branches_structure or {}, '', paths)
+        self.search_index_generation += 1
+        self.search_executor.submit(self.build_search_index, self.search_index_generation, paths)
         self.clear_branches_tree()
         
         heading_text=f'Branches on {self.org_combo.get()}/{self.repo_combo.get()}'
+        if self.branches_prefix():
+            heading_text += f' ({self.branches_prefix()}*)'
         self.branches_tree.heading("#0", text = heading_text, anchor=tk.W)
         text_width = tk.font.Font().measure(heading_text)
         self.branches_tree.column("#0", width=text_width, stretch=False)
         self.populate_tree(self.branches_tree, self.branches_structure)
 
 
+    # Runs on the search thread. Searches queued before the new index is swapped in keep the index they were
+    # submitted with, branch writes queued after the build are applied to the new index.
+    def build_search_index(self, generation, paths):
+        if generation != self.search_index_generation:
+            return
+        search_index = BranchSearchIndex.from_paths(paths)
+        # Objects allocated by the build are collected now, otherwise the first search pays for a full collection
+        gc.collect()
+        if generation != self.search_index_generation:
+            return
+        self.branch_search_index = search_index
+        post_to_ui(self.on_search_index_built, generation, key='search_index')
+
+    # Results of a search applied while the index was being built came from the previous structure
+    def on_search_index_built(self, generation):
+        if generation == self.search_index_generation and self.search_var.get():
+            self.apply_search()
+
     def clear_branches_tree(self):
+        # Drop inserts still queued for the old tree
+        self.tree_work_queue.clear()
+        self.pending_tree_nodes.clear()
+        self.tree_items.clear()
+        self.tree_item_paths.clear()
         self.branches_tree.delete(*self.branches_tree.get_children())
 
-    # Recursively populate branches tree with nested branch structure
-    def populate_tree(self, tree, node, parent=''):
+    # Populate branches tree lazily: only children of parent are inserted, deeper levels get a placeholder
+    # and are inserted when opened. With expand every level is inserted, already opened.
+    def populate_tree(self, tree, node, parent='', expand=False):
         if isinstance(node, dict):
             for k, v in node.items():
-                if len(v) != 0:
-                    new_node = tree.insert(parent, 'end', text=k, tags=("branch_tree",))
-                else:
-                    new_node = tree.insert(parent, 'end', text=k, tags=("branch_tree", "has_tooltip",))
-                self.populate_tree(tree, v, new_node)
+                self.schedule_tree_work(lambda k=k, v=v: self.insert_tree_node(tree, parent, k, v, expand))
         elif isinstance(node, list):
             for v in node:
-                tree.insert(parent, 'end', text=v, tags=("branch_tree", "has_tooltip",))
+                self.schedule_tree_work(lambda v=v: self.insert_tree_node(tree, parent, v, {}, expand))
+
+    def insert_tree_node(self, tree, parent, text, children, expand, index='end'):
+        path = f"{self.tree_item_paths[parent]}/{text}" if parent else text
+        if len(children) == 0:
+            new_node = tree.insert(parent, index, text=text, tags=("branch_tree", "has_tooltip",))
+            self.tree_items[path] = new_node
+            self.tree_item_paths[new_node] = path
+            return
+        new_node = tree.insert(parent, index, text=text, tags=("branch_tree",), open=expand)
+        self.tree_items[path] = new_node
+        self.tree_item_paths[new_node] = path
+        if expand:
+            self.populate_tree(tree, children, new_node, expand)
+        else:
+            tree.insert(new_node, 'end', text='', tags=(TREE_PLACEHOLDER_TAG,))
+            self.pending_tree_nodes[new_node] = children
+
+    # Replace the placeholder of an item with its children
+    def materialize_tree_item(self, tree, item, expand=False):
+        children = self.pending_tree_nodes.pop(item, None)
+        if children is None:
+            return
+        tree.delete(*tree.get_children(item))
+        self.populate_tree(tree, children, item, expand)
+
+    def on_tree_open(self, event):
+        item = self.branches_tree.focus()
+        if item not in self.pending_tree_nodes:
+            # Opened without focus change (e.g. keyboard), find opened items still holding a placeholder
+            opened = [pending for pending in self.pending_tree_nodes if self.branches_tree.item(pending, 'open')]
+            for pending in opened:
+                self.materialize_tree_item(self.branches_tree, pending)
+            return
+        self.materialize_tree_item(self.branches_tree, item)
+
+    # Our own writes are shown without fetching the branches again: branches_structure and the search index
+    # are updated in place and only the items on the branch path are inserted or deleted, so opened items
+    # and the scroll position stay as they are
+    def insert_branch_path(self, branch_name):
+        if self.branches_structure is None or not branch_name.startswith(self.branches_prefix()):
+            return
+        node = self.branches_structure
+        for part in branch_name.split('/'):
+            node = node.setdefault(part, {})
+        # Index is read on the search thread, so a write queued during a build reaches the new index
+        self.search_executor.submit(lambda: self.branch_search_index.add_path(branch_name))
+        self.sync_branch_path(branch_name)
+
+    # Levels left without branches are pruned together with the branch
+    def remove_branch_path(self, branch_name):
+        if self.branches_structure is None:
+            return
+        parts = branch_name.split('/')
+        nodes = [self.branches_structure] # nodes[depth] holds parts[depth]
+        for part in parts[:-1]:
+            node = nodes[-1].get(part)
+            if node is None:
+                return
+            nodes.append(node)
+        if nodes[-1].get(parts[-1]) != {}:
+            return # Not a branch of the structure
+        depth = len(parts)
+        del nodes[depth - 1][parts[depth - 1]]
+        while depth > 1 and not nodes[depth - 1]:
+            depth -= 1
+            del nodes[depth - 1][parts[depth - 1]]
+        self.search_executor.submit(lambda: self.branch_search_index.remove_path(branch_name))
+        self.sync_branch_path('/'.join(parts[:depth]))
+
+    # Callable from any thread, e.g. by dialogs creating branches in a task
+    def request_branch_insert(self, branch_name):
+        post_to_ui(self.insert_branch_path, branch_name)
+
+    def sync_branch_path(self, path):
+        if self.search_var.get():
+            # Tree shows search results, the search runs again after the index update queued before it
+            self.apply_search()
+            return
+        # Queued after inserts still pending, so the items they add are found
+        self.schedule_tree_work(lambda: self.apply_branch_path(self.branches_tree, path))
+
+    # Bring the tree items on path in line with branches_structure
+    def apply_branch_path(self, tree, path):
+        parent = ''
+        node = self.branches_structure
+        parts = path.split('/')
+        for depth, part in enumerate(parts):
+            if parent in self.pending_tree_nodes:
+                # Children of parent are not inserted yet, they are inserted from the updated structure when opened
+                self.pending_tree_nodes[parent] = node
+                return
+            item = self.tree_items.get('/'.join(parts[:depth + 1]))
+            children = node.get(part)
+            if children is None:
+                if item is not None:
+                    self.forget_tree_item(tree, item)
+                    tree.delete(item)
+                return
+            if item is None:
+                self.insert_tree_node(tree, parent, part, children, False)
+                return
+            parent, node = item, children
+
+    # Tree inserts run in chunks of TREE_INSERT_CHUNK_SIZE, the rest continues on the next event loop tick
+    def schedule_tree_work(self, work):
+        self.tree_work_queue.append(work)
+        if not self.tree_work_scheduled:
+            self.tree_work_scheduled = True
+            self.root.after_idle(self.process_tree_work)
+
+    def process_tree_work(self):
+        for _ in range(TREE_INSERT_CHUNK_SIZE):
+            if not self.tree_work_queue:
+                break
+            self.tree_work_queue.popleft()()
+        if self.tree_work_queue:
+            self.root.after(1, self.process_tree_work)
+        else:
+            self.tree_work_scheduled = False
                 
     # Update repository combo box based on selected organization and set default if available
-    def update_repos(self, event, last_selected_index = 0):
+    def update_repos(self, event, last_selected_index = 0, cached=False):
         org_name = self.org_combo.get()
-        repos = self.github_client.get_organization_repos_names(org_name)
+        repos = self.github_client.get_organization_repos_names(org_name, cached)
         self.repo_combo['values'] = repos
         self.repo_combo.current(last_selected_index)
         
-        self.update_tree(None)
+        self.update_tree(None, cached)
 
 
 
     # Refresh tree view with branches from the selected repository
-    def update_tree(self, event):
-        self.refresh_branches_by_config()
+    def update_tree(self, event, cached=False):
+        self.refresh_branches_by_config(cached)
+
+    # A selection is rendered from the last known data right away, fresh data is fetched in the background and swapped in
+    def on_org_selected(self, event):
+        self.update_repos(event, cached=True)
+        self.revalidate()
+
+    def on_repo_selected(self, event):
+        self.update_tree(event, cached=True)
+        if not self.github_client.offline:
+            self.refresh_tree_in_background()
+
+    def refresh_tree_in_background(self):
+        org_name = self.org_combo.get()
+        repo_name = self.repo_combo.get()
+        prefix = self.branches_prefix()
+        get_task_runtime().submit(f"Load branches of {org_name}/{repo_name}", self.fetch_branches_structure, org_name, repo_name, prefix)
+
+    def fetch_branches_structure(self, task, org_name, repo_name, prefix):
+        branches_structure = self.github_client.get_repo_branches_structure(org_name, repo_name, prefix=prefix)
+        post_to_ui(self.show_fetched_branches_structure, org_name, repo_name, prefix, branches_structure, key='branches_structure')
+
+    def show_fetched_branches_structure(self, org_name, repo_name, prefix, branches_structure):
+        # Selection changed while fetching, the newer selection brings its own branches
+        if (org_name, repo_name, prefix) != (self.org_combo.get(), self.repo_combo.get(), self.branches_prefix()):
+            return
+        self.show_branches_structure(branches_structure)
 
     # Opens a configuration dialog for selecting organization, repository, and hostname.
     def open_config_dialog(self):
@@ -696,12 +1318,14 @@ class App:
             new_git_hostname = git_hostname_entry.get()
 
             if all([new_org, new_repo, new_git_hostname]):
-                config = {
+                # Keep settings that are not edited in this dialog (e.g. HTTP transport settings)
+                config = App.load_config() or {}
+                config.update({
                     'default_organization': new_org,
                     'default_repository': new_repo,
                     'default_team': new_team,
                     'GIT_HOSTNAME': new_git_hostname
-                }
+                })
 
                 self.save_config(config)
                 self.default_team = new_team
@@ -780,17 +1404,70 @@ class App:
         self.repo_combo.set(self.default_repo)
         print_message(MessageType.INFO, f'Using organization: {self.default_org}, repository: {self.default_repo}, team: {team}') 
             
-    def fetch_data(self):
-        last_selected_index = self.repo_combo.current()
-        self.update_repos(None, last_selected_index)
-        self.orgs = self.github_client.get_organizations_names()
+    # Runs as a task, only GitHub is called here, widgets are updated on the UI thread
+    def fetch_data(self, task, org_name, last_selected_index, prefix):
+        task.set_total(3)
+        repos = self.github_client.get_organization_repos_names(org_name)
+        task.step()
+        repo_name = ''
+        if repos:
+            repo_name = repos[last_selected_index] if 0 <= last_selected_index < len(repos) else repos[0]
+        branches_structure = self.github_client.get_repo_branches_structure(org_name, repo_name, prefix=prefix) if repo_name else {}
+        task.step()
+        orgs = self.github_client.get_organizations_names()
+        task.step()
+        post_to_ui(self.show_fetched_data, org_name, orgs, repos, repo_name, branches_structure, key='fetched_data')
+        self.print_response_cache_stats()
+
+    def show_fetched_data(self, org_name, orgs, repos, repo_name, branches_structure):
+        self.orgs = orgs
         self.org_combo['values'] = self.orgs
+        # Organization changed while fetching, its repositories were loaded by the selection
+        if org_name != self.org_combo.get():
+            return
+        self.repo_combo['values'] = repos
+        if repo_name:
+            self.repo_combo.current(repos.index(repo_name))
+        self.show_branches_structure(branches_structure)
+
+    # Selection is read on the UI thread, the fetch runs in the background. Only one fetch runs at a time,
+    # refreshes requested meanwhile are merged into a single fetch started once the running one finishes.
+    def fetch_data_in_background(self):
+        if self.fetch_in_flight:
+            self.fetch_requested = True
+            return
+        self.fetch_in_flight = True
+        org_name = self.org_combo.get()
+        last_selected_index = self.repo_combo.current()
+        task = get_task_runtime().submit(f"Load repositories of {org_name}", self.fetch_data, org_name, last_selected_index, self.branches_prefix())
+        # Also called when the fetch failed or was cancelled
+        task.future.add_done_callback(lambda future: post_to_ui(self.on_fetch_data_done))
+
+    def on_fetch_data_done(self):
+        self.fetch_in_flight = False
+        if self.fetch_requested:
+            self.fetch_requested = False
+            self.fetch_data_in_background()
+
+    # Shows how many GitHub GET requests were answered with 304 (not counted against the rate limit) or shared with an identical one
+    def print_response_cache_stats(self):
+        response_cache = get_transport().cache
+        if response_cache is None:
+            return
+        stats = response_cache.stats()
+        single_flight_stats = get_transport().single_flight.stats()
+        print_message(MessageType.INFO, f"Response cache: <b>{stats['hits']}</b> hits, <b>{stats['misses']}</b> misses, <b>{stats['not_modified']}</b> served as 304 (not modified), <b>{single_flight_stats['shared']}</b> identical requests deduplicated.")
          
     def refresh(self):
         self.clear_branches_tree()
         self.branches_tree.heading("#0", text="Please wait. Refreshing data...", anchor=tk.W)
-        thread = threading.Thread(target=self.fetch_data)
-        thread.start()
+        self.fetch_data_in_background()
+
+    # UI is first rendered from snapshots, fresh data is fetched in the background and swapped in when it arrives
+    def revalidate(self):
+        if self.github_client.offline:
+            return
+        self.fetch_data_in_background()
 
     def get_full_branch_name(self, item):
         """
@@ -869,7 +1546,7 @@ class App:
         if new_branch:
             message = f"New branch created: <b>{new_branch} on {org_name}/{repo_name}</b>."
             print_message(MessageType.INFO, message)
-            self.update_tree(None) # Update tree to reflect changes
+            self.insert_branch_path(new_branch) # Update tree to reflect changes
         else:
             message = f"Creating branch from <b>{branch_name} on {org_name}/{repo_name}</b> canceled!"
             print_message(MessageType.WARNING, message)
@@ -885,7 +1562,7 @@ class App:
         # Check the result
         if result:
             print_message(MessageType.INFO, f"Branch deleted: <b>{branch_name} on {org_name}/{repo_name}<b>.")
-            self.branches_tree.delete(selected_item)
+            self.remove_branch_path(branch_name)
         else:
             message = f"Deleting branch <b>{branch_name} on {org_name}/{repo_name}</b> canceled!"
             print_message(MessageType.WARNING, message)
@@ -911,7 +1588,7 @@ class App:
     def __delete_branch_with_submodules(self, branch_name):
         """
         Deletes a specified branch in the main repository and its associated submodules 
-        via the GitHub API, and refreshes the TreeView UI component after successful deletion.
+        via the GitHub API, and removes the branch from the TreeView UI component after successful deletion.
 
         Args:
             branch_name (str): The name of the branch to delete.
@@ -925,7 +1602,7 @@ class App:
             4. Displays a confirmation dialog (DeleteWithSubmodulesDialog) to proceed with the deletion.
                 - The dialog lists submodules and requires user confirmation before deletion.
             5. If deletion is confirmed, the dialog triggers the actual deletion of the branch and its submodules.
-            6. After deletion, the TreeView UI component (branches_tree) is refreshed via the refresh method.
+            6. After deletion, the branch is removed from the TreeView UI component (branches_tree) via remove_branch_path.
 
         Raises:
             Exception: If any errors occur during the process, they are caught and displayed in an error dialog box.
@@ -933,7 +1610,7 @@ class App:
         Dependencies:
             - Requires a GitHub client instance (self.github) to interact with the GitHub API.
             - Relies on the DeleteWithSubmodulesDialog for user confirmation and deletion logic.
-            - The refresh method is called after successful deletion to update the TreeView UI.
+            - The remove_branch_path method is called after successful deletion to update the TreeView UI.
         """
         try:
             # Fetch organization and repository details from ComboBoxes
@@ -942,8 +1619,7 @@ class App:
 
             # Fetch the .gitmodules file content from the remote branch
             try:
-                org = self.github.get_organization(org_name)
-                repo = org.get_repo(repo_name)
+                repo = self.github_client.get_repo_handle(org_name, repo_name)
                 file_content = repo.get_contents(
                     GITMODULES_FILENAME, ref=branch_name
                 )
@@ -972,7 +1648,8 @@ class App:
 
             # Open confirmation dialog for branch deletion
             DeleteWithSubmodulesDialog(
-                self.root, self.github_client, org_name, repo_name, branch_name, submodules, self.refresh
+                self.root, self.github_client, org_name, repo_name, branch_name, submodules,
+                lambda: self.remove_branch_path(branch_name)
             )
         except Exception as e:
             print_message(
@@ -983,6 +1660,7 @@ class App:
                 f"An error occurred while deleting branch and submodules: {str(e)}.")
 
     def update_github_token(self):
+        global token
         token_dialog = TokenDialog(self.root)
         updated_token = token_dialog.result
         if not updated_token:
@@ -992,6 +1670,9 @@ class App:
             test_github_client = GitHubClient(GIT_HOSTNAME, updated_token) 
             save_credentials("BranchBrowser", "github_token", updated_token)
             print_message(MessageType.INFO, "Credentials for 'BranchBrowser' have been saved successfully.")
+            # New token is used right away, cached handles of the previous one are invalidated
+            token = updated_token
+            self.github_client.set_token(updated_token)
         except Exception as e:
             handle_and_print_exception(e, 'Token not valid.')
 
@@ -1003,7 +1684,7 @@ class App:
         selected_item = self.last_tree_item_rightclicked
         branch_name = get_path(self.branches_tree, selected_item)
         print_message(MessageType.INFO, f"Manage submodules for <b>{branch_name} on {org_name}/{repo_name}</b>.")
-        SubmoduleSelectorDialog(self.root, self.github_client, org_name, repo_name, team_names, branch_name, self.update_tree)
+        SubmoduleSelectorDialog(self.root, self.github_client, org_name, repo_name, team_names, branch_name)
 
     
     def create_feature_branch(self):
@@ -1012,7 +1693,7 @@ class App:
         selected_item = self.last_tree_item_rightclicked
         branch_name = get_path(self.branches_tree, selected_item)
         print_message(MessageType.INFO, f"Create feature branch for <b>{branch_name} on {org_name}/{repo_name}</b>.")
-        CreateFeatureBranchDialog(self.root, self.github_client, org_name, repo_name, branch_name, self.update_tree, self.config_path)
+        CreateFeatureBranchDialog(self.root, self.github_client, org_name, repo_name, branch_name, self.request_branch_insert, self.config_path)
 
     def create_release_branch(self):
         org_name = self.org_combo.get()
@@ -1020,7 +1701,7 @@ class App:
         selected_item = self.last_tree_item_rightclicked
         branch_name = get_path(self.branches_tree, selected_item)
         print_message(MessageType.INFO, f"Create release branch for <b>{branch_name} on {org_name}/{repo_name}</b>.")
-        CreateReleaseBranchDialog(self.root, self.github_client, org_name, repo_name, branch_name, self.update_tree)
+        CreateReleaseBranchDialog(self.root, self.github_client, org_name, repo_name, branch_name, self.request_branch_insert)
 
 
 class TokenDialog(simpledialog.Dialog):
@@ -1068,9 +1749,10 @@ class CloneDialog(simpledialog.Dialog):
         return self.new_branch_name # initial focus
 
     def apply(self):
-        self.github_client.organization_repo_create_branch(self.org_name, self.repo_name, self.new_branch_name.get(), self.source_commit_sha.get())
-        self.result = self.new_branch_name.get()
-        print_message(MessageType.INFO, f"Created new branch <b>{self.result}</b>.")
+        # Result stays empty when the branch wasn't created, the error is already printed
+        if self.github_client.organization_repo_create_branch(self.org_name, self.repo_name, self.new_branch_name.get(), self.source_commit_sha.get()):
+            self.result = self.new_branch_name.get()
+            print_message(MessageType.INFO, f"Created new branch <b>{self.result}</b>.")
         
 
 
@@ -1091,9 +1773,9 @@ class DeleteDialog(simpledialog.Dialog):
         tk.Label(master, text=f"Are you sure you want to delete {self.branch_name}").grid(row=0)
 
     def apply(self):
-        self.github_client.organization_repo_delete_branch(self.org_name, self.repo_name, self.branch_name)
-        print_message(MessageType.INFO, f"Deleted branch <b>{self.branch_name}</b>.")
-        self.result = self.branch_name
+        if self.github_client.organization_repo_delete_branch(self.org_name, self.repo_name, self.branch_name):
+            print_message(MessageType.INFO, f"Deleted branch <b>{self.branch_name}</b>.")
+            self.result = self.branch_name
 
 
 class RepoBranchListBoxInfo:
@@ -1140,17 +1822,20 @@ class RepoBranchListBoxInfo:
 
 
 class SubmoduleSelectorDialog(simpledialog.Dialog):
-    def __init__(self, parent, github_client, org_name, repo_name, team_names, branch_name, update_tree):
+    def __init__(self, parent, github_client, org_name, repo_name, team_names, branch_name):
         self.repo_branch_right_lb_info_map = dict()
         self.repo_branch_left_lb_info_list = list()
+        self.left_items = set() # Entries of the left listbox, kept in sync with it
+        self.right_branches = list() # Filtered branches, rendered page by page into the right listbox
+        self.right_page_pending = False
 
         self.github_client = github_client
         self.org_name = org_name
         self.repo_name = repo_name
         self.team_names = team_names
         self.branch_name = branch_name
-        self.update_tree = update_tree
         self.is_filter_disabled = True
+        self.branch_indexes = dict() # (repo, prefix) -> (branch list, its BranchIndex) loaded in this dialog
 
         # Call the superclass's __init__ method
         super().__init__(parent)
@@ -1165,6 +1850,7 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
                 self.repo_branches_right_listbox.itemconfig(repo_branch_lb_info.position, {'fg': 'black'})
                 repo_branch_lb_info.set_used(False)
             self.submodules_left_listbox.delete(selected)
+            self.left_items.discard(selected_item)
 
     def move_to_left(self):
         # Move selected item from right to left - remove submodule
@@ -1176,13 +1862,52 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
                 self.repo_branches_right_listbox.itemconfig(repo_branch_lb_info.position, {'fg': 'red'})
                 repo_branch_lb_info.set_used(True)
                 self.submodules_left_listbox.insert(tk.END, selected_item)
+                self.left_items.add(selected_item)
+
+
+    # Namespace of the branches the filter shows, empty when the filter is collapsed and all branches are shown
+    def branches_prefix(self):
+        if self.is_filter_disabled:
+            return ''
+        branch_type = self.branch_type_combobox.get()
+        if branch_type == "Features":
+            return f"Features/{self.team_version_combobox.get()}/"
+        return f"{branch_type}/"
 
+    # Only the namespace shown by the filter is fetched, filtered on the server.
+    # Lists come from the session cache of the client, shared with other dialogs and prefetched for the submodules.
+    def load_branches(self):
+        repo_name = self.repos_combobox.get()
+        prefix = self.branches_prefix()
+        self.branches = self.github_client.get_organization_repo_branches(self.org_name, repo_name, prefix, cached=True)
+        # An index is reused while the client still caches the list it was built from, lists dropped after a branch
+        # was created or deleted are classified again. The index of all branches also serves every namespace of the filter.
+        self.branch_index = None
+        for key_prefix in dict.fromkeys(['', prefix]):
+            branches, index = self.branch_indexes.get((repo_name, key_prefix), (None, None))
+            if branches is not None and branches is self.github_client.get_cached_organization_repo_branches(self.org_name, repo_name, key_prefix):
+                self.branch_index = index
+                break
+        if self.branch_index is None:
+            self.branch_index = BranchIndex(self.branches)
+            self.branch_indexes[(repo_name, prefix)] = (self.branches, self.branch_index)
+
+    # Branch lists of the repositories already used as submodules are loaded in the background,
+    # so switching to them in the repository combobox is served from the session cache
+    def prefetch_submodules_branches(self):
+        repo_names = sorted({submodule_info.repo for submodule_info in self.repo_branch_left_lb_info_list} - {self.repo_name})
+        if repo_names:
+            get_task_runtime().submit(f"Prefetch branches of submodules of {self.repo_name}", self.prefetch_branches, repo_names)
+
+    def prefetch_branches(self, task, repo_names):
+        task.set_total(len(repo_names))
+        for repo_name in repo_names:
+            # The filter starts collapsed, all branches are listed
+            self.github_client.get_organization_repo_branches(self.org_name, repo_name, cached=True)
+            task.step()
 
     def extract_feature_versions(self, team_name):
-        filtered_branches = [branch for branch in self.branches if branch.startswith(f"Features/{team_name}")]
-        feature_versions = list({branch.split("/")[-2] for branch in filtered_branches})
-        sorted_feature_versions = sorted(feature_versions, key=lambda v: float(v))
-        return sorted_feature_versions
+        return self.branch_index.versions("Features", team_name)
 
 
     def on_toggle_filter(self):
@@ -1221,26 +1946,7 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         repo_name = self.repos_combobox.get()
         branch_type = self.branch_type_combobox.get()
 
-        if event and event.widget == self.repos_combobox:
-            self.branches = self.github_client.get_organization_repo_branches(self.org_name, repo_name)
-        elif event and event.widget == self.branch_type_combobox and branch_type == "Release":
-            # Changing the text of the team/version label to "Version:"
-            self.team_version_label.config(text="Version:")
-
-            # Getting only the release branches
-            release_branches = [branch for branch in self.branches if branch.startswith("Release")]
-            # Getting the versions such as 1.0, 2.0 etc.
-            versions = list({branch.split("/")[1] for branch in release_branches})
-            # Sorting the versions by their numerical value
-            sorted_versions = sorted(versions, key=lambda v: float(v))
-            # Setting the extracted versions as the values for the team/version combobox
-            self.team_version_combobox['values'] = sorted_versions
-            self.team_version_combobox.current(0)
-
-            # Removing the feature version label and combobox from the UI
-            self.feature_version_label.grid_forget()
-            self.feature_version_combobox.grid_forget()
-        elif event and event.widget == self.branch_type_combobox and branch_type == "Features":
+        if event and event.widget == self.branch_type_combobox and branch_type == "Features":
             # Changing the text of the team/version label to "Team:"
             self.team_version_label.config(text="Team:")
             
@@ -1252,6 +1958,26 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
             self.feature_version_label.grid(row=4, column=0, sticky="w", pady=(0, 5))
             self.feature_version_combobox.grid(row=4, column=1, pady=(0, 5))
 
+        # Branches of the selected repository, team and type
+        self.load_branches()
+
+        if event and event.widget == self.branch_type_combobox and branch_type == "Release":
+            # Changing the text of the team/version label to "Version:"
+            self.team_version_label.config(text="Version:")
+
+            # Getting the release versions such as 1.0, 2.0 etc., sorted by their numerical value
+            sorted_versions = self.branch_index.versions("Release")
+            # Setting the extracted versions as the values for the team/version combobox
+            self.team_version_combobox['values'] = sorted_versions
+            if len(sorted_versions) > 0:
+                self.team_version_combobox.current(0)
+            else:
+                self.team_version_combobox.set("")
+
+            # Removing the feature version label and combobox from the UI
+            self.feature_version_label.grid_forget()
+            self.feature_version_combobox.grid_forget()
+
         self.repo_branch_right_lb_info_map.clear()
 
         # Get the selected value of the team/version combobox
@@ -1270,23 +1996,41 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         # Clear the listbox
         self.repo_branches_right_listbox.delete(0, tk.END)
 
-        filtered_branches = [branch for branch in self.branches if branch.startswith(f"{branch_type}/{team_version}")]
-        # If showing feature branches filter by feature version too
-        if branch_type == "Features":
-            # Get the selected value of the feature version combobox
-            feature_version = self.feature_version_combobox.get()
-            filtered_branches = [branch for branch in filtered_branches if feature_version in branch]
-
         if self.is_filter_disabled:
             filtered_branches = self.branches
+        elif branch_type == "Features":
+            # Feature branches are filtered by team and feature version, all versions while none is selected
+            feature_version = self.feature_version_combobox.get()
+            filtered_branches = self.branch_index.branches(branch_type, team_version, feature_version or None)
+        else:
+            filtered_branches = self.branch_index.branches(branch_type, None, team_version or None)
         # Update the repo branches right listbox based on the selected values of the comboboxes
-        for index, branch in enumerate(filtered_branches):
-            repo_branch_lb_info = RepoBranchListBoxInfo(repo_name, branch, listbox_position=index)
-            repo_branch_lb_info.set_used(str(repo_branch_lb_info) in self.submodules_left_listbox.get(0, tk.END))
+        self.right_repo_name = repo_name
+        self.right_branches = filtered_branches
+        self.show_next_branches_page()
+
+    # Only the first page of rows is inserted, so large repositories open instantly. Rows of branches
+    # used as submodules are marked red, looked up in the set of left listbox entries.
+    def show_next_branches_page(self):
+        self.right_page_pending = False
+        start = self.repo_branches_right_listbox.size()
+        page = [RepoBranchListBoxInfo(self.right_repo_name, branch, listbox_position=start + index)
+                for index, branch in enumerate(self.right_branches[start:start + BRANCHES_LISTBOX_PAGE_SIZE])]
+        if not page:
+            return
+        for repo_branch_lb_info in page:
+            repo_branch_lb_info.set_used(str(repo_branch_lb_info) in self.left_items)
             self.repo_branch_right_lb_info_map[str(repo_branch_lb_info)] = repo_branch_lb_info
-            self.repo_branches_right_listbox.insert(tk.END, repo_branch_lb_info)
+        self.repo_branches_right_listbox.insert(tk.END, *page)
+        for repo_branch_lb_info in page:
             if repo_branch_lb_info.used:
-                self.repo_branches_right_listbox.itemconfig(index, {'fg': 'red'})
+                self.repo_branches_right_listbox.itemconfig(repo_branch_lb_info.position, {'fg': 'red'})
+
+    # Scroll callback of the right listbox, the next page is inserted once its end becomes visible
+    def on_right_listbox_scroll(self, first, last):
+        if float(last) >= 1.0 and not self.right_page_pending and self.repo_branches_right_listbox.size() < len(self.right_branches):
+            self.right_page_pending = True
+            self.after_idle(self.show_next_branches_page)
 
     def init_submodules_left_listbox(self):
         submodules_info = get_submodules_info(self.github_client, self.org_name, self.repo_name, self.branch_name)
@@ -1294,6 +2038,7 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         for _, repo_name, branch_name, submodule_path in submodules_info:
             submodule_info = RepoBranchListBoxInfo(repo_name, branch_name, submodule_path)
             self.submodules_left_listbox.insert(tk.END, submodule_info)
+            self.left_items.add(str(submodule_info))
             self.repo_branch_left_lb_info_list.append(submodule_info)
 
     def buttonbox(self):
@@ -1309,12 +2054,11 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         # Do the modification
         repo_submodule_manager = GitHubRepoSubmoduleManager(self.org_name, self.repo_name, token)
 
-        updated = []
-        for orig_submodule in original:
-            if repo_submodule_manager.add_or_update_submodule(self.branch_name, orig_submodule.repo, orig_submodule.path):
-                updated.append(orig_submodule.repo)
+        # All submodules are moved to their HEAD revision in a single commit
+        updated = repo_submodule_manager.update_submodules(self.branch_name, [SubmoduleChange(orig_submodule.repo, orig_submodule.path) for orig_submodule in original])
 
-        print_message(MessageType.INFO, f"Updated <b>{updated}</b> submodules to HEAD revision on <b>{self.org_name}/{self.repo_name}/{self.branch_name}</b>.")
+        updated_str = f" ({', '.join(updated)})" if updated else ''
+        print_message(MessageType.INFO, f"Updated <b>{len(updated)}</b> submodules{updated_str} to HEAD revision on <b>{self.org_name}/{self.repo_name}/{self.branch_name}</b>.")
         super().cancel()
 
     def body(self, master):
@@ -1331,7 +2075,8 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         # Create right container frame
         self.right_frame = tk.Frame(master, width=90, height=40)
 
-        org_repos_names = self.github_client.get_organization_repos_names(self.org_name)
+        # Repositories were listed by the main window already, the last known list is reused
+        org_repos_names = self.github_client.get_organization_repos_names(self.org_name, cached=True)
         org_repos_names.remove(self.repo_name)
         org_repos_names.sort()
 
@@ -1368,7 +2113,7 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         self.team_version_combobox.current(0)
 
         # Setting the initial value for branches
-        self.branches = self.github_client.get_organization_repo_branches(self.org_name, self.repos_combobox.get())
+        self.load_branches()
         # Setting the initial values for the feature versions combobox
         sorted_feature_versions = self.extract_feature_versions(self.team_version_combobox.get())
 
@@ -1382,7 +2127,8 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         self.feature_version_combobox.current(0)
 
         # Create right listbox
-        self.repo_branches_right_listbox = tk.Listbox(self.right_frame, width=90, height=40)
+        self.repo_branches_right_listbox = tk.Listbox(self.right_frame, width=90, height=40,
+                                                      yscrollcommand=self.on_right_listbox_scroll)
 
         # Create buttons
         button_right = tk.Button(master, text=">", command=self.move_to_right)
@@ -1404,6 +2150,7 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
 
         # Initialize current state of submodules for current org/repo/branch
         self.init_submodules_left_listbox()
+        self.prefetch_submodules_branches()
 
         # Call the update_listbox function
         self.update_repo_branches_right_listbox()
@@ -1413,21 +2160,16 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
         super().cancel()  # Ensure the base class cancel method is called
 
     def apply(self, event=None):
-        # Show a processing popup
-        self.processing_popup = tk.Toplevel(self)
-        self.processing_popup.geometry("200x50")
-        tk.Label(self.processing_popup, text="Processing... Please wait").pack()
-        self.processing_popup.protocol("WM_DELETE_WINDOW", lambda: None) # Disable the close button
-        self.processing_popup.grab_set()  # Make the popup modal
-
         self.submodules_left_listbox_val = self.submodules_left_listbox.get(0, tk.END)
 
-        threading.Thread(target=self.process).start()
+        # Progress is shown in the task panel, the window stays usable meanwhile
+        get_task_runtime().submit(f"Manage submodules of {self.repo_name}/{self.branch_name}", self.process)
 
-    def process(self):
+    def process(self, task):
         try:
             # Perform your action here
             print_message(MessageType.INFO, "Modifying submodules...")
+            task.set_total(1)
             original = set(self.repo_branch_left_lb_info_list)
             modified = set([RepoBranchListBoxInfo(item.split()[0][2:], item.split()[1][2:]) for item in self.submodules_left_listbox_val])
             added = modified - original
@@ -1436,12 +2178,11 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
             # Do the modification
             repo_submodule_manager = GitHubRepoSubmoduleManager(self.org_name, self.repo_name, token)
 
-            for del_submodule in deleted:
-                repo_submodule_manager.delete_submodule(self.branch_name, del_submodule.repo, del_submodule.path)
-
-            for add_submodule in added:
-                calculated_path = calculate_submodule_path(self.org_name, add_submodule.repo)
-                repo_submodule_manager.add_or_update_submodule(self.branch_name, add_submodule.repo, calculated_path, add_submodule.branch)
+            # Deletions and additions are done in a single commit
+            changes = [SubmoduleChange(del_submodule.repo, del_submodule.path, delete=True) for del_submodule in deleted]
+            changes += [SubmoduleChange(add_submodule.repo, calculate_submodule_path(self.org_name, add_submodule.repo), add_submodule.branch) for add_submodule in added]
+            repo_submodule_manager.update_submodules(self.branch_name, changes)
+            task.step()
 
             print_message(MessageType.INFO, f"Submodules updated for <b>{self.branch_name} on {self.org_name}/{self.repo_name}</b>.")
             # Convert the lists to strings
@@ -1450,13 +2191,10 @@ class SubmoduleSelectorDialog(simpledialog.Dialog):
             # Print the result
             text = f"{MessageType.INFO.value} Added: <b>{added_str}</b> ; Deleted: <b>{deleted_str}</b>"
             print_message(MessageType.INFO, text)
-            self.update_tree(None) # Update tree to reflect changes
+            # Branches are unchanged, the tree stays as it is and tooltips resolve the new head commit
         except Exception as e:
             handle_and_print_exception(e)
-
-        finally:
-            # Close the processing popup
-            self.processing_popup.destroy()
+            raise # Task ends failed in the task panel
             
 class CreateFeatureBranchDialog(simpledialog.Dialog):
     def __init__(self, parent, github_client, org_name, repo_name, branch_name, update_tree, config_path):
@@ -1543,8 +2281,8 @@ class CreateFeatureBranchDialog(simpledialog.Dialog):
         # Initial preview setup
         self.update_path_preview()
 
-        # get submodules info - only 1st level
-        self.submodules_info = get_submodules_info(self.github_client, self.org_name, self.repo_name, self.branch_name)
+        # get submodules info of all levels
+        self.submodules_info = get_submodules_hierarchy(self.github_client, self.org_name, self.repo_name, self.branch_name)
 
         tk.Label(master, text="List of branches from which feature branches will be created:", font=('TkDefaultFont', 10, 'bold')).grid(row=8, sticky='w')
 
@@ -1615,19 +2353,13 @@ class CreateFeatureBranchDialog(simpledialog.Dialog):
         super().cancel()  # Ensure the base class cancel method is called
 
     def apply(self, event=None):
-        # Show a processing popup
-        self.processing_popup = tk.Toplevel(self.master)
-        self.processing_popup.geometry("200x50")
-        tk.Label(self.processing_popup, text="Processing... Please wait").pack()
-        self.processing_popup.protocol("WM_DELETE_WINDOW", lambda: None) # Disable the close button
-        self.processing_popup.grab_set()  # Make the popup modal
-
         self.search_branch_prefix_val = self.search_branch_prefix.get()
         self.replace_feature_branch_prefix_val = self.replace_feature_branch_prefix.get()
 
-        threading.Thread(target=self.process).start()
+        # Progress is shown in the task panel, one step per created branch
+        get_task_runtime().submit(f"Create feature branches from {self.repo_name}/{self.branch_name}", self.process)
 
-    def process(self):
+    def process(self, task):
         try:
             # Perform your action here
             print_message(MessageType.INFO, "Creating feature branch structure...")
@@ -1640,35 +2372,16 @@ class CreateFeatureBranchDialog(simpledialog.Dialog):
                 print_message(MessageType.WARNING, f'Replace search branch prefix:<b>{self.search_branch_prefix_val}</b> has no effect on branch: <b>{self.branch_name}</b>. Nothing is being replaced.')
                 return
 
-            branch_commit_sha = self.github_client.get_organization_repo_branch_commit_sha(self.org_name, self.repo_name, self.branch_name)
-            self.github_client.organization_repo_create_branch(self.org_name, self.repo_name, new_branch_name, branch_commit_sha)
-            print_message(MessageType.INFO, f"Created new branch <b>{new_branch_name}</b> on top repo <b>{self.repo_name}</b>.")
-
-            for sub_m_info in self.submodules_info:
-                sub_m_repo_name = sub_m_info[1]
-                sub_m_branch_name = sub_m_info[2]
-
-                # Creeate feature branch for submodule
-                new_sub_m_branch_name = sub_m_branch_name.replace(self.search_branch_prefix_val, self.replace_feature_branch_prefix_val)
-                branch_commit_sha = self.github_client.get_organization_repo_branch_commit_sha(self.org_name, sub_m_repo_name, sub_m_branch_name)
-                self.github_client.organization_repo_create_branch(self.org_name, sub_m_repo_name, new_sub_m_branch_name, branch_commit_sha)
-                print_message(MessageType.INFO, f"Created new branch <b>{new_sub_m_branch_name}</b> on sub repo <b>{sub_m_repo_name}</b>.")
-
-                # Now on new feature branch on top level connect all submodules with its new feature branches
-                repo_submodule_manager = GitHubRepoSubmoduleManager(self.org_name, self.repo_name, token)
-                # delete old submodule 
-                repo_submodule_manager.delete_submodule(new_branch_name, sub_m_info[0], sub_m_info[3])
-                # add new submodule
-                repo_submodule_manager.add_or_update_submodule(new_branch_name, sub_m_info[0], sub_m_info[3], new_sub_m_branch_name)
+            # Create feature branches on all levels, leaves first, and connect every parent with its new submodule branches
+            create_branch_structure(self.github_client, self.org_name, self.repo_name, self.branch_name, self.submodules_info,
+                                    lambda branch_name: branch_name.replace(self.search_branch_prefix_val, self.replace_feature_branch_prefix_val))
 
             print_message(MessageType.INFO, f"Feature branch structure created for <b>{self.branch_name} on {self.org_name}/{self.repo_name}</b>.")
-            self.update_tree(None) # Update tree to reflect changes
+            self.update_tree(new_branch_name) # Add the new branch to the tree, posted to the UI thread
 
         except Exception as e:
             handle_and_print_exception(e)
-        finally:
-            # Close the processing popup
-            self.processing_popup.destroy()    
+            raise # Task ends failed in the task panel
 
 class CreateReleaseBranchDialog(simpledialog.Dialog):
     def __init__(self, parent, github_client, org_name, repo_name, branch_name, update_tree):
@@ -1697,10 +2410,8 @@ class CreateReleaseBranchDialog(simpledialog.Dialog):
         self.replace_branch_pattern.insert(0, self.branch_name)
         self.replace_branch_pattern.grid(row=1, column=1)
 
-        # get submodules info
-        self.submodules_info = get_submodules_info(self.github_client, self.org_name, self.repo_name, self.branch_name)
-        # extend with sub sub module info
-        self.submodules_info =[sub_m_info + (get_submodules_info(self.github_client, self.org_name, sub_m_info[1], sub_m_info[2]),) for sub_m_info in self.submodules_info]
+        # get submodules info of all levels
+        self.submodules_info = get_submodules_hierarchy(self.github_client, self.org_name, self.repo_name, self.branch_name)
 
         tk.Label(master, text="List of branches from which new branches will be created:", font=('TkDefaultFont', 10, 'bold')).grid(row=2, sticky='w')
 
@@ -1713,19 +2424,13 @@ class CreateReleaseBranchDialog(simpledialog.Dialog):
         super().cancel()  # Ensure the base class cancel method is called
 
     def apply(self, event=None):
-        # Show a processing popup
-        self.processing_popup = tk.Toplevel(self.master)
-        self.processing_popup.geometry("200x50")
-        tk.Label(self.processing_popup, text="Processing... Please wait").pack()
-        self.processing_popup.protocol("WM_DELETE_WINDOW", lambda: None) # Disable the close button
-        self.processing_popup.grab_set()  # Make the popup modal
-
         self.search_branch_pattern_val = self.search_branch_pattern.get()
         self.replace_branch_pattern_val = self.replace_branch_pattern.get()
 
-        threading.Thread(target=self.process).start()
+        # Progress is shown in the task panel, one step per created branch
+        get_task_runtime().submit(f"Create release branches from {self.repo_name}/{self.branch_name}", self.process)
 
-    def process(self):
+    def process(self, task):
         try:
             # Perform your action here
             print_message(MessageType.INFO, "Creating release branch structure...")
@@ -1738,60 +2443,50 @@ class CreateReleaseBranchDialog(simpledialog.Dialog):
                 print_message(MessageType.WARNING, f'Replace search branch pattern:<b>{self.search_branch_pattern_val}</b> has no effect on branch: <b>{self.branch_name}</b>. Nothing is being replaced.')
                 return
 
-            branch_commit_sha = self.github_client.get_organization_repo_branch_commit_sha(self.org_name, self.repo_name, self.branch_name)
-            self.github_client.organization_repo_create_branch(self.org_name, self.repo_name, new_branch_name, branch_commit_sha)
-            print_message(MessageType.INFO, f"Created new branch <b>{new_branch_name}</b> on top repo <b>{self.repo_name}</b>.")
-
-            for sub_m_info in self.submodules_info:
-                sub_m_repo_name = sub_m_info[1]
-                sub_m_branch_name = sub_m_info[2]
-
-                # Creeate release branch for submodule
-                new_sub_m_branch_name = sub_m_branch_name.replace(self.search_branch_pattern_val, self.replace_branch_pattern_val)
-                branch_commit_sha = self.github_client.get_organization_repo_branch_commit_sha(self.org_name, sub_m_repo_name, sub_m_branch_name)
-                self.github_client.organization_repo_create_branch(self.org_name, sub_m_repo_name, new_sub_m_branch_name, branch_commit_sha)
-                print_message(MessageType.INFO, f"Created new branch <b>{new_sub_m_branch_name}</b> on sub repo <b>{sub_m_repo_name}</b>.")
-
-                for sub_sub_m_info in sub_m_info[4]:
-                    sub_sub_m_repo_name = sub_sub_m_info[1]
-                    sub_sub_m_branch_name = sub_sub_m_info[2]
-
-                    # Creeate release branch for sub submodule
-                    new_sub_sub_m_branch_name = sub_sub_m_branch_name.replace(self.search_branch_pattern_val, self.replace_branch_pattern_val)
-                    branch_commit_sha = self.github_client.get_organization_repo_branch_commit_sha(self.org_name, sub_sub_m_repo_name, sub_sub_m_branch_name)
-                    self.github_client.organization_repo_create_branch(self.org_name, sub_sub_m_repo_name, new_sub_sub_m_branch_name, branch_commit_sha)
-                    print_message(MessageType.INFO, f"Created new branch <b>{new_sub_sub_m_branch_name}</b> on sub sub repo <b>{sub_sub_m_repo_name}</b>.")
-
-                    # Now on new feature branch on first level submodule connect all sub submodules with its new feature branches
-                    repo_submodule_manager = GitHubRepoSubmoduleManager(self.org_name, sub_m_repo_name, token)
-                    # delete old submodule 
-                    repo_submodule_manager.delete_submodule(new_sub_m_branch_name, sub_sub_m_info[0], sub_sub_m_info[3])
-                    # add new submodule
-                    repo_submodule_manager.add_or_update_submodule(new_sub_m_branch_name, sub_sub_m_info[0], sub_sub_m_info[3], new_sub_sub_m_branch_name)
-
-                # Now on new feature branch on top level connect all submodules with its new feature branches
-                repo_submodule_manager = GitHubRepoSubmoduleManager(self.org_name, self.repo_name, token)
-                # delete old submodule 
-                repo_submodule_manager.delete_submodule(new_branch_name, sub_m_info[0], sub_m_info[3])
-                # add new submodule
-                repo_submodule_manager.add_or_update_submodule(new_branch_name, sub_m_info[0], sub_m_info[3], new_sub_m_branch_name)
+            # Create release branches on all levels, leaves first, and connect every parent with its new submodule branches
+            create_branch_structure(self.github_client, self.org_name, self.repo_name, self.branch_name, self.submodules_info,
+                                    lambda branch_name: branch_name.replace(self.search_branch_pattern_val, self.replace_branch_pattern_val))
 
             print_message(MessageType.INFO, f"Release branch structure created for <b>{self.branch_name} on {self.org_name}/{self.repo_name}</b>.")
-            self.update_tree(None) # Update tree to reflect changes
+            self.update_tree(new_branch_name) # Add the new branch to the tree, posted to the UI thread
 
         except Exception as e:
             handle_and_print_exception(e)
-        finally:
-            # Close the processing popup
-            self.processing_popup.destroy()         
+            raise # Task ends failed in the task panel
 
 
 def get_submodules_info(github_client, org_name, repo_name, branch_name):
-    gitmodules_content = github_client.get_organization_repo_branch_gitmodules_content(org_name, repo_name, branch_name)
+    submodules = github_client.get_organization_repo_branch_submodules(org_name, repo_name, branch_name)
+    return follow_top_branch(submodules, branch_name)
+
+
+# Same as get_submodules_info for several (repo, branch) pairs, looked up concurrently
+def get_submodules_infos(github_client, org_name, repo_branches):
+    submodules_list = github_client.get_organization_repos_branches_submodules(org_name, repo_branches)
+    return [follow_top_branch(submodules, branch_name) for (_, branch_name), submodules in zip(repo_branches, submodules_list)]
+
+
+# Number of the last page of a paginated REST response, 1 when there is only one page
+def last_page_number(response):
+    last_url = response.links.get('last', {}).get('url')
+    if not last_url:
+        return 1
+    return int(parse_qs(urlparse(last_url).query).get('page', ['1'])[0])
+
+
+# Submodules without branch follow the branch of the top repo
+def follow_top_branch(submodules, branch_name):
+    return [(submodule_name, sub_repo_name, sub_branch_name or branch_name, submodule_path)
+            for submodule_name, sub_repo_name, sub_branch_name, submodule_path in submodules]
+
+
+# Parse .gitmodules content into (submodule name, repo name, branch, path) tuples.
+# Branch is None when it's not set or set to '.', meaning the submodule follows the branch of the top repo.
+def parse_gitmodules(gitmodules_content):
     gitmodules_config = configparser.ConfigParser(allow_no_value=True)
     gitmodules_config.read_string(gitmodules_content)
 
-    submodules_info = []
+    submodules = []
     for section in gitmodules_config.sections():
         if "submodule" in section:
             # Extract the submodule name
@@ -1805,17 +2500,40 @@ def get_submodules_info(github_client, org_name, repo_name, branch_name):
             repo_name = url.split("/")[-1].replace('.git', '')
             
             # The branch is optional, so we need to check if it exists
-            if gitmodules_config.has_option(section, "branch"):
+            branch_name = None  # default branch from top repo
+            if gitmodules_config.has_option(section, "branch") and gitmodules_config.get(section, "branch") != '.':
                 branch_name = gitmodules_config.get(section, "branch")
-                if branch_name == '.':
-                    branch_name = branch_name  # default branch from top repo
-            else:
-                branch_name = branch_name  # default branch from top repo
     
             # Add the submodule info to the list
-            submodules_info.append((submodule_name, repo_name, branch_name, submodule_path))
+            submodules.append((submodule_name, repo_name, branch_name, submodule_path))
+
+    return submodules
 
-    return submodules_info
+
+# Resolve submodules of all levels as (name, repo, branch, path, children) tuples, sibling lookups run concurrently
+def get_submodules_hierarchy(github_client, org_name, repo_name, branch_name):
+    return resolve_submodules_hierarchy(
+        lambda sub_repo_name, sub_branch_name: get_submodules_info(github_client, org_name, sub_repo_name, sub_branch_name),
+        repo_name, branch_name,
+        get_level_submodules=lambda repo_branches: get_submodules_infos(github_client, org_name, repo_branches))
+
+
+# Create new branches for the whole submodule hierarchy, all repositories of one level in parallel, one commit per parent
+def create_branch_structure(github_client, org_name, repo_name, branch_name, submodules_hierarchy, rename_branch):
+    def create_branch(sub_repo_name, new_branch_name, commit_sha):
+        # The error is already printed, stopping here keeps the new branch out of the tree
+        if not github_client.organization_repo_create_branch(org_name, sub_repo_name, new_branch_name, commit_sha):
+            raise Exception(f"Branch {new_branch_name} could not be created on repo {sub_repo_name}, creation of the branch structure stopped.")
+        print_message(MessageType.INFO, f"Created new branch <b>{new_branch_name}</b> on repo <b>{sub_repo_name}</b>.")
+
+    def update_submodules(sub_repo_name, new_branch_name, changes):
+        repo_submodule_manager = GitHubRepoSubmoduleManager(org_name, sub_repo_name, token)
+        return len(repo_submodule_manager.update_submodules(new_branch_name, [SubmoduleChange(*change) for change in changes])) > 0
+
+    return create_branch_hierarchy(
+        submodules_hierarchy, repo_name, branch_name, rename_branch,
+        lambda sub_repo_name, sub_branch_name: github_client.get_organization_repo_branch_commit_sha(org_name, sub_repo_name, sub_branch_name),
+        create_branch, update_submodules)
 
 
 # Calculate submodule path (folder) - default is same as submodule repo name
@@ -1855,78 +2573,103 @@ def format_output(item):
 def get_sublist(item):
     return item[4] if len(item) > 4 and isinstance(item[4], list) else None  # 4 = sublist if exist
 
+# Writes from any thread are queued as log records, the UI thread drains them into the Text widget in batches
 class TextHandler(object):
-    def __init__(self, widget):
+    def __init__(self, widget, max_lines=LOG_MAX_LINES):
         self.widget = widget
-        
+        self.max_lines = max_lines
+        self.records = queue.SimpleQueue()
+        self.partial = threading.local() # Text of the current line per thread, print() writes message and newline separately
+
+        # Define tags once, bold font is kept referenced so Tk doesn't drop it
+        self.bold_font = font.Font(self.widget, self.widget.cget("font"))
+        self.bold_font.configure(weight="bold")
+        self.widget.tag_configure("bold", font=self.bold_font)
+        self.widget.tag_configure("error", foreground="red")
+        self.widget.tag_configure("warning", foreground="orange")
+        self.widget.tag_configure("info", foreground="black")
+
+        self.widget.after(LOG_DRAIN_INTERVAL_MS, self.drain)
+
     def write(self, s):
-        # Enable the Text widget for editing
-        self.widget.config(state='normal')
         if not isinstance(s, str):
             try:
                 s = str(s)
             except Exception as e:
                 handle_and_print_exception(e, 'Text message must be a string.')
+                return
 
-        # Define tags
-        bold_font = font.Font(self.widget, self.widget.cget("font"))
-        bold_font.configure(weight="bold")
-        self.widget.tag_configure("bold", font=bold_font)
-        self.widget.tag_configure("error", foreground="red")
-        self.widget.tag_configure("warning", foreground="orange")
-        self.widget.tag_configure("info", foreground="black")
+        *lines, self.partial.text = (getattr(self.partial, 'text', '') + s).split('\n')
+        for line in lines:
+            # Don't print if there are only blank spaces
+            if line.strip(" \t\r") == "":
+                continue
+            self.records.put((datetime.datetime.now(), line))
 
-        # Helper function to parse <b> tags and apply bold formatting
-        def parse_and_insert_with_tags(text, color_tag=None):
-            start = 0
-            while start < len(text):
-                open_tag = text.find("<b>", start)
-                close_tag = text.find("</b>", open_tag)
+    def flush(self):
+        pass
 
-                if open_tag == -1 or close_tag == -1:  # No more <b> tags
-                    self.widget.insert(tk.END, text[start:], color_tag)
-                    break
+    # Runs on the UI thread
+    def drain(self):
+        batch = []
+        try:
+            while len(batch) < LOG_DRAIN_BATCH_SIZE:
+                batch.append(self.records.get_nowait())
+        except queue.Empty:
+            pass
+
+        if batch:
+            # Whole batch goes in with a single insert: text, tags, text, tags, ...
+            insert_args = []
+            for now, line in batch:
+                # Add timestamp and apply color to the entire message
+                timestamp = now.strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]
+                color_tag = None
+                if line.startswith(MessageType.ERROR.value):
+                    color_tag = "error"
+                elif line.startswith(MessageType.WARNING.value):
+                    color_tag = "warning"
+                elif line.startswith(MessageType.INFO.value):
+                    color_tag = "info"
+                insert_args.extend(parse_tagged_text(f"{timestamp} {line}\n", color_tag))
+
+            self.widget.config(state='normal')
+            self.widget.insert(tk.END, *insert_args)
+            # Keep only the last max_lines lines
+            line_count = int(self.widget.index('end-1c').split('.')[0]) - 1
+            if line_count > self.max_lines:
+                self.widget.delete('1.0', f'{line_count - self.max_lines + 1}.0')
+            # Disable the Text widget after inserting text and scroll to the end
+            self.widget.config(state='disabled')
+            self.widget.see(tk.END)
+
+        # More records waiting, continue on the next tick
+        self.widget.after(0 if len(batch) == LOG_DRAIN_BATCH_SIZE else LOG_DRAIN_INTERVAL_MS, self.drain)
+
+
+# Split text with <b> tags into (text, tags) pairs for Text.insert
+def parse_tagged_text(text, color_tag=None):
+    color_tags = (color_tag,) if color_tag else ()
+    parts = []
+    start = 0
+    while start < len(text):
+        open_tag = text.find("<b>", start)
+        close_tag = text.find("</b>", open_tag)
+
+        if open_tag == -1 or close_tag == -1:  # No more <b> tags
+            parts.extend((text[start:], color_tags))
+            break
 
-                # Insert text before <b> tag
-                self.widget.insert(tk.END, text[start:open_tag], color_tag)
+        # Text before <b> tag
+        parts.extend((text[start:open_tag], color_tags))
 
-                # Insert bold text
-                bold_text = text[open_tag + 3:close_tag]
-                self.widget.insert(tk.END, bold_text, ("bold", color_tag) if color_tag else "bold")
+        # Bold text
+        parts.extend((text[open_tag + 3:close_tag], ("bold",) + color_tags))
 
-                # Update the start index to after the </b> tag
-                start = close_tag + 4
-                
-        # Don't print if there are only blank spaces
-        if s.strip(" /t/r") == "":
-            return
-        # Add timestamp and apply color to the entire message
-        if s != '\n':
-            # Get current date and time
-            now = datetime.datetime.now()
-            timestamp = now.strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]
-
-            if s.startswith(MessageType.ERROR.value):
-                full_message = f"{timestamp} {s}"
-                parse_and_insert_with_tags(full_message, "error")
-            elif s.startswith(MessageType.WARNING.value):
-                full_message = f"{timestamp} {s}"
-                parse_and_insert_with_tags(full_message, "warning")
-            elif s.startswith(MessageType.INFO.value):
-                full_message = f"{timestamp} {s}"
-                parse_and_insert_with_tags(full_message, "info")
-            else:
-                full_message = f"{timestamp} {s}"
-                parse_and_insert_with_tags(full_message)
-        else:
-            self.widget.insert(tk.END, s)
+        # Update the start index to after the </b> tag
+        start = close_tag + 4
+    return parts
 
-        # Disable the Text widget after inserting text and scroll to the end
-        self.widget.config(state='disabled')
-        self.widget.see(tk.END)
-        
-    def flush(self):
-        pass
 # Load configuration settings from 'config.json', or use defaults if file is missing or invalid
 def load_config():
     config_path = os.path.join(os.path.dirname(__file__), "config.json")
@@ -1973,9 +2716,10 @@ def get_credentials(credential_name):
         handle_and_print_exception(e, 'Can\'t get credentials from Windows Credential Manager.')
         return None,None
 
-def print_message(type, message):
-    print(type.value + ' ' + message) 
-    
+# Snapshot scope of the user of a token, a hash so the token isn't written to the snapshot store
+def token_snapshot_key(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
 def handle_and_print_exception(e, desc = None):
     type, message = exceptions_handler.handle(e, desc)
     print_message(type, message)
@@ -1986,7 +2730,41 @@ def main():
     root.title("BranchBrowser")
     root.geometry('1200x800')  # Set the size of the window
     root.withdraw()
-    
+    # Worker threads post their UI updates here, they are applied on the Tk main loop
+    start_dispatcher(root)
+
+    config_path = os.path.join(os.path.dirname(__file__), "config.json")
+    config = App.load_config()
+    if config is None:
+        print_message(MessageType.WARNING, "Configuration loading failed. Using default values.")
+        config = {
+            "default_team": "default_team",
+            "GIT_HOSTNAME": "github.com",
+            "default_organization": "default_org",
+            "default_repository": "default_repo"
+        }
+    # Every GitHub call (PyGithub and GitHubRepoSubmoduleManager) goes through this pooled transport
+    configure_transport(
+        pool_size=config.get("http_pool_size", DEFAULT_POOL_SIZE),
+        connect_timeout=config.get("http_connect_timeout", DEFAULT_CONNECT_TIMEOUT),
+        read_timeout=config.get("http_read_timeout", DEFAULT_READ_TIMEOUT),
+        cache_entries=config.get("http_cache_entries", DEFAULT_MAX_ENTRIES),
+        write_interval=config.get("http_write_interval", DEFAULT_WRITE_INTERVAL))
+    # Concurrent fan-outs (submodule hierarchy, submodule heads) use the async transport, HTTP/2 when httpx is installed
+    configure_async_transport(
+        max_concurrency=config.get("http_max_concurrency", DEFAULT_MAX_CONCURRENCY),
+        http2=config.get("http2", True))
+    configure_task_runtime(config.get("task_workers", DEFAULT_TASK_WORKERS))
+
+    snapshot_store = None
+    gitmodules_cache = None
+    snapshot_store_path = config.get("snapshot_store_path", os.path.join(os.path.dirname(__file__), "snapshots.db"))
+    try:
+        snapshot_store = SnapshotStore(snapshot_store_path)
+        gitmodules_cache = GitmodulesCache(snapshot_store, config.get("gitmodules_cache_entries", DEFAULT_GITMODULES_CACHE_ENTRIES))
+    except Exception as e:
+        handle_and_print_exception(e, 'Unable to open snapshot store. Starting without last known data.')
+
     token_entered_via_token_dialog = False
     token_dialog_message = None
     token_expired = False
@@ -2004,7 +2782,7 @@ def main():
             token = password
 
         try:
-            github_client = GitHubClient(GIT_HOSTNAME, token)
+            github_client = GitHubClient(GIT_HOSTNAME, token, snapshot_store=snapshot_store, gitmodules_cache=gitmodules_cache)
             if token_entered_via_token_dialog:
                 save_credentials("BranchBrowser", "github_token", token)
             break
@@ -2026,38 +2804,28 @@ def main():
     root.deiconify()
     root.title("BranchBrowser")
     root.geometry('1400x800')  # Set the size of the window
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
     try:
-        config = App.load_config()
-        if config is None:
-            print_message(MessageType.WARNING, "Configuration loading failed. Using default values.")
-            config = {
-                "default_team": "default_team",
-                "GIT_HOSTNAME": "github.com",
-                "default_organization": "default_org",
-                "default_repository": "default_repo"
-            }
-        
         default_team = config.get("default_team") if config else "default_team"
         git_hostname = config.get("GIT_HOSTNAME", "github.com") if config else GIT_HOSTNAME
         # Initialize GitHub client with provided token and hostname
-        github_client = GitHubClient(git_hostname, token)
+        github_client = GitHubClient(git_hostname, token, config.get("use_graphql", True), snapshot_store, gitmodules_cache,
+                                     config.get("http_per_page", MAX_PER_PAGE))
         github = Github(base_url=f"https://api.{git_hostname}", login_or_token=token)
         # Load configuration and get default organization/repository
         default_org = config.get("default_organization") if config else None
         default_repo = config.get("default_repository") if config else None
 
-        # Get list of available organizations
-        available_organizations = github_client.get_organizations_names()
+        # Get list of available organizations (last known ones if available, they are revalidated once the window is shown)
+        available_organizations = github_client.get_organizations_names(cached=True)
         app_org = []
         app_org = select_default_or_first(default_org, available_organizations, "organization")
 
         # Get list of repositories for the selected organization
-        available_repositories = github_client.get_organization_repos_names(app_org)
+        available_repositories = github_client.get_organization_repos_names(app_org, cached=True)
         app_repo = select_default_or_first(default_repo, available_repositories, "repository")
 
         # Get list of available teams for the selected organization (optional, if required)
-        available_teams = github_client.get_organization_teams(app_org) 
+        available_teams = github_client.get_organization_teams(app_org, cached=True) 
         if available_teams:
             app_team = select_default_or_first(default_team, available_teams, "team")
         else:
@@ -2073,10 +2841,16 @@ def main():
         # Set selected organization and repository in the UI
         app.org_combo.set(app_org)
         app.repo_combo.set(app_repo)
+
+        # Swap in fresh data for everything rendered from snapshots
+        app.revalidate()
     except Exception as e:
             handle_and_print_exception(e, None)
         
     root.mainloop()
+    if gitmodules_cache is not None:
+        gitmodules_cache.close()
+        snapshot_store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,211 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from github_transport import get_transport, request_key
+from response_cache import ResponseCache
+from task_runtime import current_task
+
+try:
+    import httpx
+except ImportError: # Optional, without it requests are sent over the pooled requests session
+    httpx = None
+
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncGitHubTransport:
+    """
+    asyncio transport for GitHub REST and GraphQL calls.
+
+    Runs its own event loop on a background thread, so synchronous code (GitHubClient,
+    GitHubRepoSubmoduleManager, task workers) uses it through the request() and gather()
+    wrappers, while fan-outs of hundreds of calls run as coroutines instead of one thread each.
+
+    With httpx (and h2) installed all calls to a host are multiplexed as HTTP/2 streams over a
+    single connection. Without them every call is handed to the pooled session of the shared
+    GitHubTransport, on at most pool size threads. Either way calls are scheduled within the rate
+    limits and GET requests are revalidated against the conditional-request cache of the shared
+    transport, identical GET requests in flight at the same time share one request, and responses
+    are returned as requests.Response like from GitHubTransport.
+
+    Attributes:
+        max_concurrency (int): Maximum number of calls in flight at once.
+        http2 (bool): Whether HTTP/2 is requested, only used when httpx is installed.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, http2=True):
+        self.max_concurrency = max_concurrency
+        self.http2 = http2
+        self.loop = None
+        self.thread = None
+        self.client = None # httpx.AsyncClient, None when requests go over the pooled session
+        self.executor = None
+        self.semaphore = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread on first use."""
+        with self.lock:
+            if self.loop is not None:
+                return
+            transport = get_transport()
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, name='github-async', daemon=True)
+            self.thread.start()
+            asyncio.run_coroutine_threadsafe(self.open(transport), self.loop).result()
+
+    async def open(self, transport):
+        # Created on the loop, asyncio primitives belong to the loop they are created on
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        if httpx is not None:
+            connect_timeout, read_timeout = transport.timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+            try:
+                self.client = httpx.AsyncClient(http2=self.http2, timeout=timeout, follow_redirects=True)
+            except ImportError: # http2 needs h2 installed
+                self.client = httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=transport.pool_size, thread_name_prefix='github-async-io')
+
+    async def request_async(self, method, url, headers=None, data=None, task=None):
+        """
+        Send a request, the coroutine variant of GitHubTransport.request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            headers (dict): Request headers.
+            data (str): Request body.
+            task (Task): Task the call is counted for, checked for cancellation before sending.
+
+        Returns:
+            requests.Response: The response.
+        """
+        if task is not None:
+            task.count_call()
+        transport = get_transport()
+        if method == 'GET':
+            return await transport.single_flight.do_async(request_key(url, headers, data),
+                                                          lambda: self.send_cached(transport, method, url, headers, data, task), task)
+        return await self.send_cached(transport, method, url, headers, data, task)
+
+    async def send_cached(self, transport, method, url, headers, data, task=None):
+        headers = dict(headers or {})
+        cache_key = None
+        cache_entry = None
+        if (transport.cache is not None and method == 'GET'
+                and 'If-None-Match' not in headers and 'If-Modified-Since' not in headers):
+            cache_key = ResponseCache.key(url, headers)
+            cache_entry = transport.cache.add_validators(cache_key, headers)
+
+        rate_limiter = transport.rate_limiter
+        for attempt in range(rate_limiter.max_retries + 1):
+            await rate_limiter.wait_async(method, url, headers, task, data)
+            response = await self.send(transport, method, url, headers, data)
+            if rate_limiter.update(url, headers, response) is None or attempt == rate_limiter.max_retries:
+                break
+
+        if cache_key is not None:
+            response = transport.cache.update(cache_key, response, cache_entry)
+        return response
+
+    async def send(self, transport, method, url, headers, data):
+        async with self.semaphore:
+            if self.client is not None:
+                try:
+                    httpx_response = await self.client.request(method, url, headers=headers, content=data)
+                except httpx.TimeoutException as e:
+                    raise requests.Timeout(str(e)) from e
+                except httpx.TransportError as e: # Callers fall back to last known data on requests.ConnectionError
+                    raise requests.ConnectionError(str(e)) from e
+                return to_requests_response(httpx_response)
+            send = functools.partial(transport.session.request, method, url, headers=headers, data=data, timeout=transport.timeout)
+            return await self.loop.run_in_executor(self.executor, send)
+
+    def run(self, coroutine):
+        """Run a coroutine on the transport loop and wait for its result. Must not be called from the loop itself."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def request(self, method, url, headers=None, data=None):
+        """Synchronous wrapper of request_async, counted for the task running on the calling thread."""
+        return self.run(self.request_async(method, url, headers, data, current_task()))
+
+    def gather(self, requests, return_exceptions=False):
+        """
+        Send requests concurrently and wait for all of them.
+
+        Args:
+            requests (list): (method, url, headers, data) tuples.
+            return_exceptions (bool): Return the exception of a failed request in its place instead of raising it.
+
+        Returns:
+            list: Responses in the order of requests.
+        """
+        task = current_task()
+
+        async def gather_requests():
+            return await asyncio.gather(*(self.request_async(method, url, headers, data, task)
+                                          for method, url, headers, data in requests),
+                                        return_exceptions=return_exceptions)
+        return self.run(gather_requests()) if requests else []
+
+    def close(self):
+        with self.lock:
+            if self.loop is None:
+                return
+            if self.client is not None:
+                asyncio.run_coroutine_threadsafe(self.client.aclose(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+            self.loop = None
+
+
+def to_requests_response(httpx_response):
+    # Callers and the response cache work with requests.Response
+    response = requests.Response()
+    response.status_code = httpx_response.status_code
+    response.reason = httpx_response.reason_phrase
+    response.headers = CaseInsensitiveDict(httpx_response.headers)
+    response._content = httpx_response.content
+    response.encoding = httpx_response.encoding
+    response.url = str(httpx_response.url)
+    response.elapsed = httpx_response.elapsed
+    return response
+
+
+_async_transport = None
+_async_transport_lock = threading.Lock()
+
+
+def configure_async_transport(max_concurrency=DEFAULT_MAX_CONCURRENCY, http2=True):
+    """
+    Replace the shared async transport with one keeping at most max_concurrency calls in flight.
+
+    Returns:
+        AsyncGitHubTransport: The new shared async transport.
+    """
+    global _async_transport
+    with _async_transport_lock:
+        if _async_transport is not None:
+            _async_transport.close()
+        _async_transport = AsyncGitHubTransport(max_concurrency, http2)
+        return _async_transport
+
+
+def get_async_transport():
+    """Return the shared async transport, creating it with default settings on first use."""
+    global _async_transport
+    with _async_transport_lock:
+        if _async_transport is None:
+            _async_transport = AsyncGitHubTransport()
+        return _async_transport
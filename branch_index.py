@@ -0,0 +1,83 @@
+import re
+from collections import namedtuple
+
+
+PUSH_SEGMENT = 'Push'
+VERSION_PATTERN = re.compile(r'^\d+(\.\d+)*$')
+
+# Parsed branch name, e.g. 'Features/team3/1.0/Push/BUG-1' -> ('Features', 'team3', '1.0', True, 'BUG-1')
+BranchInfo = namedtuple('BranchInfo', ['name', 'type', 'team', 'version', 'push', 'description'])
+
+
+class BranchIndex:
+    """
+    Branches of a repository classified once by type, team and version.
+
+    Feature branches are 'Features/<team>/[<version>/][Push/]<description>', release branches
+    'Release/<version>[/...]'. Every branch is parsed when the index is built, filter lookups
+    by (type, team, version) are then dictionary reads returning pre-sorted lists.
+
+    Attributes:
+        infos (dict): Branch name -> BranchInfo.
+    """
+
+    def __init__(self, branches):
+        self.infos = {}
+        self.by_key = {} # (type, team, version) with None for any -> branch names in listing order
+        versions = {} # (type, team) -> set of versions
+        for branch in branches:
+            info = parse_branch(branch)
+            self.infos[branch] = info
+            if info.type is None:
+                continue
+            for key in {(info.type, None, None), (info.type, info.team, None), (info.type, info.team, info.version)}:
+                self.by_key.setdefault(key, []).append(branch)
+            if info.version is not None:
+                versions.setdefault((info.type, info.team), set()).add(info.version)
+        self.versions_by_key = {key: sorted(values, key=version_key) for key, values in versions.items()}
+
+    def branches(self, branch_type, team=None, version=None):
+        """
+        Return the branches of a type, optionally of one team and version, in listing order.
+
+        Args:
+            branch_type (str): 'Features', 'Release', ...
+            team (str): Team of feature branches, None for any.
+            version (str): Version, None for any.
+
+        Returns:
+            list: Branch names.
+        """
+        return self.by_key.get((branch_type, team, version), [])
+
+    def versions(self, branch_type, team=None):
+        """
+        Return the versions used by branches of a type (and team), sorted numerically ('1.9' < '1.10').
+        """
+        return self.versions_by_key.get((branch_type, team), [])
+
+
+def parse_branch(branch):
+    parts = branch.split('/')
+    if len(parts) < 2:
+        return BranchInfo(branch, None, None, None, False, branch)
+    branch_type = parts[0]
+    if branch_type == 'Features' and len(parts) > 2:
+        team = parts[1]
+        rest = parts[2:]
+        version = rest[0] if len(rest) > 1 and VERSION_PATTERN.match(rest[0]) else None
+        push = PUSH_SEGMENT in rest[:-1]
+        return BranchInfo(branch, branch_type, team, version, push, rest[-1])
+    if branch_type == 'Features':
+        # 'Features/<description>' without a team
+        return BranchInfo(branch, branch_type, None, None, False, parts[-1])
+    return BranchInfo(branch, branch_type, None, parts[1], False, '/'.join(parts[2:]))
+
+
+def version_key(version):
+    """
+    Sort key ordering numeric versions by their parts ('1.9' < '1.10'), other names after them.
+    """
+    if VERSION_PATTERN.match(version):
+        return (0, tuple(int(part) for part in version.split('.')), '')
+    return (1, (), version)
@@ -0,0 +1,271 @@
+import bisect
+import heapq
+import re
+
+
+NGRAM_SIZE = 3
+SEGMENT_SEPARATORS = '/-_.'
+# Fuzzy scores are integers, in tenths of a matched character, so equal scores compare exactly
+MATCH_SCORE = 10
+SEGMENT_START_BONUS = 80
+CONSECUTIVE_BONUS = 40
+GAP_PENALTY = 1
+
+
+class BranchSearchIndex:
+    """
+    Case-insensitive substring, fuzzy and regex search over full branch paths.
+
+    Built once per branch structure, branches created or deleted afterwards are added or removed
+    in place. Every path is split into its trigrams, a query of at least three characters is
+    answered from the intersection of the posting sets of its trigrams and only those candidates
+    are checked. When a query extends the previous one, candidates come from the previous results
+    instead.
+
+    Fuzzy queries only check paths containing all the query characters, found from posting sets
+    per character. Regex queries are scanned over all paths joined into one newline separated
+    corpus, so the regex engine walks the paths in a single call.
+
+    Attributes:
+        paths (list): Full branch paths ('Release/1.0') in branch structure order.
+    """
+
+    def __init__(self, branches_structure):
+        paths = []
+        collect_branch_paths(branches_structure, '', paths)
+        self.build(paths)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Build the index from full branch paths already collected from a branch structure."""
+        index = cls.__new__(cls)
+        index.build(paths)
+        return index
+
+    def build(self, paths):
+        self.paths = paths
+        self.lower_paths = [path.lower() for path in self.paths]
+        self.ngrams = {}
+        for path_id, path in enumerate(self.lower_paths):
+            for ngram in path_ngrams(path):
+                self.ngrams.setdefault(ngram, set()).add(path_id)
+        # Paths by the characters they contain, for fuzzy candidates. Built with the index, on the search thread.
+        self.chars = {}
+        for path_id, path in enumerate(self.lower_paths):
+            for char in set(path):
+                self.chars.setdefault(char, set()).add(path_id)
+        self.last_query = None
+        self.last_results = None
+        # Built on first regex search, most refreshes never need it
+        self.corpus = None
+        self.line_offsets = None
+        self.last_fuzzy_query = None
+        self.last_fuzzy_results = None
+
+    def search(self, query):
+        """
+        Return ids of the paths containing the query, in branch structure order.
+
+        Args:
+            query (str): Searched text, case is ignored.
+
+        Returns:
+            list: Indexes into paths.
+        """
+        query = query.lower()
+        if self.last_query is not None and self.last_query in query:
+            # Extended query can only narrow down the previous results
+            candidates = self.last_results
+        elif len(query) >= NGRAM_SIZE:
+            posting_sets = sorted((self.ngrams.get(ngram, set()) for ngram in path_ngrams(query)), key=len)
+            candidates = sorted(set.intersection(*posting_sets))
+        else:
+            candidates = range(len(self.paths))
+
+        results = [path_id for path_id in candidates if query in self.lower_paths[path_id]]
+        self.last_query = query
+        self.last_results = results
+        return results
+
+    def fuzzy_search(self, query, limit=None):
+        """
+        Return ids of the paths containing the query characters in order, best matches first.
+
+        Every matched character scores, more for a character starting a path segment (after
+        '/', '-', '_' or '.') and for consecutive characters, gaps between them cost a little.
+        Characters are matched at their earliest positions, not at the best scoring alignment,
+        so a path can rank lower than its best alignment would (e.g. 'rel' in 'Features/Release'
+        matches the 'r' of 'Features'). This keeps matching to a single regex call per path.
+
+        Args:
+            query (str): Searched characters, case is ignored.
+            limit (int): Return only this many best matches, all when None.
+
+        Returns:
+            list: Indexes into paths, ranked by score, ties in branch structure order.
+        """
+        query = query.lower()
+        if not query:
+            return [path_id for path_id, path in enumerate(self.paths) if path]
+        # Negated classes make every character match at its earliest position without backtracking
+        match = re.compile(''.join(f'[^{re.escape(char)}]*({re.escape(char)})' for char in query)).match
+
+        if self.last_fuzzy_query is not None and self.last_fuzzy_query in query:
+            # Extended query can only narrow down the previous results
+            candidates = self.last_fuzzy_results
+        else:
+            char_sets = sorted((self.chars.get(char, set()) for char in set(query)), key=len)
+            candidates = sorted(set.intersection(*char_sets))
+
+        # Once limit paths have the best possible score, later paths (ties rank in path order) can't get in
+        best_score = best_fuzzy_score(query)
+        best_count = 0
+        complete = True
+        scored = []
+        lower_paths = self.lower_paths
+        for path_id in candidates:
+            path_match = match(lower_paths[path_id])
+            if path_match:
+                score = fuzzy_score(lower_paths[path_id], path_match)
+                scored.append((score, path_id))
+                if score == best_score:
+                    best_count += 1
+                    if best_count == limit:
+                        complete = False
+                        break
+
+        # Only complete results can be narrowed down by the next query
+        self.last_fuzzy_query = query if complete else None
+        self.last_fuzzy_results = [path_id for _, path_id in scored] if complete else None
+
+        if limit is not None and limit < len(scored):
+            ranked = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+        else:
+            ranked = sorted(scored, key=lambda item: (-item[0], item[1]))
+        return [path_id for _, path_id in ranked]
+
+    def regex_search(self, pattern):
+        """
+        Return ids of the paths matching the regular expression, in branch structure order.
+
+        Args:
+            pattern (str): Regular expression searched in full paths, case is ignored.
+
+        Returns:
+            list: Indexes into paths.
+
+        Raises:
+            re.error: If the pattern is not a valid regular expression.
+        """
+        search = re.compile(pattern, re.IGNORECASE).search
+        # In the corpus ^ and $ have to match at path boundaries
+        corpus_search = re.compile(pattern, re.IGNORECASE | re.MULTILINE).search
+        if self.corpus is None:
+            self.corpus = '\n'.join(self.paths)
+            self.line_offsets = []
+            offset = 0
+            for path in self.paths:
+                self.line_offsets.append(offset)
+                offset += len(path) + 1
+        results = []
+        position = 0
+        # The corpus scan only finds candidate lines, every candidate is checked on its own path,
+        # so a match spanning several lines doesn't count
+        while True:
+            corpus_match = corpus_search(self.corpus, position)
+            if corpus_match is None:
+                break
+            path_id = bisect.bisect_right(self.line_offsets, corpus_match.start()) - 1
+            if self.paths[path_id] and search(self.paths[path_id]):
+                results.append(path_id)
+            position = self.line_offsets[path_id] + len(self.paths[path_id]) + 1
+            if position > len(self.corpus):
+                break
+        return results
+
+    def add_path(self, path):
+        """Add a created branch path, it's ordered after the existing paths."""
+        path_id = len(self.paths)
+        lower_path = path.lower()
+        self.paths.append(path)
+        self.lower_paths.append(lower_path)
+        for ngram in path_ngrams(lower_path):
+            self.ngrams.setdefault(ngram, set()).add(path_id)
+        for char in set(lower_path):
+            self.chars.setdefault(char, set()).add(path_id)
+        self.reset_results()
+
+    def remove_path(self, path):
+        """Remove a deleted branch path. It's left as an empty path, so the ids of other paths don't change."""
+        if path not in self.paths:
+            return
+        path_id = self.paths.index(path)
+        lower_path = self.lower_paths[path_id]
+        for ngram in path_ngrams(lower_path):
+            self.ngrams[ngram].discard(path_id)
+        for char in set(lower_path):
+            self.chars[char].discard(path_id)
+        self.paths[path_id] = ''
+        self.lower_paths[path_id] = ''
+        self.reset_results()
+
+    # Previous results no longer narrow down the next query, the regex corpus is joined again when needed
+    def reset_results(self):
+        self.last_query = None
+        self.last_results = None
+        self.last_fuzzy_query = None
+        self.last_fuzzy_results = None
+        self.corpus = None
+        self.line_offsets = None
+
+    def structure(self, path_ids):
+        """Return the nested branch structure holding only the given paths."""
+        structure = {}
+        for path_id in path_ids:
+            node = structure
+            for part in self.paths[path_id].split('/'):
+                node = node.setdefault(part, {})
+        return structure
+
+
+def collect_branch_paths(structure, prefix, paths):
+    for name, children in structure.items():
+        path = f"{prefix}{name}"
+        if children:
+            collect_branch_paths(children, f"{path}/", paths)
+        else:
+            paths.append(path)
+
+
+def fuzzy_score(path, path_match):
+    # Groups of the match are the positions of the query characters. Gaps between consecutive
+    # characters are empty, so all gaps together span from the first to the last character.
+    count = path_match.re.groups
+    start = path_match.start
+    score = MATCH_SCORE * count - GAP_PENALTY * (start(count) - start(1) - count + 1)
+    previous = None
+    for group in range(1, count + 1):
+        position = start(group)
+        if position == 0 or path[position - 1] in SEGMENT_SEPARATORS:
+            score += SEGMENT_START_BONUS
+        if position - 1 == previous:
+            score += CONSECUTIVE_BONUS
+        previous = position
+    return score
+
+
+def best_fuzzy_score(query):
+    # Highest score fuzzy_score can give the query. The first character can start the path. A later character
+    # can be both consecutive and a segment start only after a separator, otherwise a segment start is at least
+    # one character (the separator) away from the previous match.
+    score = MATCH_SCORE + SEGMENT_START_BONUS
+    for previous_char in query[:-1]:
+        if previous_char in SEGMENT_SEPARATORS:
+            score += MATCH_SCORE + SEGMENT_START_BONUS + CONSECUTIVE_BONUS
+        else:
+            score += MATCH_SCORE + max(SEGMENT_START_BONUS - GAP_PENALTY, CONSECUTIVE_BONUS)
+    return score
+
+
+def path_ngrams(text):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
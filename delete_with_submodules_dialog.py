@@ -1,9 +1,10 @@
-import threading
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 from tkinter import ttk
 
-from message_type import MessageType
+from message_type import MessageType, print_message
+from task_runtime import get_task_runtime
+from ui_dispatcher import post_to_ui
 
 
 class DeleteWithSubmodulesDialog(simpledialog.Dialog):
@@ -79,38 +80,43 @@ class DeleteWithSubmodulesDialog(simpledialog.Dialog):
         """
         Start the branch deletion process.
 
-        Initiates a thread to handle deletion to keep the UI responsive.
+        Submits the deletion as a task, its progress is shown in the task panel.
         """
-        self.processing_popup = tk.Toplevel(self.master)
-        self.processing_popup.geometry("300x50")
-        tk.Label(self.processing_popup, text="Deleting branches...").pack()
-        self.processing_popup.protocol("WM_DELETE_WINDOW", lambda: None)  # Disable close button
-        self.processing_popup.grab_set()
-
         self.destroy()
 
-        threading.Thread(target=self.process).start()
+        get_task_runtime().submit(f"Delete {self.repo_name}/{self.branch_name} with submodules", self.process)
 
-    def process(self):
+    def process(self, task):
         """
         Execute the branch deletion process for the main repository and submodules.
+
+        Runs on a task worker thread, message boxes and the refresh are posted to the UI thread.
+
+        Args:
+            task (Task): Task reporting one step per deleted branch, cancelling stops before the next deletion.
+
+        Raises:
+            Exception: Re-raised after it's shown, so the task ends failed.
         """
+        task.set_total(1 + len(self.submodules))
         try:
             self.__delete_branch_in_main_repo()
-            self.__delete_branches_in_submodules()
+            task.step()
+            self.__delete_branches_in_submodules(task)
 
-            messagebox.showinfo("Success", "Branch and submodules deleted successfully!")
-            self.refresh_callback()
+            post_to_ui(messagebox.showinfo, "Success", "Branch and submodules deleted successfully!")
+            # Not coalesced, every finished deletion has to reach the tree
+            post_to_ui(self.refresh_callback)
         except Exception as e:
             error_message = f"An error occured during deleting branch with submodules: {str(e)}"
             print_message(
                 MessageType.ERROR, 
                 error_message)
-            messagebox.showerror(
+            post_to_ui(
+                messagebox.showerror,
                 "Error", 
                 error_message)
-        finally:
-            self.processing_popup.destroy()
+            raise # Task ends failed in the task panel
 
     def cancel(self, event=None):
         """Handle cancellation of the dialog."""
@@ -149,10 +155,13 @@ class DeleteWithSubmodulesDialog(simpledialog.Dialog):
         """
         self.__delete_branch(self.repo_name, self.branch_name)
         
-    def __delete_branches_in_submodules(self):
+    def __delete_branches_in_submodules(self, task):
         """
         Delete branches in all specified submodules by using the __delete_branch method.
-        
+
+        Args:
+            task (Task): Task to report each deleted branch to.
+
         Raises:
             Exception: If any submodule branch deletion fails.
         """
@@ -160,6 +169,7 @@ class DeleteWithSubmodulesDialog(simpledialog.Dialog):
             submodule_path = submodule.get("path")
             submodule_branch = submodule.get("branch")
             self.__delete_branch(submodule_path, submodule_branch)
+            task.step()
 
 
 def validate_parameters(org_name, repo_name, branch_name, submodules):
@@ -213,14 +223,3 @@ def validate_parameters(org_name, repo_name, branch_name, submodules):
             error_message = f"'branch' must be a non-empty string: {branch}"
             print_message(MessageType.ERROR, f"Validation Error: {error_message}")
             raise ValueError(error_message)
-
-
-def print_message(msg_type, message):
-    """
-    Print a message with its type.
-
-    Args:
-        msg_type (MessageType): The type of the message.
-        message (str): The message content.
-    """
-    print(f"{msg_type.value} {message}")
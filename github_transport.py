@@ -0,0 +1,197 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from github.Requester import Requester
+
+from rate_limiter import DEFAULT_WRITE_INTERVAL, RateLimitScheduler
+from response_cache import DEFAULT_MAX_ENTRIES, ResponseCache
+from single_flight import SingleFlight
+from task_runtime import current_task
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+
+class GitHubTransport:
+    """
+    Shared HTTP transport for all GitHub API calls.
+
+    Wraps a single requests.Session whose adapter keeps a keep-alive connection pool
+    per host, so consecutive calls reuse TLS connections instead of opening new ones.
+    Every request is bounded by a connect and a read timeout, is scheduled within the GitHub
+    rate limits, and GET requests are revalidated against the conditional-request cache.
+    Identical GET requests issued at the same time share one request and its response.
+
+    Attributes:
+        pool_size (int): Number of pooled connections kept per host.
+        timeout (tuple): (connect timeout, read timeout) in seconds.
+        session (requests.Session): The pooled session used for every request.
+        cache (ResponseCache): ETag/Last-Modified cache, None when disabled.
+        rate_limiter (RateLimitScheduler): Primary and secondary rate limit scheduler.
+        single_flight (SingleFlight): Coalesces identical GET requests in flight.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 cache_entries=DEFAULT_MAX_ENTRIES, write_interval=DEFAULT_WRITE_INTERVAL):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = ResponseCache(cache_entries) if cache_entries else None
+        self.rate_limiter = RateLimitScheduler(write_interval)
+        self.single_flight = SingleFlight()
+        self.session = requests.Session()
+        # Authorization is always sent explicitly, don't let .netrc override it
+        self.session.auth = lambda request: request
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, headers=None, data=None, stream=False, allow_redirects=True):
+        """
+        Send a request over the pooled session.
+
+        The call waits while the quota of its token is exhausted, and is retried when it's
+        rejected by a primary or secondary rate limit. Calls made by a task are counted for it
+        and raise TaskCancelled once the task is cancelled.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            headers (dict): Request headers.
+            data (str): Request body.
+            stream (bool): Whether the body should be streamed.
+            allow_redirects (bool): Whether redirects are followed.
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.Timeout: If connecting or reading takes longer than the configured timeouts.
+            TaskCancelled: If the task making the call was cancelled.
+        """
+        task = current_task()
+        if task is not None:
+            task.count_call()
+        if method == 'GET' and not stream:
+            # Streamed bodies can be read only once, so they are never shared
+            return self.single_flight.do(request_key(url, headers, data, allow_redirects),
+                                         lambda: self.send(method, url, headers, data, stream, allow_redirects))
+        return self.send(method, url, headers, data, stream, allow_redirects)
+
+    def send(self, method, url, headers, data, stream, allow_redirects):
+        headers = dict(headers or {})
+        cache_key = None
+        cache_entry = None
+        # Requests that already carry their own validators are left to the caller
+        if (self.cache is not None and method == 'GET' and not stream
+                and 'If-None-Match' not in headers and 'If-Modified-Since' not in headers):
+            cache_key = ResponseCache.key(url, headers)
+            cache_entry = self.cache.add_validators(cache_key, headers)
+
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            self.rate_limiter.wait(method, url, headers, data)
+            response = self.session.request(method, url, headers=headers, data=data, timeout=self.timeout,
+                                            stream=stream, allow_redirects=allow_redirects)
+            if self.rate_limiter.update(url, headers, response) is None or attempt == self.rate_limiter.max_retries:
+                break
+            response.close()
+
+        if cache_key is not None:
+            response = self.cache.update(cache_key, response, cache_entry)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+def request_key(url, headers, data, allow_redirects=True):
+    # Requests are identical only with identical headers, e.g. the same token and Accept
+    return (url, tuple(sorted((headers or {}).items())), data, allow_redirects)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def configure_transport(pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                        cache_entries=DEFAULT_MAX_ENTRIES, write_interval=DEFAULT_WRITE_INTERVAL):
+    """
+    Replace the shared transport with one using the given pool size, timeouts, cache size (0 disables the cache)
+    and minimum interval between write requests in seconds.
+
+    Returns:
+        GitHubTransport: The new shared transport.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = GitHubTransport(pool_size, connect_timeout, read_timeout, cache_entries, write_interval)
+        return _transport
+
+
+def get_transport():
+    """Return the shared transport, creating it with default settings on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = GitHubTransport()
+        return _transport
+
+
+class TransportResponse:
+    # Mimics the httplib response object expected by PyGithub's Requester
+    def __init__(self, response):
+        self.status = response.status_code
+        self.headers = response.headers
+        self.response = response
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self):
+        return self.response.text or ""
+
+    def iter_content(self, chunk_size=1):
+        return self.response.iter_content(chunk_size=chunk_size)
+
+    def raise_for_status(self):
+        self.response.raise_for_status()
+
+
+class TransportConnection:
+    # Mimics the httplib connection object expected by PyGithub's Requester.
+    # Requester creates one of these per request, the pooling itself lives in the shared transport.
+    protocol = 'https'
+
+    def __init__(self, host, port=None, strict=False, timeout=None, retry=None, pool_size=None, **kwargs):
+        self.host = host
+        self.port = port
+
+    def request(self, verb, url, input, headers, stream=False):
+        self.verb = verb
+        self.url = url
+        self.input = input
+        self.headers = headers
+        self.stream = stream
+
+    def getresponse(self):
+        port = f":{self.port}" if self.port else ""
+        url = f"{self.protocol}://{self.host}{port}{self.url}"
+        response = get_transport().request(self.verb, url, headers=self.headers, data=self.input,
+                                           stream=self.stream, allow_redirects=False)
+        return TransportResponse(response)
+
+    def close(self):
+        pass
+
+
+class HttpTransportConnection(TransportConnection):
+    protocol = 'http'
+
+
+def install_pygithub_transport():
+    """Route every PyGithub request through the shared transport."""
+    Requester.injectConnectionClasses(HttpTransportConnection, TransportConnection)
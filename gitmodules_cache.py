@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_GITMODULES_CACHE_ENTRIES = 5000
+
+
+class GitmodulesCache:
+    """
+    LRU cache of parsed .gitmodules files keyed by repository and commit SHA.
+
+    A .gitmodules file at a given commit never changes, so entries never need revalidation,
+    only a lookup of the branch head SHA. Commits without .gitmodules are cached as empty
+    (negative) entries. When a SnapshotStore is given, entries are persisted in its database
+    and loaded again in the next session. Lookups only mark entries as used in memory, the
+    use times are written together with the next put and on close().
+
+    Attributes:
+        max_entries (int): Maximum number of cached commits, least recently used are evicted first.
+    """
+
+    def __init__(self, snapshot_store=None, max_entries=DEFAULT_GITMODULES_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.used = {} # (repo, sha) -> last use not yet written
+        self.lock = threading.Lock()
+        self.store = snapshot_store
+        if snapshot_store is not None:
+            self.load()
+
+    def load(self):
+        # Connection of the snapshot store is shared, its lock serializes all use of it
+        with self.store.lock, self.store.connection as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS gitmodules ('
+                'repo TEXT NOT NULL, sha TEXT NOT NULL, submodules TEXT NOT NULL, last_used REAL NOT NULL, '
+                'PRIMARY KEY (repo, sha))')
+            # Drop what doesn't fit anymore (e.g. max_entries was lowered)
+            connection.execute(
+                'DELETE FROM gitmodules WHERE rowid NOT IN '
+                '(SELECT rowid FROM gitmodules ORDER BY last_used DESC LIMIT ?)', (self.max_entries,))
+            rows = connection.execute('SELECT repo, sha, submodules FROM gitmodules ORDER BY last_used').fetchall()
+        for repo, sha, submodules in rows:
+            self.entries[(repo, sha)] = [tuple(submodule) for submodule in json.loads(submodules)]
+
+    def get(self, repo, sha):
+        """
+        Return cached submodule tuples for the repository at the commit.
+
+        Returns:
+            list: Submodule tuples (empty if the commit has no .gitmodules), or None if not cached.
+        """
+        key = (repo, sha)
+        with self.lock:
+            submodules = self.entries.get(key)
+            if submodules is None:
+                return None
+            self.entries.move_to_end(key)
+            if self.store is not None:
+                self.used[key] = time.time()
+        return list(submodules)
+
+    def put(self, repo, sha, submodules):
+        """Cache submodule tuples for the repository at the commit, an empty list marks a commit without .gitmodules."""
+        key = (repo, sha)
+        with self.lock:
+            self.entries[key] = [tuple(submodule) for submodule in submodules]
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+            if self.store is None:
+                return
+            self.used.pop(key, None)
+            for evicted_key in evicted:
+                self.used.pop(evicted_key, None)
+            with self.store.lock, self.store.connection as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO gitmodules (repo, sha, submodules, last_used) VALUES (?, ?, ?, ?)',
+                    (repo, sha, json.dumps(self.entries[key]), time.time()))
+                connection.executemany('DELETE FROM gitmodules WHERE repo = ? AND sha = ?', evicted)
+                self.write_used(connection)
+
+    def write_used(self, connection):
+        connection.executemany('UPDATE gitmodules SET last_used = ? WHERE repo = ? AND sha = ?',
+                               [(last_used, repo, sha) for (repo, sha), last_used in self.used.items()])
+        self.used.clear()
+
+    def close(self):
+        """Write the use times of the entries looked up since the last put, the store stays open."""
+        with self.lock:
+            if self.store is not None and self.used:
+                with self.store.lock, self.store.connection as connection:
+                    self.write_used(connection)
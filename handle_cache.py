@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MAX_HANDLES = 256
+DEFAULT_HANDLE_TTL = 300 # seconds
+
+
+class HandleCache:
+    """
+    Bounded, time-limited cache of PyGithub objects (organizations, repositories) and of other
+    data kept for the session, such as branch lists.
+
+    Handles are only used to reach their API endpoints, so a handle is reused for ttl seconds
+    instead of being fetched again by every client method. The least recently used handles are
+    evicted once max_entries is exceeded. Handles belong to the token they were created with,
+    the cache has to be invalidated when the token changes.
+
+    Data created while the cache is invalidated may already be outdated and isn't kept, every
+    invalidation starts a new generation and only handles created in it are cached.
+
+    Attributes:
+        hits (int): Lookups served from cache.
+        misses (int): Lookups that created a new handle.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_HANDLES, ttl=DEFAULT_HANDLE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict() # key -> (expires at, handle)
+        self.lock = threading.Lock()
+        self.generation = 0 # incremented by invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, create):
+        """
+        Return the cached handle for the key, or the one returned by create().
+
+        Handles are not cached when create() raises, e.g. for a missing organization.
+        """
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+            generation = self.generation
+
+        handle = create()
+        self.put(key, handle, now, generation)
+        return handle
+
+    def peek(self, key):
+        """Return the cached handle for the key, or None. Nothing is created or counted."""
+        now = self.clock()
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[1] if entry is not None and entry[0] > now else None
+
+    def put(self, key, handle, now=None, generation=None):
+        """
+        Cache a handle fetched elsewhere, replacing the cached one.
+
+        When the generation read before the handle was fetched is given, the handle isn't cached
+        if the cache was invalidated in the meantime.
+        """
+        if now is None:
+            now = self.clock()
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (now + self.ttl, handle)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, match=None):
+        """Drop the handles whose key is matched by match(key), all of them by default."""
+        with self.lock:
+            self.generation += 1
+            if match is None:
+                self.entries.clear()
+                return
+            for key in [key for key in self.entries if match(key)]:
+                del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
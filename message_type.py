@@ -5,4 +5,15 @@ class MessageType(Enum):
     ERROR = '[ERROR]'
     WARNING = '[WARNING]'
     INFO = '[INFO]'
-    DEFAULT = ''
\ No newline at end of file
+    DEFAULT = ''
+
+
+def print_message(msg_type, message):
+    """
+    Print a message with its type.
+
+    Args:
+        msg_type (MessageType): The type of the message.
+        message (str): The message content.
+    """
+    print(f"{msg_type.value} {message}")
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+from message_type import MessageType, print_message
+from task_runtime import current_task
+
+
+DEFAULT_WRITE_INTERVAL = 1.0 # GitHub asks for at least a second between content-creating requests
+DEFAULT_SECONDARY_LIMIT_WAIT = 60
+DEFAULT_MAX_RETRIES = 3
+WRITE_METHODS = ('POST', 'PATCH', 'PUT', 'DELETE')
+# Parked coroutines check the cancellation of their task this often (seconds)
+PARK_CHECK_INTERVAL = 1.0
+
+
+class RateLimitScheduler:
+    """
+    Keeps GitHub API calls within the primary and secondary rate limits.
+
+    Quota is tracked per token and rate limit resource (core, graphql, search) from the
+    X-RateLimit-* response headers. A call for an exhausted quota is parked until the reset
+    time instead of failing, writes are spaced by write_interval to stay under the secondary
+    (content creation) limit, GraphQL queries are reads and only mutations are spaced, and calls rejected by a limit are retried after Retry-After,
+    the quota reset or secondary_limit_wait seconds.
+
+    Attributes:
+        write_interval (float): Minimum number of seconds between two write requests.
+        secondary_limit_wait (float): Seconds to wait after a secondary limit response without Retry-After.
+        max_retries (int): How many times a call rejected by a rate limit is retried.
+    """
+
+    def __init__(self, write_interval=DEFAULT_WRITE_INTERVAL, secondary_limit_wait=DEFAULT_SECONDARY_LIMIT_WAIT,
+                 max_retries=DEFAULT_MAX_RETRIES, clock=time.time, sleep=time.sleep):
+        self.write_interval = write_interval
+        self.secondary_limit_wait = secondary_limit_wait
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.quotas = {} # (token, resource) -> {'limit', 'remaining', 'reset'}
+        self.blocked_until = {} # (token, resource) -> time until which calls are parked
+        self.last_quota_key = None
+        self.next_write = 0
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    @staticmethod
+    def quota_key(url, headers):
+        # Token is hashed, so it isn't kept around in plain text
+        token = hashlib.sha256(headers.get('Authorization', '').encode('utf-8')).hexdigest()
+        if url.rstrip('/').endswith('/graphql'):
+            resource = 'graphql'
+        elif '/search/' in url:
+            resource = 'search'
+        else:
+            resource = 'core'
+        return (token, resource)
+
+    @staticmethod
+    def is_write(method, url, data=None):
+        # GraphQL reads are POSTs too, only mutations create content
+        if method not in WRITE_METHODS:
+            return False
+        if not url.rstrip('/').endswith('/graphql'):
+            return True
+        try:
+            return json.loads(data)['query'].lstrip().startswith('mutation')
+        except (TypeError, ValueError, KeyError, AttributeError):
+            return True # Unknown body, spaced to be safe
+
+    def wait(self, method, url, headers, data=None):
+        """
+        Block the calling thread until the call may be sent.
+
+        Raises:
+            TaskCancelled: As soon as the task running on the calling thread is cancelled while parked.
+        """
+        key = self.quota_key(url, headers)
+        while True:
+            delay = self.parked_delay(key)
+            if delay <= 0:
+                break
+            self.park(delay)
+
+        if self.write_interval and self.is_write(method, url, data):
+            delay = self.reserve_write()
+            if delay > 0:
+                self.park(delay)
+
+    async def wait_async(self, method, url, headers, task=None, data=None):
+        """
+        Same as wait(), but only the calling coroutine is parked, not the event loop thread.
+
+        Raises:
+            TaskCancelled: Within PARK_CHECK_INTERVAL seconds once the task is cancelled while parked.
+        """
+        key = self.quota_key(url, headers)
+        while True:
+            delay = self.parked_delay(key)
+            if delay <= 0:
+                break
+            await self.park_async(delay, task)
+
+        if self.write_interval and self.is_write(method, url, data):
+            delay = self.reserve_write()
+            if delay > 0:
+                await self.park_async(delay, task)
+
+    def park(self, delay):
+        # A parked task wakes up when it's cancelled, e.g. from the task panel, not only at the quota reset
+        task = current_task()
+        if task is None:
+            self.sleep(delay)
+        else:
+            task.token.wait(delay)
+
+    async def park_async(self, delay, task):
+        if task is None:
+            await asyncio.sleep(delay)
+            return
+        while delay > 0:
+            task.raise_if_cancelled()
+            await asyncio.sleep(min(delay, PARK_CHECK_INTERVAL))
+            delay -= PARK_CHECK_INTERVAL
+        task.raise_if_cancelled()
+
+    def parked_delay(self, key):
+        # Seconds until calls for the quota key may be sent again, 0 or less when they may be sent now
+        with self.lock:
+            quota = self.quotas.get(key)
+            resume_at = self.blocked_until.get(key, 0)
+            if quota and quota['remaining'] == 0:
+                resume_at = max(resume_at, quota['reset'])
+        delay = resume_at - self.clock()
+        if delay > 0:
+            print_message(MessageType.WARNING, f"GitHub rate limit reached, calls are parked for <b>{int(delay) + 1}s</b>, until {time.strftime('%H:%M:%S', time.localtime(resume_at))}.")
+        return delay
+
+    def reserve_write(self):
+        # Reserve the next free write slot, returns seconds until it starts
+        with self.write_lock:
+            now = self.clock()
+            start = max(self.next_write, now)
+            self.next_write = start + self.write_interval
+            return start - now
+
+    def update(self, url, headers, response):
+        """
+        Record the quota from a response.
+
+        Returns:
+            float: Seconds to wait before the call is retried, None if it wasn't rejected by a rate limit.
+        """
+        key = self.quota_key(url, headers)
+        now = self.clock()
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        with self.lock:
+            if remaining is not None:
+                self.quotas[key] = {
+                    'limit': int(response.headers.get('X-RateLimit-Limit', 0)),
+                    'remaining': int(remaining),
+                    'reset': int(response.headers.get('X-RateLimit-Reset', now)),
+                }
+                self.last_quota_key = key
+
+            if response.status_code not in (403, 429):
+                return None
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None and retry_after.isdigit():
+                delay = int(retry_after)
+            elif remaining == '0':
+                delay = self.quotas[key]['reset'] - now
+            elif 'secondary rate limit' in (response.text or '').lower():
+                delay = self.secondary_limit_wait
+            else:
+                return None # Permission problem, not a rate limit
+            delay = max(delay, 1)
+            self.blocked_until[key] = max(self.blocked_until.get(key, 0), now + delay)
+        return delay
+
+    def quota(self):
+        """
+        Return the most recently reported quota.
+
+        Returns:
+            dict: 'resource', 'limit', 'remaining' and 'reset' (epoch seconds), or None before the first response.
+        """
+        with self.lock:
+            if self.last_quota_key is None:
+                return None
+            return dict(self.quotas[self.last_quota_key], resource=self.last_quota_key[1])
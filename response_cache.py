@@ -0,0 +1,125 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+DEFAULT_MAX_ENTRIES = 2048
+# Describe the body of the 304 response itself, so they must not replace the cached ones
+BODY_HEADERS = ('content-length', 'content-encoding', 'transfer-encoding')
+
+
+class CachedResponse:
+    def __init__(self, response):
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.encoding = response.encoding
+
+    def to_response(self, not_modified_response):
+        """
+        Rebuild a 200 response from the cached body.
+
+        Headers of the 304 response (e.g. current rate limit values) take precedence over the cached ones.
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers.update({name: value for name, value in not_modified_response.headers.items()
+                                 if name.lower() not in BODY_HEADERS})
+        response._content = self.content
+        response.encoding = self.encoding
+        response.url = not_modified_response.url
+        response.request = not_modified_response.request
+        response.elapsed = not_modified_response.elapsed
+        return response
+
+
+class ResponseCache:
+    """
+    Conditional-request cache for GET responses.
+
+    Responses carrying an ETag or Last-Modified header are stored by URL, auth identity and
+    Accept header. Later requests for the same key are sent with If-None-Match/If-Modified-Since,
+    and a 304 answer (which doesn't count against the rate limit) is served from the cached body.
+    The least recently used entries are evicted once max_entries is exceeded.
+
+    Attributes:
+        hits (int): Requests that were sent with validators from a cached entry.
+        misses (int): Requests without a cached entry.
+        not_modified (int): Requests answered with 304 and served from cache.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def key(url, headers):
+        # Token itself is never kept, only its digest identifies the user
+        identity = hashlib.sha256(headers.get('Authorization', '').encode('utf-8')).hexdigest()
+        return (url, identity, headers.get('Accept', ''))
+
+    def add_validators(self, key, headers):
+        """
+        Add If-None-Match/If-Modified-Since to headers if there is a cached entry for the key.
+
+        Returns:
+            CachedResponse: The entry the validators come from, or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return entry
+
+    def update(self, key, response, entry=None):
+        """
+        Store or revalidate the cached entry for the key from the server response.
+
+        Args:
+            key (tuple): Cache key of the request.
+            response (requests.Response): Server response.
+            entry (CachedResponse): Entry returned by add_validators for this request.
+
+        Returns:
+            requests.Response: The response to hand to the caller, rebuilt from cache on 304.
+        """
+        with self.lock:
+            if response.status_code == 304:
+                if entry is None:
+                    return response
+                self.not_modified += 1
+                return entry.to_response(response)
+
+            if response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+                self.entries[key] = CachedResponse(response)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.pop(key, None)
+        return response
+
+    def stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified, 'entries': len(self.entries)}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
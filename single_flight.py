@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+from task_runtime import TaskCancelled, current_task
+
+
+# Seconds between the cancellation checks of a follower waiting for a call of another task
+FOLLOWER_CHECK_INTERVAL = 0.1
+# Outcome of a call whose leader was cancelled, the followers make the call again
+ABANDONED = object()
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls that are in flight at the same time.
+
+    The first caller of a key runs the call, callers arriving while it's running wait for it
+    and receive the same result (or the same exception) instead of issuing the call again.
+    Nothing is kept once the call finishes, so later calls run again.
+
+    Cancellation belongs to a task, not to the call: when the task of the first caller is
+    cancelled, the waiting callers make the call again with one of them leading it, and a
+    waiting caller stops waiting as soon as its own task is cancelled.
+
+    Thread callers use do(), coroutines on one event loop use do_async(), the two are tracked
+    separately.
+
+    Attributes:
+        calls (int): Calls that were run.
+        shared (int): Calls that received the result of an identical call in flight.
+    """
+
+    def __init__(self):
+        self.in_flight = {} # key -> Flight
+        self.async_in_flight = {} # key -> asyncio.Future
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function):
+        """Return function() or the result of the identical call already in flight for the key."""
+        task = current_task()
+        while True:
+            with self.lock:
+                flight = self.in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.in_flight[key] = Flight()
+                    self.calls += 1
+                else:
+                    self.shared += 1
+            if leader:
+                return self.lead(key, flight, function)
+            result = flight.wait(task)
+            if result is not ABANDONED:
+                return result
+            with self.lock:
+                self.shared -= 1
+
+    def lead(self, key, flight, function):
+        try:
+            flight.result = function()
+        except TaskCancelled:
+            flight.result = ABANDONED
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            flight.done.set()
+        return flight.result
+
+    async def do_async(self, key, coroutine_function, task=None):
+        """
+        Coroutine variant of do(), coroutine_function() is awaited only by the first caller.
+
+        The task making the call is given explicitly, coroutines of several tasks share one thread.
+        """
+        while True:
+            future = self.async_in_flight.get(key)
+            if future is None:
+                return await self.lead_async(key, coroutine_function)
+            with self.lock:
+                self.shared += 1
+            result = await wait_for_flight(future, task)
+            if result is not ABANDONED:
+                return result
+            with self.lock:
+                self.shared -= 1
+
+    async def lead_async(self, key, coroutine_function):
+        future = asyncio.get_running_loop().create_future()
+        self.async_in_flight[key] = future
+        with self.lock:
+            self.calls += 1
+        try:
+            result = await coroutine_function()
+        except (TaskCancelled, asyncio.CancelledError):
+            future.set_result(ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here, so a flight without followers doesn't log "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.async_in_flight[key]
+
+    def stats(self):
+        with self.lock:
+            return {'calls': self.calls, 'shared': self.shared}
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, task=None):
+        """Return the result of the call, ABANDONED if its leader was cancelled. Raises TaskCancelled when the task is."""
+        timeout = FOLLOWER_CHECK_INTERVAL if task is not None else None
+        while not self.done.wait(timeout):
+            task.raise_if_cancelled()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def wait_for_flight(future, task):
+    # asyncio.wait never cancels the future, so a cancelled follower doesn't cancel the call of the others
+    timeout = FOLLOWER_CHECK_INTERVAL if task is not None else None
+    while not (await asyncio.wait([future], timeout=timeout))[0]:
+        task.raise_if_cancelled()
+    return future.result()
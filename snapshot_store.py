@@ -0,0 +1,59 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class SnapshotStore:
+    """
+    On-disk SQLite store of the last known GitHub data.
+
+    Holds organizations, repositories, teams and branch structures per host and scope
+    (organization or organization/repository), so the UI can render immediately from the
+    last session and keep working read-only when the GitHub API is unreachable. Data of
+    different accounts is kept apart by saving it under 'user@hostname'.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        # Accessed from worker threads too, the lock serializes all use of the connection
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                'host TEXT NOT NULL, kind TEXT NOT NULL, scope TEXT NOT NULL, '
+                'data TEXT NOT NULL, updated_at REAL NOT NULL, '
+                'PRIMARY KEY (host, kind, scope))')
+
+    def load(self, host, kind, scope=''):
+        """
+        Return the last saved data for host/kind/scope.
+
+        Args:
+            host (str): GitHub hostname, 'user@hostname' for data of one account.
+            kind (str): Kind of data, e.g. 'organizations', 'repositories', 'teams', 'branches'.
+            scope (str): Organization or 'organization/repository' the data belongs to.
+
+        Returns:
+            The saved JSON value, or None if nothing was saved yet.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT data FROM snapshots WHERE host = ? AND kind = ? AND scope = ?',
+                (host, kind, scope)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, host, kind, scope, data):
+        """Save JSON-serializable data for host/kind/scope, replacing the previous snapshot."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO snapshots (host, kind, scope, data, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (host, kind, scope, json.dumps(data), time.time()))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from message_type import MessageType, print_message
+from task_runtime import bind_current_task, current_task
+
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def resolve_submodules_hierarchy(get_submodules, repo_name, branch_name, max_workers=DEFAULT_MAX_WORKERS, get_level_submodules=None):
+    """
+    Resolve the submodule graph of a repository branch to any depth.
+
+    Lookups are done level by level, all (repository, branch) pairs of one level are looked up
+    concurrently on a bounded thread pool. Every pair is looked up only once, also when it is
+    shared by several parents. A submodule pointing back to one of its ancestors ends the branch
+    of the tree and is reported as a cycle. With get_level_submodules a whole level is looked up
+    in one call instead, e.g. by a transport issuing the requests concurrently without threads.
+
+    Args:
+        get_submodules (callable): Returns (name, repo, branch, path) tuples for a (repo, branch).
+        repo_name (str): Top repository name.
+        branch_name (str): Top repository branch.
+        max_workers (int): Maximum number of concurrent lookups.
+        get_level_submodules (callable): Returns a list of get_submodules results for a list of (repo, branch).
+
+    Returns:
+        list: (name, repo, branch, path, children) tuples, where children is a list of the same
+        tuples, or None for a submodule that closes a cycle. Same structure build_hierarchy expects.
+    """
+    root = (repo_name, branch_name)
+    if get_level_submodules is not None:
+        return resolve_levels(get_level_submodules, root)
+    # The thread pool is only needed when lookups are made one by one
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        lookup = bind_current_task(lambda key: get_submodules(*key))
+        return resolve_levels(lambda level: executor.map(lookup, level), root)
+
+
+def resolve_levels(get_level_submodules, root):
+    submodules_by_repo_branch = {}
+    level = [root]
+    while level:
+        for repo_branch, submodules in zip(level, get_level_submodules(level)):
+            submodules_by_repo_branch[repo_branch] = submodules
+        next_level = []
+        for repo_branch in level:
+            for _, sub_repo_name, sub_branch_name, _ in submodules_by_repo_branch[repo_branch]:
+                key = (sub_repo_name, sub_branch_name)
+                if key not in submodules_by_repo_branch and key not in next_level:
+                    next_level.append(key)
+        level = next_level
+
+    return build_submodules_tree(submodules_by_repo_branch, root, (root,))
+
+
+def build_submodules_tree(submodules_by_repo_branch, repo_branch, ancestors):
+    tree = []
+    for submodule_name, sub_repo_name, sub_branch_name, submodule_path in submodules_by_repo_branch[repo_branch]:
+        key = (sub_repo_name, sub_branch_name)
+        if key in ancestors:
+            print_message(MessageType.WARNING, f"Submodule cycle detected: <b>R:{sub_repo_name} B:{sub_branch_name}</b> is its own ancestor.")
+            children = None
+        else:
+            children = build_submodules_tree(submodules_by_repo_branch, key, ancestors + (key,))
+        tree.append((submodule_name, sub_repo_name, sub_branch_name, submodule_path, children))
+    return tree
+
+
+def create_branch_hierarchy(submodules_hierarchy, repo_name, branch_name, rename_branch, get_commit_sha, create_branch,
+                            update_submodules, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Create a new branch structure over a resolved submodule graph, leaves first.
+
+    Every (repository, branch) of the graph gets a new branch named by rename_branch, created
+    once also when it is shared by several parents. Repositories are grouped by their height in
+    the graph (leaves have height 0, the top repository is last) and all repositories of one
+    height are processed concurrently on a bounded thread pool. Each parent re-points all its
+    submodules to their new branches in a single commit once all of them exist. Submodules whose
+    branch name doesn't change are kept as they are, together with everything below them, and
+    submodules closing a cycle are left untouched.
+
+    When called from a task, every created repository branch is reported as one of its steps.
+
+    Args:
+        submodules_hierarchy (list): (name, repo, branch, path, children) tuples from resolve_submodules_hierarchy.
+        repo_name (str): Top repository name.
+        branch_name (str): Top repository branch.
+        rename_branch (callable): Returns the new branch name for a branch name.
+        get_commit_sha (callable): Returns the head commit SHA of a (repo, branch), or None if not found.
+        create_branch (callable): Creates a (repo, new branch) at the commit SHA, raises if it fails.
+        update_submodules (callable): Re-points submodules of a (repo, new branch) given as
+            (name, path, branch, sha) tuples in one commit, returns whether a commit was made.
+        max_workers (int): Maximum number of concurrently processed repositories.
+
+    Returns:
+        int: Number of created branches.
+
+    Raises:
+        Exception: If a head commit is not found or any step fails. Repositories of later
+        levels are not processed then.
+    """
+    root = (repo_name, branch_name)
+    submodules_by_repo_branch = {}
+    collect_branch_hierarchy(submodules_by_repo_branch, root, submodules_hierarchy, rename_branch)
+
+    heights = {}
+    for repo_branch in submodules_by_repo_branch:
+        branch_hierarchy_height(submodules_by_repo_branch, repo_branch, heights)
+    levels = [[] for _ in range(heights[root] + 1)]
+    for repo_branch, height in heights.items():
+        levels[height].append(repo_branch)
+
+    # SHA the parent should point to, None when the new branch got a commit and the parent has to read the head
+    new_heads = {}
+
+    def create(repo_branch):
+        sub_repo_name, sub_branch_name = repo_branch
+        new_branch_name = rename_branch(sub_branch_name)
+        commit_sha = get_commit_sha(sub_repo_name, sub_branch_name)
+        if commit_sha is None:
+            raise Exception(f"Head commit of {sub_repo_name}/{sub_branch_name} not found, creation of the branch structure stopped.")
+        create_branch(sub_repo_name, new_branch_name, commit_sha)
+
+        changes = [(submodule_name, submodule_path, rename_branch(sub_key[1]), new_heads[sub_key])
+                   for submodule_name, submodule_path, sub_key in submodules_by_repo_branch[repo_branch]]
+        if changes and update_submodules(sub_repo_name, new_branch_name, changes):
+            return None
+        return commit_sha
+
+    task = current_task()
+    if task is not None:
+        task.set_total(len(heights))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in levels:
+            # Submodules of every repository in this level are already created in previous levels
+            for repo_branch, new_head in zip(level, executor.map(bind_current_task(create), level)):
+                new_heads[repo_branch] = new_head
+                if task is not None:
+                    task.step()
+
+    return len(new_heads)
+
+
+def collect_branch_hierarchy(submodules_by_repo_branch, repo_branch, submodules, rename_branch):
+    if repo_branch in submodules_by_repo_branch:
+        return
+    submodules_by_repo_branch[repo_branch] = []
+    for submodule_name, sub_repo_name, sub_branch_name, submodule_path, children in submodules:
+        if children is None or rename_branch(sub_branch_name) == sub_branch_name:
+            continue # Cycle or branch name not affected, submodule stays as it is
+        key = (sub_repo_name, sub_branch_name)
+        submodules_by_repo_branch[repo_branch].append((submodule_name, submodule_path, key))
+        collect_branch_hierarchy(submodules_by_repo_branch, key, children, rename_branch)
+
+
+def branch_hierarchy_height(submodules_by_repo_branch, repo_branch, heights):
+    if repo_branch not in heights:
+        heights[repo_branch] = max((branch_hierarchy_height(submodules_by_repo_branch, sub_key, heights) + 1
+                                    for _, _, sub_key in submodules_by_repo_branch[repo_branch]), default=0)
+    return heights[repo_branch]
@@ -0,0 +1,75 @@
+import tkinter as tk
+from tkinter import ttk
+
+from task_runtime import TASK_RUNNING, TASK_QUEUED
+from ui_dispatcher import post_to_ui
+
+
+class TaskPanel(tk.Frame):
+    """
+    Lists background tasks with their progress, issued API calls and ETA.
+
+    Replaces the modal "Processing..." popups: the window stays usable while tasks run and
+    the selected running or queued task can be cancelled.
+
+    Attributes:
+        runtime (TaskRuntime): Runtime whose tasks are shown.
+    """
+
+    def __init__(self, parent, runtime, height=4):
+        super().__init__(parent)
+        self.runtime = runtime
+        self.items = {} # task id -> treeview item
+
+        self.tasks_tree = ttk.Treeview(self, columns=("progress", "calls", "eta", "state"), height=height, selectmode="browse")
+        self.tasks_tree.heading("#0", text="Task", anchor=tk.W)
+        self.tasks_tree.heading("progress", text="Progress")
+        self.tasks_tree.heading("calls", text="API calls")
+        self.tasks_tree.heading("eta", text="ETA")
+        self.tasks_tree.heading("state", text="State")
+        self.tasks_tree.column("#0", width=320)
+        for column in ("progress", "calls", "eta", "state"):
+            self.tasks_tree.column(column, width=80, anchor=tk.CENTER)
+        self.tasks_tree.pack(side='left', fill='x', expand=True)
+
+        self.cancel_button = tk.Button(self, text="Cancel task", command=self.cancel_selected)
+        self.cancel_button.pack(side='right', padx=5)
+
+        # Listener is called from worker threads, refreshes coalesce on the UI thread
+        self.runtime.add_listener(lambda: post_to_ui(self.refresh, key='task_panel'))
+
+    def refresh(self):
+        tasks = self.runtime.list_tasks()
+        task_ids = {task.task_id for task in tasks}
+        for task_id in [task_id for task_id in self.items if task_id not in task_ids]:
+            self.tasks_tree.delete(self.items.pop(task_id))
+
+        for task in tasks:
+            values = (format_progress(task), task.calls, format_eta(task.eta()),
+                      "cancelling" if task.token.cancelled and task.state == TASK_RUNNING else task.state)
+            if task.task_id in self.items:
+                self.tasks_tree.item(self.items[task.task_id], values=values)
+            else:
+                # Newest tasks on top
+                self.items[task.task_id] = self.tasks_tree.insert('', 0, text=task.name, values=values)
+
+    def cancel_selected(self):
+        selection = self.tasks_tree.selection()
+        for task_id, item in self.items.items():
+            if item in selection:
+                task = self.runtime.tasks.get(task_id)
+                if task is not None and task.state in (TASK_QUEUED, TASK_RUNNING):
+                    self.runtime.cancel(task_id)
+
+
+def format_progress(task):
+    if task.total_steps:
+        return f"{task.done_steps}/{task.total_steps}"
+    return str(task.done_steps) if task.done_steps else ""
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,230 @@
+import functools
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from message_type import MessageType, print_message
+
+
+DEFAULT_TASK_WORKERS = 4
+# Finished tasks kept in the registry so the task panel can still show how they ended
+DEFAULT_FINISHED_TASKS = 20
+
+TASK_QUEUED = "queued"
+TASK_RUNNING = "running"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+TASK_CANCELLED = "cancelled"
+
+
+class TaskCancelled(BaseException):
+    # BaseException (like asyncio.CancelledError), so `except Exception` handlers along the way don't swallow it
+    pass
+
+
+class CancellationToken:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise TaskCancelled()
+
+    def wait(self, timeout):
+        """Sleep for timeout seconds, raises TaskCancelled as soon as the token is cancelled."""
+        if self.event.wait(timeout):
+            raise TaskCancelled()
+
+
+class Task:
+    """
+    A unit of background work with progress and cooperative cancellation.
+
+    Attributes:
+        task_id (int): Registry id.
+        name (str): Shown in the task panel.
+        token (CancellationToken): Checked between steps and before every GitHub API call.
+        total_steps (int): Number of steps, None while unknown.
+        done_steps (int): Number of finished steps.
+        calls (int): Number of GitHub API calls issued by the task.
+        state (str): One of TASK_QUEUED, TASK_RUNNING, TASK_DONE, TASK_FAILED, TASK_CANCELLED.
+    """
+
+    def __init__(self, task_id, name, on_change):
+        self.task_id = task_id
+        self.name = name
+        self.token = CancellationToken()
+        self.total_steps = None
+        self.done_steps = 0
+        self.calls = 0
+        self.state = TASK_QUEUED
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.lock = threading.Lock()
+        self.on_change = on_change
+
+    def set_total(self, total_steps):
+        self.total_steps = total_steps
+        self.on_change()
+
+    def step(self, steps=1):
+        """Mark steps as done, raises TaskCancelled if the task was cancelled meanwhile."""
+        with self.lock:
+            self.done_steps += steps
+        self.on_change()
+        self.token.raise_if_cancelled()
+
+    def count_call(self):
+        with self.lock:
+            self.calls += 1
+        self.token.raise_if_cancelled()
+
+    def raise_if_cancelled(self):
+        self.token.raise_if_cancelled()
+
+    def eta(self):
+        """Return estimated seconds left from the average step duration so far, None while unknown."""
+        if self.state != TASK_RUNNING or not self.total_steps or not self.done_steps:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed / self.done_steps * max(self.total_steps - self.done_steps, 0)
+
+
+class TaskRuntime:
+    """
+    Bounded worker pool running Tasks, with a registry of running and recently finished tasks.
+
+    Listeners are called (from worker threads) whenever a task is added, progresses or
+    finishes, e.g. to refresh the task panel through the UI dispatcher.
+
+    Attributes:
+        max_workers (int): Maximum number of tasks running at once, the rest wait queued.
+    """
+
+    def __init__(self, max_workers=DEFAULT_TASK_WORKERS, max_finished=DEFAULT_FINISHED_TASKS):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task')
+        self.tasks = OrderedDict()
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def submit(self, name, function, *args):
+        """
+        Queue function(task, *args) to run on the pool.
+
+        Returns:
+            Task: The registered task.
+        """
+        with self.lock:
+            task = Task(next(self.ids), name, self.notify)
+            self.tasks[task.task_id] = task
+        task.future = self.executor.submit(self.run, task, function, args)
+        self.notify()
+        return task
+
+    def run(self, task, function, args):
+        _current.task = task
+        task.started_at = time.monotonic()
+        task.state = TASK_RUNNING
+        self.notify()
+        try:
+            task.raise_if_cancelled()
+            function(task, *args)
+            task.state = TASK_DONE
+        except TaskCancelled:
+            task.state = TASK_CANCELLED
+            print_message(MessageType.WARNING, f"Task <b>{task.name}</b> cancelled after {task.done_steps} steps and {task.calls} API calls.")
+        except Exception as e:
+            task.state = TASK_FAILED
+            print_message(MessageType.ERROR, f"Task <b>{task.name}</b> failed: {e}")
+        finally:
+            _current.task = None
+            task.finished_at = time.monotonic()
+            self.prune()
+            self.notify()
+
+    def cancel(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is not None:
+            task.token.cancel()
+            self.notify()
+
+    def list_tasks(self):
+        with self.lock:
+            return list(self.tasks.values())
+
+    def prune(self):
+        with self.lock:
+            finished = [task_id for task_id, task in self.tasks.items() if task.finished_at is not None]
+            for task_id in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self.tasks[task_id]
+
+    def shutdown(self):
+        for task in self.list_tasks():
+            task.token.cancel()
+        self.executor.shutdown(wait=False)
+
+
+_current = threading.local()
+
+
+def current_task():
+    """Return the task running on this thread, None outside of tasks."""
+    return getattr(_current, 'task', None)
+
+
+def bind_current_task(function):
+    """Wrap function so it runs as part of the current task also on another thread (e.g. an inner thread pool)."""
+    task = current_task()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        previous = current_task()
+        _current.task = task
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.task = previous
+    return wrapper
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def configure_task_runtime(max_workers=DEFAULT_TASK_WORKERS):
+    """Replace the shared task runtime with one running at most max_workers tasks at once."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.shutdown()
+        _runtime = TaskRuntime(max_workers)
+        return _runtime
+
+
+def get_task_runtime():
+    """Return the shared task runtime, creating it with default settings on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = TaskRuntime()
+        return _runtime
@@ -0,0 +1,85 @@
+import datetime
+import threading
+import unittest
+from unittest.mock import patch, Mock
+import async_transport
+from async_transport import AsyncGitHubTransport, to_requests_response
+from github_transport import GitHubTransport
+from task_runtime import TASK_CANCELLED, TaskRuntime
+
+
+class TestAsyncGitHubTransport(unittest.TestCase):
+    URL = "https://api.github.com/repos/org/repo"
+
+    def setUp(self):
+        self.transport = GitHubTransport(pool_size=4)
+        patch("async_transport.get_transport", return_value=self.transport).start()
+        # Requests go over the pooled session, also when httpx happens to be installed
+        patch.object(async_transport, "httpx", None).start()
+        self.async_transport = AsyncGitHubTransport(max_concurrency=10)
+        self.addCleanup(patch.stopall)
+        self.addCleanup(self.async_transport.close)
+
+    def test_gather_runs_requests_concurrently_in_order(self):
+        # Every request waits until all of them are in flight
+        barrier = threading.Barrier(4, timeout=5)
+
+        def request(method, url, **kwargs):
+            barrier.wait()
+            return Mock(status_code=200, headers={}, url=url)
+
+        with patch.object(self.transport.session, "request", side_effect=request):
+            responses = self.async_transport.gather([("GET", f"{self.URL}/{i}", {}, None) for i in range(4)])
+
+        self.assertEqual([response.url for response in responses], [f"{self.URL}/{i}" for i in range(4)])
+
+    def test_request_is_revalidated_against_shared_cache(self):
+        first = Mock(status_code=200, headers={"ETag": '"abc"'}, content=b"{}", encoding="utf-8")
+        not_modified = Mock(status_code=304, headers={}, url=self.URL, request=None, elapsed=datetime.timedelta())
+        with patch.object(self.transport.session, "request", side_effect=[first, not_modified]) as mock_request:
+            self.async_transport.request("GET", self.URL)
+            response = self.async_transport.request("GET", self.URL)
+
+        self.assertEqual(mock_request.call_args[1]["headers"]["If-None-Match"], '"abc"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.transport.cache.stats()["not_modified"], 1)
+
+    def test_calls_are_counted_for_the_calling_task(self):
+        runtime = TaskRuntime(max_workers=1)
+        self.addCleanup(runtime.shutdown)
+
+        def work(task):
+            self.async_transport.gather([("GET", f"{self.URL}/{i}", {}, None) for i in range(3)])
+            task.token.cancel()
+            self.async_transport.request("GET", self.URL)
+
+        with patch.object(self.transport.session, "request", return_value=Mock(status_code=200, headers={})) as mock_request, \
+             patch("task_runtime.print_message"):
+            task = runtime.submit("work", work)
+            task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_CANCELLED)
+        self.assertEqual(task.calls, 4)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_gather_can_return_exceptions(self):
+        responses = [Mock(status_code=200, headers={}), ConnectionError("down")]
+        with patch.object(self.transport.session, "request", side_effect=responses):
+            results = self.async_transport.gather([("GET", f"{self.URL}/1", {}, None), ("GET", f"{self.URL}/2", {}, None)],
+                                                  return_exceptions=True)
+
+        self.assertEqual(results[0].status_code, 200)
+        self.assertIsInstance(results[1], ConnectionError)
+
+    def test_httpx_response_is_converted(self):
+        httpx_response = Mock(status_code=200, reason_phrase="OK", headers={"ETag": '"abc"'}, content=b'{"a": 1}',
+                              encoding="utf-8", url=self.URL, elapsed=datetime.timedelta())
+
+        response = to_requests_response(httpx_response)
+
+        self.assertEqual(response.json(), {"a": 1})
+        self.assertEqual(response.headers["etag"], '"abc"')
+
+
+if __name__ == '__main__':
+    unittest.main()
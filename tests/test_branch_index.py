@@ -0,0 +1,45 @@
+import unittest
+from branch_index import BranchIndex, BranchInfo, parse_branch
+
+
+class TestBranchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = BranchIndex([
+            "main",
+            "Release/1.10",
+            "Release/1.9",
+            "Release/1.9.1",
+            "Features/team3/1.10/Push/BUG-1",
+            "Features/team3/1.9/BUG-2",
+            "Features/team3/Push/BUG-3",
+            "Features/team30/2.0/BUG-4",
+        ])
+
+    def test_branch_name_is_classified(self):
+        self.assertEqual(parse_branch("Features/team3/1.10/Push/BUG-1"),
+                         BranchInfo("Features/team3/1.10/Push/BUG-1", "Features", "team3", "1.10", True, "BUG-1"))
+        self.assertEqual(parse_branch("Features/team3/Push/BUG-3"),
+                         BranchInfo("Features/team3/Push/BUG-3", "Features", "team3", None, True, "BUG-3"))
+        self.assertEqual(parse_branch("main"), BranchInfo("main", None, None, None, False, "main"))
+
+    def test_versions_are_sorted_numerically(self):
+        self.assertEqual(self.index.versions("Release"), ["1.9", "1.9.1", "1.10"])
+        self.assertEqual(self.index.versions("Features", "team3"), ["1.9", "1.10"])
+
+    def test_branches_are_looked_up_by_type_team_and_version(self):
+        self.assertEqual(self.index.branches("Features", "team3"),
+                         ["Features/team3/1.10/Push/BUG-1", "Features/team3/1.9/BUG-2", "Features/team3/Push/BUG-3"])
+        self.assertEqual(self.index.branches("Features", "team3", "1.9"), ["Features/team3/1.9/BUG-2"])
+        # Versions match exactly, 1.9 doesn't include 1.9.1
+        self.assertEqual(self.index.branches("Release", None, "1.9"), ["Release/1.9"])
+        self.assertEqual(self.index.branches("Features", "team4"), [])
+
+    def test_unnumbered_versions_sort_after_numbered(self):
+        index = BranchIndex(["Release/next", "Release/2.0"])
+
+        self.assertEqual(index.versions("Release"), ["2.0", "next"])
+
+
+if __name__ == '__main__':
+    unittest.main()
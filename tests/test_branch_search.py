@@ -0,0 +1,111 @@
+import unittest
+from branch_search import BranchSearchIndex, best_fuzzy_score
+
+STRUCTURE = {
+    "main": {},
+    "Release": {"1.0": {}, "2.0": {}},
+    "Features": {"team3": {"1.0": {"Push": {"BUG-1": {}}, "BUG-2": {}}}},
+}
+
+
+class TestBranchSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = BranchSearchIndex(STRUCTURE)
+
+    def paths(self, query):
+        return [self.index.paths[path_id] for path_id in self.index.search(query)]
+
+    def test_paths_are_indexed_in_structure_order(self):
+        self.assertEqual(self.index.paths, ["main", "Release/1.0", "Release/2.0", "Features/team3/1.0/Push/BUG-1", "Features/team3/1.0/BUG-2"])
+
+    def test_substring_of_full_path_ignoring_case(self):
+        self.assertEqual(self.paths("release/2"), ["Release/2.0"])
+        self.assertEqual(self.paths("BUG"), ["Features/team3/1.0/Push/BUG-1", "Features/team3/1.0/BUG-2"])
+        self.assertEqual(self.paths("1.0"), ["Release/1.0", "Features/team3/1.0/Push/BUG-1", "Features/team3/1.0/BUG-2"])
+
+    def test_short_query_scans_all_paths(self):
+        self.assertEqual(self.paths("ma"), ["main"])
+
+    def test_extended_query_narrows_previous_results(self):
+        self.paths("bug")
+        self.index.lower_paths[4] = "changed" # Only previous results are rechecked, not the index
+
+        self.assertEqual(self.paths("bug-"), ["Features/team3/1.0/Push/BUG-1"])
+
+    def test_structure_of_results(self):
+        self.assertEqual(self.index.structure(self.index.search("bug-1")), {"Features": {"team3": {"1.0": {"Push": {"BUG-1": {}}}}}})
+
+    def test_fuzzy_matches_subsequence_ranked_by_segment_starts(self):
+        ranked = [self.index.paths[path_id] for path_id in self.index.fuzzy_search("ft1pb")]
+
+        self.assertEqual(ranked, ["Features/team3/1.0/Push/BUG-1"])
+        self.assertEqual([self.index.paths[path_id] for path_id in self.index.fuzzy_search("r2")][0], "Release/2.0")
+
+    def test_fuzzy_limit_returns_best_matches(self):
+        self.assertEqual(self.index.fuzzy_search("b", limit=1), [3])
+        self.assertEqual(len(self.index.fuzzy_search("b")), 2)
+
+    def test_fuzzy_limit_matches_head_of_full_ranking(self):
+        structure = {"a": {f"r{i}": {} for i in range(5)}, "Features": {f"team{i}": {"1.0": {f"BUG-{i}": {}}} for i in range(30)},
+                     "Release": {f"{i}.0": {} for i in range(30)}, "r": {"x": {}}, "r-x": {}}
+        index = BranchSearchIndex(structure)
+
+        for query in ("r", "rx", "r/x", "t3bug", "rel", "f1"):
+            ranked = index.fuzzy_search(query)
+            index.last_fuzzy_query = None
+            self.assertEqual(index.fuzzy_search(query, limit=5), ranked[:5], query)
+            index.last_fuzzy_query = None
+
+    def test_fuzzy_best_score_stops_early(self):
+        # Ten paths reach the best possible score, only the first two have to be scored
+        index = BranchSearchIndex({"a": {f"b{i}": {} for i in range(10)}})
+
+        self.assertEqual(index.fuzzy_search("ab", limit=2), [0, 1])
+        self.assertIsNone(index.last_fuzzy_query)
+
+    def test_fuzzy_best_score_with_gaps_stops_early(self):
+        # Every character starts a segment one separator after the previous one, scores are exact integers
+        index = BranchSearchIndex({"a": {"b": {"c": {f"d{i}": {} for i in range(10)}}}})
+
+        self.assertEqual(best_fuzzy_score("abcd"), 90 + 3 * 89)
+        self.assertEqual(index.fuzzy_search("abcd", limit=2), [0, 1])
+        self.assertIsNone(index.last_fuzzy_query)
+
+    def test_fuzzy_extended_query_narrows_previous_results(self):
+        self.index.fuzzy_search("fb")
+        self.index.lower_paths[0] = "fbx" # Only previous results are rechecked
+
+        self.assertNotIn(0, self.index.fuzzy_search("fbx"))
+
+    def test_regex_over_full_paths(self):
+        self.assertEqual(self.paths_of(self.index.regex_search(r"^release/\d")), ["Release/1.0", "Release/2.0"])
+        self.assertEqual(self.paths_of(self.index.regex_search(r"bug-\d$")), ["Features/team3/1.0/Push/BUG-1", "Features/team3/1.0/BUG-2"])
+        self.assertEqual(self.paths_of(self.index.regex_search(r"main\nrelease")), [])
+
+    def paths_of(self, path_ids):
+        return [self.index.paths[path_id] for path_id in path_ids]
+
+    def test_created_path_is_found(self):
+        self.paths("rel")
+        self.index.fuzzy_search("r3")
+        self.index.add_path("Release/3.0")
+
+        self.assertEqual(self.paths("release"), ["Release/1.0", "Release/2.0", "Release/3.0"])
+        self.assertEqual(self.paths_of(self.index.fuzzy_search("r3"))[0], "Release/3.0")
+        self.assertEqual(self.paths_of(self.index.regex_search(r"3\.0$")), ["Release/3.0"])
+
+    def test_deleted_path_is_not_found(self):
+        self.index.fuzzy_search("bug")
+        self.index.remove_path("Features/team3/1.0/BUG-2")
+
+        self.assertEqual(self.paths("bug"), ["Features/team3/1.0/Push/BUG-1"])
+        self.assertEqual(self.paths("b"), ["Features/team3/1.0/Push/BUG-1"])
+        self.assertEqual(self.paths_of(self.index.fuzzy_search("bug")), ["Features/team3/1.0/Push/BUG-1"])
+        self.assertEqual(self.paths_of(self.index.regex_search(r".*")), ["main", "Release/1.0", "Release/2.0", "Features/team3/1.0/Push/BUG-1"])
+        self.assertEqual(self.index.paths[1], "Release/1.0")
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,366 @@
+import json
+import unittest
+from unittest.mock import call, patch, Mock
+import requests
+from github import GithubException
+from task_runtime import TASK_FAILED, TaskRuntime
+from BranchBrowser import CreateReleaseBranchDialog, GitHubClient, create_branch_structure, get_submodules_info, get_submodules_infos, token_snapshot_key
+
+GITMODULES_CONTENT = '''[submodule "sub1"]
+\tpath = sub1
+\turl = ../sub1.git
+\tbranch = Release/1.0
+[submodule "sub2"]
+\tpath = libs/sub2
+\turl = ../sub2.git
+'''
+
+
+def graphql_page(names, has_next_page, end_cursor=None):
+    return {
+        'repository': {
+            'refs': {
+                'pageInfo': {'hasNextPage': has_next_page, 'endCursor': end_cursor},
+                'nodes': [{'name': name, 'target': {'oid': f'sha-{name}', 'committedDate': '2024-01-01T00:00:00Z'}} for name in names]
+            }
+        }
+    }
+
+
+class TestGitHubClientBranches(unittest.TestCase):
+    ORG = "TestOrg"
+    REPO = "TestRepo"
+
+    def setUp(self):
+        with patch("BranchBrowser.Github"):
+            self.client = GitHubClient("github.com", "token")
+
+    def test_graphql_branches_follow_cursor(self):
+        pages = [graphql_page(["main", "Release/1.0"], True, "c1"), graphql_page(["Features/team3/1.0/Push/BUG-1"], False)]
+        with patch.object(self.client, "graphql_query", side_effect=pages) as mock_query:
+            structure = self.client.get_repo_branches_structure(self.ORG, self.REPO)
+
+        self.assertEqual(structure, {
+            "main": {},
+            "Release": {"1.0": {}},
+            "Features": {"team3": {"1.0": {"Push": {"BUG-1": {}}}}}
+        })
+        self.assertEqual(mock_query.call_args_list[1][0][1]["cursor"], "c1")
+
+    def test_graphql_heads_include_sha_and_date(self):
+        with patch.object(self.client, "graphql_query", return_value=graphql_page(["main"], False)):
+            heads = self.client.get_repo_branches_heads(self.ORG, self.REPO)
+
+        self.assertEqual(heads, [("main", "sha-main", "2024-01-01T00:00:00Z")])
+
+    def test_prefixed_branches_are_filtered_by_graphql(self):
+        with patch.object(self.client, "graphql_query", return_value=graphql_page(["1.0/Push/BUG-1"], False)) as mock_query:
+            structure = self.client.get_repo_branches_structure(self.ORG, self.REPO, prefix="Features/team3/")
+
+        self.assertEqual(mock_query.call_args[0][1]["refPrefix"], "refs/heads/Features/team3/")
+        self.assertEqual(structure, {"Features": {"team3": {"1.0": {"Push": {"BUG-1": {}}}}}})
+
+    def test_prefixed_branches_use_matching_refs_over_rest(self):
+        self.client.use_graphql = False
+        refs = [{"ref": "refs/heads/Release/1.0", "object": {"sha": "sha1"}}]
+        with patch.object(self.client, "rest_list", return_value=refs) as mock_rest_list:
+            branches = self.client.get_organization_repo_branches(self.ORG, self.REPO, "Release/")
+
+        self.assertEqual(branches, ["Release/1.0"])
+        mock_rest_list.assert_called_once_with("/repos/TestOrg/TestRepo/git/matching-refs/heads/Release/")
+
+    @patch("BranchBrowser.handle_and_print_exception")
+    def test_rest_fallback_when_graphql_is_missing(self, mock_handle):
+        error = Exception("Not Found")
+        error.response = Mock(status_code=404)
+        with patch.object(self.client, "graphql_query", side_effect=error), \
+             patch.object(self.client, "rest_list", return_value=[{"name": "main", "commit": {"sha": "sha-main"}}]) as mock_rest_list:
+            structure = self.client.get_repo_branches_structure(self.ORG, self.REPO)
+
+        self.assertEqual(structure, {"main": {}})
+        self.assertFalse(self.client.use_graphql)
+        mock_handle.assert_called_once()
+        mock_rest_list.assert_called_once_with("/repos/TestOrg/TestRepo/branches")
+
+
+class TestGitHubClientSnapshots(unittest.TestCase):
+    ORG = "TestOrg"
+
+    def setUp(self):
+        self.snapshot_store = Mock()
+        self.snapshot_store.load.return_value = ["last-known-repo"]
+        with patch("BranchBrowser.Github") as mock_github:
+            mock_github.return_value.get_user.return_value.login = "TestUser"
+            self.client = GitHubClient("github.com", "token", snapshot_store=self.snapshot_store)
+        self.get_repos = patch.object(self.client, "rest_list").start()
+        self.addCleanup(patch.stopall)
+
+    def test_cached_request_is_served_from_snapshot(self):
+        repos = self.client.get_organization_repos_names(self.ORG, cached=True)
+
+        self.assertEqual(repos, ["last-known-repo"])
+        self.get_repos.assert_not_called()
+
+    def test_fresh_data_is_saved_as_snapshot(self):
+        self.get_repos.return_value = [{"name": "repo1"}]
+
+        repos = self.client.get_organization_repos_names(self.ORG)
+
+        self.assertEqual(repos, ["repo1"])
+        self.snapshot_store.save.assert_called_with("TestUser@github.com", "repositories", self.ORG, ["repo1"])
+
+    def test_snapshots_are_kept_per_user(self):
+        self.snapshot_store.save.assert_called_with("github.com", "username", token_snapshot_key("token"), "TestUser")
+        with patch("BranchBrowser.Github") as mock_github:
+            mock_github.return_value.get_user.return_value.login = "OtherUser"
+            self.client.set_token("other-token")
+
+        self.client.get_organization_repos_names(self.ORG, cached=True)
+
+        self.snapshot_store.save.assert_called_with("github.com", "username", token_snapshot_key("other-token"), "OtherUser")
+        self.snapshot_store.load.assert_called_with("OtherUser@github.com", "repositories", self.ORG)
+        self.assertNotIn("other-token", str(self.snapshot_store.mock_calls))
+
+    @patch("BranchBrowser.print_message")
+    def test_unreachable_api_falls_back_to_snapshot(self, mock_print_message):
+        self.get_repos.side_effect = requests.ConnectionError()
+
+        repos = self.client.get_organization_repos_names(self.ORG)
+
+        self.assertEqual(repos, ["last-known-repo"])
+
+    @patch("BranchBrowser.print_message")
+    def test_offline_client_is_read_only(self, mock_print_message):
+        with patch("BranchBrowser.Github") as mock_github:
+            type(mock_github.return_value.get_user.return_value).login = property(Mock(side_effect=requests.ConnectionError()))
+            self.snapshot_store.load.return_value = "TestUser"
+            client = GitHubClient("github.com", "token", snapshot_store=self.snapshot_store)
+
+        client.organization_repo_create_branch(self.ORG, "TestRepo", "new-branch", "sha")
+
+        self.assertTrue(client.offline)
+        self.assertEqual(client.get_username(), "TestUser")
+        # The user is looked up by the token, data of the account last used with another token isn't shown
+        self.snapshot_store.load.assert_called_with("github.com", "username", token_snapshot_key("token"))
+        client.github.get_repo.assert_not_called()
+
+
+class TestGitHubClientHandles(unittest.TestCase):
+    ORG = "TestOrg"
+    REPO = "TestRepo"
+
+    def setUp(self):
+        with patch("BranchBrowser.Github"):
+            self.client = GitHubClient("github.com", "token")
+
+    def test_repo_handle_is_shared_by_client_methods(self):
+        self.client.get_organization_repo_branch_commit_sha(self.ORG, self.REPO, "main")
+        self.client.organization_repo_create_branch(self.ORG, self.REPO, "new", "sha")
+        self.client.get_organization_repo_branch_head_sha(self.ORG, self.REPO, "main")
+
+        self.client.github.get_repo.assert_called_once_with("TestOrg/TestRepo", lazy=True)
+        self.client.github.get_organization.assert_not_called()
+
+    def test_token_change_invalidates_handles(self):
+        self.client.get_repo_handle(self.ORG, self.REPO)
+        with patch("BranchBrowser.Github") as mock_github:
+            self.client.set_token("new-token")
+        self.client.get_repo_handle(self.ORG, self.REPO)
+
+        mock_github.return_value.get_repo.assert_called_once_with("TestOrg/TestRepo", lazy=True)
+        self.assertEqual(self.client.rest_headers["Authorization"], "token new-token")
+        self.assertEqual(self.client.graphql_headers["Authorization"], "bearer new-token")
+
+    def test_branch_lists_are_cached_for_the_session(self):
+        branches = [{"name": "main"}, {"name": "Release/1.0"}, {"name": "Features/team3/1.0/BUG-1"}]
+        with patch.object(self.client, "rest_list", return_value=branches) as mock_rest_list:
+            all_branches = self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True)
+            release_branches = self.client.get_organization_repo_branches(self.ORG, self.REPO, "Release/", cached=True)
+            self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True)
+
+        self.assertEqual(all_branches, ["main", "Release/1.0", "Features/team3/1.0/BUG-1"])
+        # The namespace is filtered from the cached list of all branches
+        self.assertEqual(release_branches, ["Release/1.0"])
+        mock_rest_list.assert_called_once()
+
+    def test_branch_changes_invalidate_cached_branch_lists(self):
+        with patch.object(self.client, "rest_list", return_value=[{"name": "main"}]) as mock_rest_list:
+            self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True)
+            self.client.get_organization_repo_branches(self.ORG, "other", cached=True)
+            self.client.organization_repo_create_branch(self.ORG, self.REPO, "new", "sha")
+            self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True)
+            self.client.get_organization_repo_branches(self.ORG, "other", cached=True)
+
+        # Only the lists of the changed repository are fetched again
+        self.assertEqual(mock_rest_list.call_args_list, [call(f"/repos/{self.ORG}/{self.REPO}/branches"),
+                                                         call(f"/repos/{self.ORG}/other/branches"),
+                                                         call(f"/repos/{self.ORG}/{self.REPO}/branches")])
+
+    @patch("BranchBrowser.handle_and_print_exception")
+    def test_failed_branch_creation_keeps_cached_branch_lists(self, mock_handle):
+        self.client.get_repo_handle = Mock()
+        self.client.get_repo_handle.return_value.create_git_ref.side_effect = GithubException(422, "Reference already exists")
+        self.client.branch_lists.put((self.ORG, self.REPO, ''), ["main"])
+
+        self.assertFalse(self.client.organization_repo_create_branch(self.ORG, self.REPO, "main", "sha"))
+        self.assertEqual(self.client.get_cached_organization_repo_branches(self.ORG, self.REPO), ["main"])
+
+    def test_list_fetched_during_branch_creation_is_not_cached(self):
+        def fetch(url):
+            # The branch is created while the list is being fetched
+            self.client.organization_repo_create_branch(self.ORG, self.REPO, "new", "sha")
+            return [{"name": "main"}]
+
+        with patch.object(self.client, "rest_list", side_effect=fetch):
+            self.assertEqual(self.client.get_organization_repo_branches(self.ORG, self.REPO), ["main"])
+
+        self.assertIsNone(self.client.get_cached_organization_repo_branches(self.ORG, self.REPO))
+
+    @patch("BranchBrowser.handle_and_print_exception")
+    def test_failed_branch_listing_is_not_cached(self, mock_handle):
+        with patch.object(self.client, "rest_list", side_effect=[requests.ConnectionError("down"), [{"name": "main"}]]):
+            self.assertEqual(self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True), [])
+            self.assertEqual(self.client.get_organization_repo_branches(self.ORG, self.REPO, cached=True), ["main"])
+
+
+def page_response(items, page, last_page):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(items).encode('utf-8')
+    if last_page > 1:
+        url = "https://api.github.com/orgs/TestOrg/repos?per_page=100"
+        response.headers["Link"] = f'<{url}&page={min(page + 1, last_page)}>; rel="next", <{url}&page={last_page}>; rel="last"'
+    return response
+
+
+class TestGitHubClientPagination(unittest.TestCase):
+    ORG = "TestOrg"
+
+    def setUp(self):
+        with patch("BranchBrowser.Github"):
+            self.client = GitHubClient("github.com", "token")
+        self.async_transport = patch("BranchBrowser.get_async_transport").start().return_value
+        self.addCleanup(patch.stopall)
+
+    def test_remaining_pages_are_requested_at_once_and_joined_in_order(self):
+        self.async_transport.request.return_value = page_response([{"name": "repo1"}], 1, 3)
+        self.async_transport.gather.return_value = [page_response([{"name": "repo2"}], 2, 3), page_response([{"name": "repo3"}], 3, 3)]
+
+        repos = self.client.get_organization_repos_names(self.ORG)
+
+        self.assertEqual(repos, ["repo1", "repo2", "repo3"])
+        self.async_transport.request.assert_called_once_with("GET", "https://api.github.com/orgs/TestOrg/repos?per_page=100", self.client.rest_headers)
+        self.assertEqual([request[1] for request in self.async_transport.gather.call_args[0][0]],
+                         ["https://api.github.com/orgs/TestOrg/repos?per_page=100&page=2", "https://api.github.com/orgs/TestOrg/repos?per_page=100&page=3"])
+
+    def test_single_page_makes_one_request(self):
+        self.async_transport.request.return_value = page_response([{"name": "team3"}], 1, 1)
+        self.async_transport.gather.return_value = []
+
+        self.assertEqual(self.client.get_organization_teams(self.ORG), ["team3"])
+        self.assertEqual(self.async_transport.gather.call_args[0][0], [])
+
+
+class TestGitHubClientSubmodules(unittest.TestCase):
+    ORG = "TestOrg"
+    REPO = "TestRepo"
+
+    def setUp(self):
+        with patch("BranchBrowser.Github"):
+            self.client = GitHubClient("github.com", "token")
+        self.repo = self.client.github.get_repo.return_value
+        self.repo.get_git_ref.return_value.object.sha = "sha1"
+
+    def test_submodules_are_parsed_once_per_commit(self):
+        self.repo.get_contents.return_value.decoded_content = GITMODULES_CONTENT.encode('utf-8')
+
+        first = get_submodules_info(self.client, self.ORG, self.REPO, "Release/2.0")
+        second = get_submodules_info(self.client, self.ORG, self.REPO, "Release/2.0")
+
+        expected = [("sub1", "sub1", "Release/1.0", "sub1"), ("sub2", "sub2", "Release/2.0", "libs/sub2")]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.repo.get_contents.assert_called_once_with(".gitmodules", ref="sha1")
+
+    def test_missing_gitmodules_is_cached(self):
+        self.repo.get_contents.side_effect = GithubException(404, {"message": "Not Found"}, None)
+
+        self.assertEqual(get_submodules_info(self.client, self.ORG, self.REPO, "main"), [])
+        self.assertEqual(get_submodules_info(self.client, self.ORG, self.REPO, "main"), [])
+        self.repo.get_contents.assert_called_once()
+
+    def test_new_head_commit_is_fetched_again(self):
+        self.repo.get_contents.side_effect = GithubException(404, {"message": "Not Found"}, None)
+        get_submodules_info(self.client, self.ORG, self.REPO, "main")
+        self.repo.get_git_ref.return_value.object.sha = "sha2"
+
+        get_submodules_info(self.client, self.ORG, self.REPO, "main")
+
+        self.assertEqual(self.repo.get_contents.call_count, 2)
+
+    def test_level_submodules_are_requested_in_batches(self):
+        def rest_get_many(paths, accept=None):
+            responses = []
+            for path in paths:
+                if "/git/ref/heads/" in path:
+                    response = Mock(status_code=200)
+                    response.json.return_value = {"object": {"sha": f"sha-{path.split('/')[3]}"}}
+                elif path.startswith("/repos/TestOrg/top/"):
+                    response = Mock(status_code=200, content=GITMODULES_CONTENT.encode('utf-8'))
+                else:
+                    response = Mock(status_code=404)
+                responses.append(response)
+            return responses
+
+        with patch.object(self.client, "rest_get_many", side_effect=rest_get_many) as mock_get_many:
+            first = get_submodules_infos(self.client, self.ORG, [("top", "Release/2.0"), ("leaf", "main")])
+            second = get_submodules_infos(self.client, self.ORG, [("top", "Release/2.0"), ("leaf", "main")])
+
+        expected = [[("sub1", "sub1", "Release/1.0", "sub1"), ("sub2", "sub2", "Release/2.0", "libs/sub2")], []]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        # Refs and contents in one batch each, the second time only refs, .gitmodules come from the cache
+        self.assertEqual(mock_get_many.call_count, 4)
+        self.assertEqual(mock_get_many.call_args_list[0][0][0], ["/repos/TestOrg/top/git/ref/heads/Release/2.0", "/repos/TestOrg/leaf/git/ref/heads/main"])
+        self.assertEqual(mock_get_many.call_args_list[1][0][0], ["/repos/TestOrg/top/contents/.gitmodules?ref=sha-top", "/repos/TestOrg/leaf/contents/.gitmodules?ref=sha-leaf"])
+        self.assertEqual(mock_get_many.call_args_list[3][0][0], [])
+
+
+class TestCreateBranchStructure(unittest.TestCase):
+
+    @patch("BranchBrowser.print_message")
+    def test_failed_branch_creation_stops_the_structure(self, mock_print):
+        github_client = Mock()
+        github_client.get_organization_repo_branch_commit_sha.return_value = "sha"
+        github_client.organization_repo_create_branch.return_value = False
+
+        with self.assertRaises(Exception):
+            create_branch_structure(github_client, "TestOrg", "TestRepo", "Release/1.0", [], lambda name: "Release/2.0")
+
+        mock_print.assert_not_called()
+
+    @patch("task_runtime.print_message")
+    @patch("BranchBrowser.handle_and_print_exception")
+    def test_failed_structure_ends_the_task_failed(self, mock_handle, mock_task_print):
+        dialog = CreateReleaseBranchDialog.__new__(CreateReleaseBranchDialog)
+        dialog.github_client = Mock()
+        dialog.github_client.get_organization_repo_branch_commit_sha.return_value = "sha"
+        dialog.github_client.organization_repo_create_branch.return_value = False
+        dialog.org_name, dialog.repo_name, dialog.branch_name = "TestOrg", "TestRepo", "Release/1.0"
+        dialog.submodules_info = []
+        dialog.search_branch_pattern_val, dialog.replace_branch_pattern_val = "1.0", "2.0"
+        dialog.update_tree = Mock()
+        runtime = TaskRuntime(max_workers=1)
+        self.addCleanup(runtime.shutdown)
+
+        with patch("BranchBrowser.print_message"):
+            task = runtime.submit("release", dialog.process)
+            task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_FAILED)
+        mock_handle.assert_called_once()
+        dialog.update_tree.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import base64
+import unittest
+from unittest.mock import patch
+from BranchBrowser import GitHubRepoSubmoduleManager, SubmoduleChange
+
+API = "https://api.github.com/repos/TestOrg"
+GITMODULES_CONTENT = '''[submodule "sub1"]
+\tpath = sub1
+\turl = ../sub1.git
+\tbranch = Release/1.0
+[submodule "sub2"]
+\tpath = libs/sub2
+\turl = ../sub2.git
+\tbranch = Release/1.0
+'''
+
+
+class TestGitHubRepoSubmoduleManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = GitHubRepoSubmoduleManager("TestOrg", "top", "token")
+        self.requests = []
+        self.responses = {
+            ("GET", f"{API}/top/branches/Release/2.0"): {"commit": {"sha": "top-commit", "commit": {"tree": {"sha": "top-tree"}}}},
+            ("GET", f"{API}/top/git/trees/top-tree?recursive=1"): {"tree": [
+                {"path": ".gitmodules", "type": "blob", "sha": "gitmodules-blob"},
+                {"path": "sub1", "type": "commit", "sha": "sub1-old"},
+                {"path": "libs", "type": "tree", "sha": "libs-tree"},
+                {"path": "libs/sub2", "type": "commit", "sha": "sub2-old"},
+            ]},
+            ("GET", f"{API}/top/git/blobs/gitmodules-blob"): {"content": base64.b64encode(GITMODULES_CONTENT.encode('utf-8')).decode('utf-8')},
+            ("GET", f"{API}/sub3/branches/Release/2.0"): {"commit": {"sha": "sub3-head"}},
+            ("GET", f"{API}/sub4/branches/Release/2.0"): {"commit": {"sha": "sub4-head"}},
+            ("POST", f"{API}/top/git/trees"): {"sha": "new-tree"},
+            ("POST", f"{API}/top/git/commits"): {"sha": "new-commit"},
+            ("PATCH", f"{API}/top/git/refs/heads/Release/2.0"): {"ref": "refs/heads/Release/2.0", "object": {"sha": "new-commit"}},
+        }
+        patch.object(self.manager, "make_request", side_effect=self.make_request).start()
+        patch.object(self.manager, "make_requests", side_effect=lambda method, urls: [self.make_request(method, url) for url in urls]).start()
+        patch("BranchBrowser.print_message").start()
+        self.addCleanup(patch.stopall)
+
+    def make_request(self, method, url, data=None):
+        self.requests.append((method, url, data))
+        return self.responses[(method, url)]
+
+    def posted_tree(self):
+        return next(data for method, url, data in self.requests if url.endswith("/git/trees") and method == "POST")
+
+    def test_all_changes_are_written_in_one_commit(self):
+        changed = self.manager.update_submodules("Release/2.0", [
+            SubmoduleChange("sub1", "sub1", "Release/2.0", "sub1-new"),
+            SubmoduleChange("sub2", "libs/sub2", delete=True),
+            SubmoduleChange("sub3", "sub3", "Release/2.0"),
+        ])
+
+        self.assertEqual(changed, ["sub3", "sub1", "sub2"])
+        self.assertEqual(len(self.requests), 7)
+        self.assertEqual([method for method, _, _ in self.requests].count("POST"), 2)
+        tree = {entry["path"]: entry for entry in self.posted_tree()["tree"]}
+        self.assertEqual(self.posted_tree()["base_tree"], "top-tree")
+        self.assertEqual(tree["sub1"]["sha"], "sub1-new")
+        self.assertIsNone(tree["libs/sub2"]["sha"])
+        self.assertEqual(tree["sub3"]["sha"], "sub3-head")
+        gitmodules = tree[".gitmodules"]["content"]
+        self.assertIn('[submodule "sub3"]', gitmodules)
+        self.assertNotIn('[submodule "sub2"]', gitmodules)
+        self.assertIn("branch = Release/2.0", gitmodules)
+
+    def test_unchanged_pointer_makes_no_commit(self):
+        changed = self.manager.update_submodules("Release/2.0", [SubmoduleChange("sub1", "sub1", sha="sub1-old")])
+
+        self.assertEqual(changed, [])
+        self.assertFalse(any(method in ("POST", "PATCH") for method, _, _ in self.requests))
+
+    def test_delete_and_add_of_same_submodule_keeps_the_last_change(self):
+        self.manager.update_submodules("Release/2.0", [
+            SubmoduleChange("sub1", "sub1", delete=True),
+            SubmoduleChange("sub1", "sub1", "Features/team3/2.0", "sub1-feature"),
+        ])
+
+        tree = self.posted_tree()["tree"]
+        self.assertEqual([entry for entry in tree if entry["path"] == "sub1"], [{"path": "sub1", "mode": "160000", "type": "commit", "sha": "sub1-feature"}])
+
+    def test_submodule_heads_are_read_in_one_batch(self):
+        self.manager.update_submodules("Release/2.0", [
+            SubmoduleChange("sub3", "sub3", "Release/2.0"),
+            SubmoduleChange("sub4", "sub4", "Release/2.0"),
+        ])
+
+        self.manager.make_requests.assert_called_once_with("GET", [f"{API}/sub3/branches/Release/2.0", f"{API}/sub4/branches/Release/2.0"])
+        tree = {entry["path"]: entry for entry in self.posted_tree()["tree"]}
+        self.assertEqual((tree["sub3"]["sha"], tree["sub4"]["sha"]), ("sub3-head", "sub4-head"))
+
+    def test_truncated_tree_is_read_folder_by_folder(self):
+        self.responses.update({
+            ("GET", f"{API}/top/git/trees/top-tree?recursive=1"): {"truncated": True, "tree": [
+                {"path": ".gitmodules", "type": "blob", "sha": "gitmodules-blob"},
+            ]},
+            ("GET", f"{API}/top/git/trees/top-tree"): {"truncated": False, "tree": [
+                {"path": ".gitmodules", "type": "blob", "sha": "gitmodules-blob"},
+                {"path": "sub1", "type": "commit", "sha": "sub1-old"},
+                {"path": "libs", "type": "tree", "sha": "libs-tree"},
+            ]},
+            ("GET", f"{API}/top/git/trees/libs-tree"): {"truncated": False, "tree": [
+                {"path": "sub2", "type": "commit", "sha": "sub2-old"},
+            ]},
+        })
+
+        changed = self.manager.update_submodules("Release/2.0", [
+            SubmoduleChange("sub1", "sub1", sha="sub1-old"),
+            SubmoduleChange("sub2", "libs/sub2", sha="sub2-new"),
+            SubmoduleChange("sub5", "missing/sub5", delete=True),
+        ])
+
+        self.assertEqual(changed, ["sub2"])
+        tree = {entry["path"]: entry for entry in self.posted_tree()["tree"]}
+        self.assertEqual(tree, {"libs/sub2": {"path": "libs/sub2", "mode": "160000", "type": "commit", "sha": "sub2-new"}})
+        self.assertEqual([url for method, url, _ in self.requests if "/git/trees/" in url],
+                         [f"{API}/top/git/trees/top-tree?recursive=1", f"{API}/top/git/trees/top-tree", f"{API}/top/git/trees/libs-tree"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch, Mock
+import github_transport
+from github_transport import GitHubTransport, TransportConnection, configure_transport, get_transport
+
+
+class TestGitHubTransport(unittest.TestCase):
+    URL = "https://api.github.com/repos/org/repo/branches/main"
+
+    def test_request_uses_configured_timeouts(self):
+        transport = GitHubTransport(pool_size=4, connect_timeout=2, read_timeout=7)
+        with patch.object(transport.session, "request", return_value=Mock(status_code=200, headers={})) as mock_request:
+            transport.request("GET", self.URL, headers={"Accept": "json"})
+
+        mock_request.assert_called_once_with("GET", self.URL, headers={"Accept": "json"}, data=None,
+                                             timeout=(2, 7), stream=False, allow_redirects=True)
+
+    def test_session_pools_connections_per_host(self):
+        transport = GitHubTransport(pool_size=4)
+        adapter = transport.session.get_adapter(self.URL)
+
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_configure_transport_replaces_shared_transport(self):
+        old_transport = get_transport()
+        new_transport = configure_transport(pool_size=3, connect_timeout=1, read_timeout=2)
+
+        self.assertIsNot(old_transport, new_transport)
+        self.assertIs(get_transport(), new_transport)
+        self.assertEqual(new_transport.timeout, (1, 2))
+
+    def test_pygithub_connection_goes_through_shared_transport(self):
+        response = Mock(status_code=200, headers={"ETag": "abc"}, text='{"name": "main"}')
+        transport = Mock()
+        transport.request.return_value = response
+        with patch.object(github_transport, "get_transport", return_value=transport):
+            cnx = TransportConnection("api.github.com", 443)
+            cnx.request("GET", "/repos/org/repo", None, {"Authorization": "token x"})
+            result = cnx.getresponse()
+
+        transport.request.assert_called_once_with("GET", "https://api.github.com:443/repos/org/repo",
+                                                  headers={"Authorization": "token x"}, data=None,
+                                                  stream=False, allow_redirects=False)
+        self.assertEqual(result.status, 200)
+        self.assertEqual(result.read(), '{"name": "main"}')
+        self.assertEqual(list(result.getheaders()), [("ETag", "abc")])
+
+    @patch("rate_limiter.print_message")
+    def test_rate_limited_request_is_retried(self, mock_print_message):
+        transport = GitHubTransport(cache_entries=0)
+        sleeps = []
+        transport.rate_limiter.clock = lambda: 100 + sum(sleeps)
+        transport.rate_limiter.sleep = sleeps.append
+        limited = Mock(status_code=429, headers={"Retry-After": "2"}, text="")
+        ok = Mock(status_code=200, headers={"X-RateLimit-Remaining": "10"}, text="")
+        with patch.object(transport.session, "request", side_effect=[limited, ok]) as mock_request:
+            response = transport.request("GET", self.URL)
+
+        self.assertIs(response, ok)
+        self.assertEqual(mock_request.call_count, 2)
+        limited.close.assert_called_once()
+        self.assertEqual(sleeps, [2])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
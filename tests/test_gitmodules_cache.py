@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from gitmodules_cache import GitmodulesCache
+from snapshot_store import SnapshotStore
+
+REPO = "github.com/TestOrg/TestRepo"
+SUBMODULES = [("sub1", "sub1", "Release/1.0", "sub1"), ("sub2", "sub2", None, "libs/sub2")]
+
+
+class TestGitmodulesCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "snapshots.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_miss_returns_none(self):
+        cache = GitmodulesCache()
+
+        self.assertIsNone(cache.get(REPO, "sha1"))
+
+    def test_negative_entry_is_cached(self):
+        cache = GitmodulesCache()
+        cache.put(REPO, "sha1", [])
+
+        self.assertEqual(cache.get(REPO, "sha1"), [])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = GitmodulesCache(max_entries=2)
+        cache.put(REPO, "sha1", SUBMODULES)
+        cache.put(REPO, "sha2", [])
+        cache.get(REPO, "sha1")
+        cache.put(REPO, "sha3", [])
+
+        self.assertIsNone(cache.get(REPO, "sha2"))
+        self.assertEqual(cache.get(REPO, "sha1"), SUBMODULES)
+
+    def test_entries_persist_across_sessions(self):
+        store = SnapshotStore(self.path)
+        cache = GitmodulesCache(store)
+        cache.put(REPO, "sha1", SUBMODULES)
+        cache.put(REPO, "sha2", [])
+        cache.close()
+        store.close()
+
+        store = SnapshotStore(self.path)
+        cache = GitmodulesCache(store, max_entries=1)
+
+        self.assertEqual(cache.get(REPO, "sha2"), [])
+        self.assertIsNone(cache.get(REPO, "sha1"))
+        cache.close()
+        store.close()
+
+    def test_use_is_written_in_batches(self):
+        store = SnapshotStore(self.path)
+        cache = GitmodulesCache(store)
+        cache.put(REPO, "sha1", SUBMODULES)
+        cache.put(REPO, "sha2", [])
+        statements = []
+        store.connection.set_trace_callback(statements.append)
+        for _ in range(40):
+            cache.get(REPO, "sha1")
+
+        self.assertEqual(statements, [])
+        cache.close()
+        store.close()
+
+        # The lookups made sha1 the most recently used entry
+        store = SnapshotStore(self.path)
+        cache = GitmodulesCache(store, max_entries=1)
+
+        self.assertEqual(cache.get(REPO, "sha1"), SUBMODULES)
+        self.assertIsNone(cache.get(REPO, "sha2"))
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
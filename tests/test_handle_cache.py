@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import Mock
+from handle_cache import HandleCache
+
+
+class TestHandleCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.cache = HandleCache(max_entries=2, ttl=60, clock=lambda: self.now)
+
+    def test_handle_is_reused_until_it_expires(self):
+        create = Mock(side_effect=["first", "second"])
+
+        self.assertEqual(self.cache.get("org", create), "first")
+        self.now = 59
+        self.assertEqual(self.cache.get("org", create), "first")
+        self.now = 60
+        self.assertEqual(self.cache.get("org", create), "second")
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 2, "entries": 1})
+
+    def test_least_recently_used_handle_is_evicted(self):
+        self.cache.get("a", lambda: "a")
+        self.cache.get("b", lambda: "b")
+        self.cache.get("a", lambda: "new a")
+        self.cache.get("c", lambda: "c")
+
+        self.assertEqual(list(self.cache.entries), ["a", "c"])
+
+    def test_failed_creation_is_not_cached(self):
+        with self.assertRaises(ValueError):
+            self.cache.get("org", Mock(side_effect=ValueError("Not Found")))
+
+        self.assertEqual(self.cache.get("org", lambda: "org"), "org")
+
+    def test_invalidate_drops_all_handles(self):
+        self.cache.get("org", lambda: "old token")
+        self.cache.invalidate()
+
+        self.assertEqual(self.cache.get("org", lambda: "new token"), "new token")
+
+    def test_invalidate_drops_matching_handles(self):
+        self.cache.put(("org", "repo1"), "repo1")
+        self.cache.put(("org", "repo2"), "repo2")
+        self.cache.invalidate(lambda key: key[1] == "repo1")
+
+        self.assertEqual(list(self.cache.entries), [("org", "repo2")])
+
+    def test_handle_created_during_invalidation_is_not_cached(self):
+        def create():
+            self.cache.invalidate()
+            return "outdated"
+
+        self.assertEqual(self.cache.get("org", create), "outdated")
+        self.assertIsNone(self.cache.peek("org"))
+
+    def test_peek_and_put_do_not_create(self):
+        self.assertIsNone(self.cache.peek("org"))
+        self.cache.put("org", "fetched")
+
+        self.assertEqual(self.cache.peek("org"), "fetched")
+        self.assertEqual(self.cache.get("org", Mock()), "fetched")
+        self.now = 60
+        self.assertIsNone(self.cache.peek("org"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,421 @@
+import copy
+import functools
+import itertools
+import unittest
+from unittest.mock import patch, MagicMock, Mock
+import BranchBrowser
+from BranchBrowser import App
+
+
+class FakeTreeview:
+    # In-memory stand-in for ttk.Treeview with the calls used by the branches tree
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.children = {'': []}
+        self.items = {}
+        self.focused = ''
+
+    def insert(self, parent, index, text='', tags=(), open=False):
+        item = f"I{next(self.ids)}"
+        self.items[item] = {'text': text, 'tags': tags, 'open': open, 'parent': parent}
+        self.children[item] = []
+        if index == 'end':
+            self.children[parent].append(item)
+        else:
+            self.children[parent].insert(index, item)
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            for child in list(self.children[item]):
+                self.delete(child)
+            self.children[self.items[item]['parent']].remove(item)
+            del self.children[item], self.items[item]
+
+    def get_children(self, item=''):
+        return tuple(self.children[item])
+
+    def item(self, item, option=None, **kw):
+        self.items[item].update(kw)
+        return self.items[item][option] if option else None
+
+    def focus(self):
+        return self.focused
+
+    def texts(self, item=''):
+        return [self.items[child]['text'] for child in self.children[item]]
+
+
+class FakeRoot:
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.callbacks = []
+
+    def after(self, ms, callback, *args):
+        after_id = f"after#{next(self.ids)}"
+        self.callbacks.append((after_id, functools.partial(callback, *args) if args else callback))
+        return after_id
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, after_id):
+        self.callbacks = [(callback_id, callback) for callback_id, callback in self.callbacks if callback_id != after_id]
+
+    def run(self):
+        ticks = 0
+        while self.callbacks:
+            self.callbacks.pop(0)[1]()
+            ticks += 1
+        return ticks
+
+
+STRUCTURE = {
+    "main": {},
+    "Release": {"1.0": {}, "2.0": {}},
+    "Features": {"team3": {"1.0": {"Push": {"BUG-1": {}}}}},
+}
+
+
+class TestLazyTree(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.tree = FakeTreeview()
+        self.app.branches_tree = self.tree
+
+    def test_only_top_level_is_inserted(self):
+        self.app.populate_tree(self.tree, STRUCTURE)
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(), ["main", "Release", "Features"])
+        release = self.tree.get_children()[1]
+        self.assertEqual(self.tree.texts(release), [""])
+        self.assertEqual(len(self.tree.items), 5)
+
+    def test_opened_item_is_materialized(self):
+        self.app.populate_tree(self.tree, STRUCTURE)
+        self.app.root.run()
+        self.tree.focused = self.tree.get_children()[1]
+
+        self.app.on_tree_open(None)
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(self.tree.focused), ["1.0", "2.0"])
+        self.assertIn("has_tooltip", self.tree.items[self.tree.get_children(self.tree.focused)[0]]['tags'])
+
+    def test_wide_level_is_inserted_in_chunks(self):
+        with patch.object(BranchBrowser, "TREE_INSERT_CHUNK_SIZE", 10):
+            self.app.populate_tree(self.tree, {f"branch{i}": {} for i in range(35)})
+            ticks = self.app.root.run()
+
+        self.assertEqual(ticks, 4)
+        self.assertEqual(len(self.tree.get_children()), 35)
+
+    def test_expand_all_inserts_subtree_opened(self):
+        self.app.populate_tree(self.tree, STRUCTURE)
+        self.app.root.run()
+        self.app.last_tree_item_rightclicked = self.tree.get_children()[2]
+
+        self.app.expand_all()
+        self.app.root.run()
+
+        self.assertEqual(sorted(item['text'] for item in self.tree.items.values()), sorted(["main", "Release", "", "Features", "team3", "1.0", "Push", "BUG-1"]))
+        self.assertTrue(all(item['open'] for item in self.tree.items.values() if item['text'] in ("Features", "team3", "1.0", "Push")))
+
+    def test_clear_drops_queued_inserts(self):
+        self.app.populate_tree(self.tree, STRUCTURE)
+        self.app.clear_branches_tree()
+        self.app.root.run()
+
+        self.assertEqual(self.tree.get_children(), ())
+
+
+class TestSearchTreeDiff(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.tree = FakeTreeview()
+        self.tree.heading = Mock()
+        self.app.branches_tree = self.tree
+        self.app.org_combo = Mock()
+        self.app.repo_combo = Mock()
+        self.app.search_var = Mock()
+        self.app.search_mode = Mock()
+        self.app.search_mode.get.return_value = BranchBrowser.SEARCH_MODE_SUBSTRING
+        # Searches run synchronously instead of on the search thread
+        self.app.search_executor = Mock(submit=lambda function, *args: function(*args))
+        self.app.branches_structure = STRUCTURE
+        self.app.branch_search_index = BranchBrowser.BranchSearchIndex(STRUCTURE)
+        self.app.populate_tree(self.tree, STRUCTURE)
+        self.app.root.run()
+
+    def search(self, text):
+        self.app.search_var.get.return_value = text
+        self.app.apply_search()
+        self.app.root.run()
+
+    def test_search_keeps_matching_items(self):
+        release = self.tree.get_children()[1]
+
+        self.search("release/2")
+
+        self.assertEqual(self.tree.get_children(), (release,))
+        self.assertEqual(self.tree.texts(release), ["2.0"])
+        self.assertTrue(self.tree.items[release]['open'])
+
+    def test_cleared_search_restores_order(self):
+        self.search("bug")
+        self.search("")
+
+        self.assertEqual(self.tree.texts(), ["main", "Release", "Features"])
+        self.assertEqual(self.tree.texts(self.tree.get_children()[2]), ["team3"])
+
+    def test_no_results(self):
+        self.search("hotfix")
+
+        self.assertEqual(self.tree.get_children(), ())
+        self.tree.heading.assert_called_with("#0", text="No results found.", anchor="w")
+
+    def test_fuzzy_top_results_come_first_rest_collapsed(self):
+        self.app.search_mode.get.return_value = BranchBrowser.SEARCH_MODE_FUZZY
+        with patch.object(BranchBrowser, "SEARCH_TOP_RESULTS", 1):
+            self.search("e1")
+
+        release, features = self.tree.get_children()
+        self.assertEqual(self.tree.texts(), ["Release", "Features"])
+        self.assertTrue(self.tree.items[release]['open'])
+        self.assertFalse(self.tree.items[features]['open'])
+        self.assertEqual(self.tree.texts(features), [""])
+
+    def test_invalid_regex_is_reported(self):
+        self.app.search_mode.get.return_value = BranchBrowser.SEARCH_MODE_REGEX
+        self.search("Release/(")
+
+        self.assertIn("Invalid regular expression", self.tree.heading.call_args[1]["text"])
+        self.assertEqual(self.tree.texts(), ["main", "Release", "Features"])
+
+    def test_stale_search_is_dropped(self):
+        self.app.search_var.get.return_value = "bug"
+        self.app.run_search(self.app.search_generation - 1, self.app.branch_search_index, "bug", BranchBrowser.SEARCH_MODE_SUBSTRING)
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(), ["main", "Release", "Features"])
+
+    def test_input_is_debounced(self):
+        self.app.root.callbacks.clear()
+        self.app.on_search_input_change()
+        self.app.on_search_input_change()
+
+        self.assertEqual(self.app.root.callbacks, [(self.app.search_after_id, self.app.apply_search)])
+
+
+class TestIncrementalTree(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.tree = FakeTreeview()
+        self.app.branches_tree = self.tree
+        self.app.team_view = Mock(get=Mock(return_value=False))
+        self.app.search_var = Mock(get=Mock(return_value=""))
+        self.app.search_executor = Mock(submit=lambda function, *args: function(*args))
+        self.app.branches_structure = copy.deepcopy(STRUCTURE)
+        self.app.branch_search_index = BranchBrowser.BranchSearchIndex(self.app.branches_structure)
+        self.app.populate_tree(self.tree, self.app.branches_structure)
+        self.app.root.run()
+        self.release = self.app.tree_items["Release"]
+        self.tree.focused = self.release
+        self.app.on_tree_open(None)
+        self.tree.items[self.release]['open'] = True
+        self.app.root.run()
+
+    def test_items_are_indexed_by_path(self):
+        self.assertEqual(self.tree.texts(self.app.tree_items["Release"]), ["1.0", "2.0"])
+        self.assertEqual(self.app.tree_item_paths[self.app.tree_items["Release/2.0"]], "Release/2.0")
+        self.assertNotIn("Features/team3", self.app.tree_items)
+
+    def test_created_branch_is_inserted_in_place(self):
+        items = dict(self.app.tree_items)
+
+        self.app.insert_branch_path("Release/3.0")
+        self.app.insert_branch_path("Hotfix/1.0/BUG-3")
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(self.release), ["1.0", "2.0", "3.0"])
+        self.assertTrue(self.tree.items[self.release]['open'])
+        self.assertEqual(self.tree.texts(), ["main", "Release", "Features", "Hotfix"])
+        # Existing items are kept, nothing was rebuilt
+        self.assertTrue(all(self.app.tree_items[path] == item for path, item in items.items()))
+        self.assertEqual(self.app.branches_structure["Hotfix"], {"1.0": {"BUG-3": {}}})
+        self.assertEqual(self.app.branch_search_index.paths[-1], "Hotfix/1.0/BUG-3")
+
+    def test_branch_under_collapsed_item_is_inserted_when_opened(self):
+        self.app.insert_branch_path("Features/team3/2.0/BUG-3")
+        self.app.root.run()
+        features = self.app.tree_items["Features"]
+        self.tree.focused = features
+        self.app.on_tree_open(None)
+        self.app.root.run()
+        self.tree.focused = self.app.tree_items["Features/team3"]
+        self.app.on_tree_open(None)
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(self.app.tree_items["Features/team3"]), ["1.0", "2.0"])
+
+    def test_deleted_branch_prunes_empty_levels(self):
+        self.app.remove_branch_path("Release/1.0")
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(self.release), ["2.0"])
+        self.assertNotIn("Release/1.0", self.app.tree_items)
+
+        self.app.remove_branch_path("Release/2.0")
+        self.app.remove_branch_path("Features/team3/1.0/Push/BUG-1")
+        self.app.root.run()
+
+        self.assertEqual(self.tree.texts(), ["main"])
+        self.assertEqual(self.app.branches_structure, {"main": {}})
+        self.assertEqual(set(self.app.tree_items), {"main"})
+
+    def test_branch_outside_team_view_is_not_inserted(self):
+        self.app.team_view.get.return_value = True
+
+        self.app.insert_branch_path("Release/3.0")
+        self.app.root.run()
+
+        self.assertNotIn("3.0", self.app.branches_structure["Release"])
+
+    def test_active_search_is_applied_again(self):
+        with patch.object(self.app, "apply_search") as mock_apply_search:
+            self.app.search_var.get.return_value = "release"
+            self.app.insert_branch_path("Release/3.0")
+
+        mock_apply_search.assert_called_once()
+        self.assertEqual(self.tree.texts(self.release), ["1.0", "2.0"])
+
+
+class TestSearchIndexBuild(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.app.branches_tree = FakeTreeview()
+        self.app.branches_tree.heading = Mock()
+        self.app.branches_tree.column = Mock()
+        self.app.org_combo = Mock()
+        self.app.repo_combo = Mock()
+        self.app.team_view = Mock(get=Mock(return_value=False))
+        self.app.search_var = Mock(get=Mock(return_value=""))
+        # Jobs of the search thread are queued and run by the test
+        self.search_jobs = []
+        self.app.search_executor = Mock(submit=lambda function, *args: self.search_jobs.append(lambda: function(*args)))
+        patch("BranchBrowser.tk.font.Font").start()
+        patch("BranchBrowser.post_to_ui", side_effect=lambda function, *args, **kwargs: function(*args)).start()
+        self.addCleanup(patch.stopall)
+
+    def run_search_jobs(self):
+        while self.search_jobs:
+            self.search_jobs.pop(0)()
+
+    def test_index_is_built_on_the_search_thread(self):
+        old_index = self.app.branch_search_index
+        self.app.show_branches_structure(copy.deepcopy(STRUCTURE))
+
+        self.assertIs(self.app.branch_search_index, old_index)
+        self.app.insert_branch_path("Release/3.0")
+        self.run_search_jobs()
+
+        self.assertIsNot(self.app.branch_search_index, old_index)
+        # The branch written while the index was being built is in the new index
+        self.assertEqual(self.app.branch_search_index.paths, ["main", "Release/1.0", "Release/2.0", "Features/team3/1.0/Push/BUG-1", "Release/3.0"])
+
+    def test_only_index_of_the_last_structure_is_built(self):
+        self.app.show_branches_structure({"old": {}})
+        self.app.show_branches_structure(copy.deepcopy(STRUCTURE))
+        with patch("BranchBrowser.BranchSearchIndex.from_paths", wraps=BranchBrowser.BranchSearchIndex.from_paths) as mock_build:
+            self.run_search_jobs()
+
+        mock_build.assert_called_once()
+        self.assertEqual(self.app.branch_search_index.paths[0], "main")
+
+    def test_active_search_is_applied_again_with_the_new_index(self):
+        self.app.search_var.get.return_value = "release"
+        self.app.apply_search = Mock()
+        self.app.show_branches_structure(copy.deepcopy(STRUCTURE))
+        self.run_search_jobs()
+
+        self.app.apply_search.assert_called_once()
+
+
+class TestRefreshCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.app.org_combo = Mock()
+        self.app.repo_combo = Mock()
+        self.app.team_view = Mock(get=Mock(return_value=False))
+        self.done_callbacks = []
+        runtime = Mock()
+        runtime.submit.return_value.future.add_done_callback.side_effect = self.done_callbacks.append
+        patch("BranchBrowser.get_task_runtime", return_value=runtime).start()
+        # Posted callbacks run right away
+        patch("BranchBrowser.post_to_ui", side_effect=lambda function, *args, **kwargs: function(*args)).start()
+        self.addCleanup(patch.stopall)
+        self.runtime = runtime
+
+    def test_refreshes_during_a_fetch_run_one_more_fetch(self):
+        for _ in range(5):
+            self.app.fetch_data_in_background()
+        self.assertEqual(self.runtime.submit.call_count, 1)
+
+        self.done_callbacks.pop(0)(None)
+        self.assertEqual(self.runtime.submit.call_count, 2)
+
+        self.done_callbacks.pop(0)(None)
+        self.assertEqual(self.runtime.submit.call_count, 2)
+        self.assertFalse(self.app.fetch_in_flight)
+
+
+class TestSelectionFromSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(App, 'setup_ui'), patch.object(App, 'setup_actions'), patch("BranchBrowser.print_message"):
+            self.app = App(FakeRoot(), Mock(), "TestOrg", "TestRepo", False, "config.json", "team3", None)
+        self.app.github_client.offline = False
+        self.app.org_combo = Mock(get=Mock(return_value="TestOrg"))
+        self.app.repo_combo = MagicMock(get=Mock(return_value="TestRepo"))
+        self.app.team_view = Mock(get=Mock(return_value=False))
+        self.app.show_branches_structure = Mock()
+        self.runtime = Mock()
+        patch("BranchBrowser.get_task_runtime", return_value=self.runtime).start()
+        self.addCleanup(patch.stopall)
+
+    def test_selected_repo_is_rendered_from_snapshot_and_revalidated(self):
+        self.app.on_repo_selected(None)
+
+        self.app.github_client.get_repo_branches_structure.assert_called_once_with("TestOrg", "TestRepo", True, '')
+        self.app.show_branches_structure.assert_called_once_with(self.app.github_client.get_repo_branches_structure.return_value)
+        self.assertEqual(self.runtime.submit.call_args[0][1], self.app.fetch_branches_structure)
+
+    def test_selected_org_is_rendered_from_snapshot_and_revalidated(self):
+        self.app.on_org_selected(None)
+
+        self.app.github_client.get_organization_repos_names.assert_called_once_with("TestOrg", True)
+        self.app.github_client.get_repo_branches_structure.assert_called_once_with("TestOrg", "TestRepo", True, '')
+        self.assertEqual(self.runtime.submit.call_args[0][1], self.app.fetch_data)
+
+    def test_offline_selection_is_not_revalidated(self):
+        self.app.github_client.offline = True
+
+        self.app.on_repo_selected(None)
+        self.app.on_org_selected(None)
+
+        self.runtime.submit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
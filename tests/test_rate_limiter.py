@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+from rate_limiter import RateLimitScheduler
+from task_runtime import TASK_CANCELLED, Task, TaskCancelled, TaskRuntime
+
+URL = "https://api.github.com/repos/org/repo/branches/main"
+HEADERS = {"Authorization": "token x"}
+
+
+def response(status_code=200, remaining="4999", reset="1000", text="", **headers):
+    response_headers = {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": remaining, "X-RateLimit-Reset": reset}
+    response_headers.update(headers)
+    return Mock(status_code=status_code, headers=response_headers, text=text)
+
+
+class FakeClock:
+    def __init__(self, now=100):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = RateLimitScheduler(write_interval=1.0, secondary_limit_wait=60, clock=self.clock, sleep=self.clock.sleep)
+        patch("rate_limiter.print_message").start()
+        self.addCleanup(patch.stopall)
+
+    def test_quota_is_tracked_from_headers(self):
+        self.scheduler.update(URL, HEADERS, response(remaining="42"))
+
+        self.assertEqual(self.scheduler.quota(), {"resource": "core", "limit": 5000, "remaining": 42, "reset": 1000})
+
+    def test_exhausted_quota_parks_calls_until_reset(self):
+        self.scheduler.update(URL, HEADERS, response(remaining="0", reset="400"))
+
+        self.scheduler.wait("GET", URL, HEADERS)
+
+        self.assertEqual(self.clock.sleeps, [300])
+        # Other token and other resource have their own quota
+        self.scheduler.wait("GET", URL, {"Authorization": "token y"})
+        self.scheduler.wait("POST", "https://api.github.com/graphql", HEADERS)
+        self.assertEqual(self.clock.sleeps, [300])
+
+    def test_writes_are_spaced(self):
+        self.scheduler.wait("POST", URL, HEADERS)
+        self.scheduler.wait("GET", URL, HEADERS)
+        self.scheduler.wait("PATCH", URL, HEADERS)
+
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_only_graphql_mutations_are_spaced(self):
+        graphql_url = "https://api.github.com/graphql"
+        query = json.dumps({"query": "query($owner: String!) { repository(owner: $owner) { id } }", "variables": {}})
+        mutation = json.dumps({"query": "mutation { createRef(input: {}) { ref { id } } }"})
+        for _ in range(3):
+            self.scheduler.wait("POST", graphql_url, HEADERS, query)
+        self.assertEqual(self.clock.sleeps, [])
+
+        self.scheduler.wait("POST", graphql_url, HEADERS, mutation)
+        self.scheduler.wait("POST", graphql_url, HEADERS, mutation)
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_secondary_limit_is_retried_after_retry_after(self):
+        delay = self.scheduler.update(URL, HEADERS, response(403, text="You have exceeded a secondary rate limit", **{"Retry-After": "30"}))
+
+        self.assertEqual(delay, 30)
+        self.scheduler.wait("GET", URL, HEADERS)
+        self.assertEqual(self.clock.sleeps, [30])
+
+    def test_secondary_limit_without_retry_after_waits_a_minute(self):
+        delay = self.scheduler.update(URL, HEADERS, response(403, text="You have exceeded a secondary rate limit"))
+
+        self.assertEqual(delay, 60)
+
+    def test_permission_error_is_not_retried(self):
+        self.assertIsNone(self.scheduler.update(URL, HEADERS, response(403, text="Resource not accessible by integration")))
+
+
+class TestRateLimitCancellation(unittest.TestCase):
+
+    def setUp(self):
+        # Real clock, the quota resets in an hour
+        self.scheduler = RateLimitScheduler()
+        self.scheduler.update(URL, HEADERS, response(remaining="0", reset=str(int(time.time()) + 3600)))
+        patch("rate_limiter.print_message").start()
+        patch("task_runtime.print_message").start()
+        self.addCleanup(patch.stopall)
+
+    def test_cancelled_task_stops_waiting_for_quota_reset(self):
+        runtime = TaskRuntime(max_workers=1)
+        self.addCleanup(runtime.shutdown)
+        parked = threading.Event()
+        original_park = self.scheduler.park
+
+        def park(delay):
+            parked.set()
+            original_park(delay)
+
+        with patch.object(self.scheduler, "park", side_effect=park):
+            task = runtime.submit("parked call", lambda task: self.scheduler.wait("GET", URL, HEADERS))
+            self.assertTrue(parked.wait(5))
+            started = time.monotonic()
+            task.token.cancel()
+            task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_CANCELLED)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_cancelled_task_stops_parked_coroutine(self):
+        task = Task(1, "parked call", lambda: None)
+
+        async def main():
+            asyncio.get_running_loop().call_later(0.01, task.token.cancel)
+            await self.scheduler.wait_async("GET", URL, HEADERS, task)
+
+        with patch("rate_limiter.PARK_CHECK_INTERVAL", 0.01), self.assertRaises(TaskCancelled):
+            asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch, Mock
+import requests
+from github_transport import GitHubTransport
+from response_cache import ResponseCache
+
+
+def make_response(status_code, headers=None, content=b''):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = content
+    response.encoding = 'utf-8'
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+    URL = "https://api.github.com/orgs/TestOrg/repos"
+    HEADERS = {"Authorization": "token abc", "Accept": "application/vnd.github.v3+json"}
+
+    def setUp(self):
+        self.transport = GitHubTransport(cache_entries=2)
+        self.mock_request = patch.object(self.transport.session, "request").start()
+        self.addCleanup(patch.stopall)
+
+    def test_not_modified_is_served_from_cache(self):
+        self.mock_request.side_effect = [
+            make_response(200, {"ETag": '"v1"', "X-RateLimit-Remaining": "4999"}, b'[{"name": "repo1"}]'),
+            make_response(304, {"ETag": '"v1"', "X-RateLimit-Remaining": "4998"}),
+        ]
+
+        self.transport.request("GET", self.URL, headers=self.HEADERS)
+        response = self.transport.request("GET", self.URL, headers=self.HEADERS)
+
+        self.assertEqual(self.mock_request.call_args_list[1][1]["headers"]["If-None-Match"], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"name": "repo1"}])
+        self.assertEqual(response.headers["X-RateLimit-Remaining"], "4998")
+        self.assertEqual(self.transport.cache.stats(), {"hits": 1, "misses": 1, "not_modified": 1, "entries": 1})
+
+    def test_entries_are_separated_by_auth_identity(self):
+        self.mock_request.return_value = make_response(200, {"ETag": '"v1"'}, b'[]')
+
+        self.transport.request("GET", self.URL, headers=self.HEADERS)
+        self.transport.request("GET", self.URL, headers={**self.HEADERS, "Authorization": "token other"})
+
+        self.assertNotIn("If-None-Match", self.mock_request.call_args_list[1][1]["headers"])
+        self.assertEqual(self.transport.cache.stats()["entries"], 2)
+
+    def test_only_get_requests_are_cached(self):
+        self.mock_request.return_value = make_response(200, {"ETag": '"v1"'}, b'{}')
+
+        self.transport.request("POST", self.URL, headers=self.HEADERS, data="{}")
+
+        self.assertEqual(self.transport.cache.stats()["entries"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        for url in ("a", "b", "c"):
+            cache.update((url,), make_response(200, {"ETag": url}))
+
+        self.assertEqual(list(cache.entries), [("b",), ("c",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch, Mock
+from github_transport import GitHubTransport
+from single_flight import SingleFlight
+from task_runtime import TASK_CANCELLED, TaskCancelled, TaskRuntime
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+
+    def run_concurrently(self, count, key, function):
+        results = [None] * count
+
+        def call(index):
+            results[index] = self.single_flight.do(key, function)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_identical_calls_share_one_result(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        threads, results = self.run_concurrently(1, "key", function)
+        started.wait(5)
+        followers, follower_results = self.run_concurrently(3, "key", function)
+        # Followers are parked on the flight before it finishes
+        while self.single_flight.stats()["shared"] < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads + followers:
+            thread.join(5)
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(results + follower_results, ["result"] * 4)
+        self.assertEqual(self.single_flight.stats(), {"calls": 1, "shared": 3})
+
+    def test_exception_is_shared_and_next_call_runs_again(self):
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                self.single_flight.do("key", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        while self.single_flight.stats()["shared"] < 1:
+            threading.Event().wait(0.001)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+        self.assertEqual(self.single_flight.do("key", lambda: "again"), "again")
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        runtime = TaskRuntime(max_workers=1)
+        self.addCleanup(runtime.shutdown)
+        started = threading.Event()
+
+        def cancelled_call(task):
+            started.set()
+            task.token.wait(5)
+
+        with patch("task_runtime.print_message"):
+            leader = runtime.submit("leader", lambda task: self.single_flight.do("key", lambda: cancelled_call(task)))
+            started.wait(5)
+            followers, results = self.run_concurrently(2, "key", lambda: "result")
+            while self.single_flight.stats()["shared"] < 2:
+                threading.Event().wait(0.001)
+            leader.token.cancel()
+            leader.future.result(timeout=5)
+            for thread in followers:
+                thread.join(5)
+
+        self.assertEqual(leader.state, TASK_CANCELLED)
+        # One of the followers made the call again, the other one shared it or made it after
+        self.assertEqual(results, ["result", "result"])
+
+    def test_cancelled_follower_stops_waiting(self):
+        runtime = TaskRuntime(max_workers=1)
+        self.addCleanup(runtime.shutdown)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking():
+            started.set()
+            release.wait(5)
+            return "result"
+
+        leader, results = self.run_concurrently(1, "key", blocking)
+        started.wait(5)
+        with patch("task_runtime.print_message"):
+            follower = runtime.submit("follower", lambda task: self.single_flight.do("key", Mock()))
+            while self.single_flight.stats()["shared"] < 1:
+                threading.Event().wait(0.001)
+            follower.token.cancel()
+            follower.future.result(timeout=1)
+        release.set()
+        leader[0].join(5)
+
+        self.assertEqual(follower.state, TASK_CANCELLED)
+        self.assertEqual(results, ["result"])
+
+    def test_cancelled_leader_coroutine_does_not_cancel_followers(self):
+        async def cancelled():
+            await asyncio.sleep(0.01)
+            raise TaskCancelled()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(self.single_flight.do_async("key", cancelled), self.single_flight.do_async("key", fetch),
+                                        self.single_flight.do_async("key", fetch), return_exceptions=True)
+
+        leader, *followers = asyncio.run(main())
+
+        self.assertIsInstance(leader, TaskCancelled)
+        self.assertEqual(followers, ["result", "result"])
+        self.assertEqual(self.single_flight.stats(), {"calls": 2, "shared": 1})
+
+    def test_different_keys_are_not_shared(self):
+        self.assertEqual(self.single_flight.do("a", lambda: 1), 1)
+        self.assertEqual(self.single_flight.do("b", lambda: 2), 2)
+        self.assertEqual(self.single_flight.stats(), {"calls": 2, "shared": 0})
+
+    def test_concurrent_coroutines_share_one_call(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(self.single_flight.do_async("key", fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 5)
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.single_flight.stats(), {"calls": 1, "shared": 4})
+
+
+class TestTransportSingleFlight(unittest.TestCase):
+    URL = "https://api.github.com/user/orgs"
+
+    def test_identical_gets_share_one_request(self):
+        transport = GitHubTransport()
+        barrier_release = threading.Event()
+
+        def request(method, url, **kwargs):
+            barrier_release.wait(5)
+            return Mock(status_code=200, headers={})
+
+        results = []
+        with patch.object(transport.session, "request", side_effect=request) as mock_request:
+            threads = [threading.Thread(target=lambda: results.append(transport.request("GET", self.URL, headers={"Authorization": "token x"})))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            while transport.single_flight.stats()["shared"] < 3:
+                threading.Event().wait(0.001)
+            barrier_release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_different_tokens_and_writes_are_not_shared(self):
+        transport = GitHubTransport()
+        with patch.object(transport.session, "request", return_value=Mock(status_code=200, headers={})) as mock_request:
+            transport.request("GET", self.URL, headers={"Authorization": "token x"})
+            transport.request("GET", self.URL, headers={"Authorization": "token y"})
+            transport.request("POST", self.URL, headers={"Authorization": "token x"}, data="{}")
+
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(transport.single_flight.stats(), {"calls": 2, "shared": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from snapshot_store import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    HOST = "github.com"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "snapshots.db")
+        self.store = SnapshotStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_load_missing_snapshot_returns_none(self):
+        self.assertIsNone(self.store.load(self.HOST, "repositories", "TestOrg"))
+
+    def test_save_replaces_previous_snapshot(self):
+        self.store.save(self.HOST, "branches", "TestOrg/TestRepo", {"main": {}})
+        self.store.save(self.HOST, "branches", "TestOrg/TestRepo", {"main": {}, "Release": {"1.0": {}}})
+
+        self.assertEqual(self.store.load(self.HOST, "branches", "TestOrg/TestRepo"), {"main": {}, "Release": {"1.0": {}}})
+
+    def test_snapshots_are_scoped_by_host_and_scope(self):
+        self.store.save(self.HOST, "repositories", "TestOrg", ["repo1"])
+
+        self.assertIsNone(self.store.load("github.example.com", "repositories", "TestOrg"))
+        self.assertIsNone(self.store.load(self.HOST, "repositories", "OtherOrg"))
+
+    def test_snapshots_persist_across_sessions(self):
+        self.store.save(self.HOST, "organizations", "", ["TestOrg"])
+        self.store.close()
+
+        self.store = SnapshotStore(self.path)
+
+        self.assertEqual(self.store.load(self.HOST, "organizations"), ["TestOrg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
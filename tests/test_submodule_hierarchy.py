@@ -0,0 +1,156 @@
+import threading
+import unittest
+from unittest.mock import patch
+from submodule_hierarchy import create_branch_hierarchy, resolve_submodules_hierarchy
+
+
+class FakeSubmodules:
+    def __init__(self, graph):
+        self.graph = graph
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, repo_name, branch_name):
+        with self.lock:
+            self.calls.append((repo_name, branch_name))
+        return [(repo, repo, branch, repo) for repo, branch in self.graph.get((repo_name, branch_name), [])]
+
+
+class TestResolveSubmodulesHierarchy(unittest.TestCase):
+
+    def test_resolves_any_depth(self):
+        get_submodules = FakeSubmodules({
+            ("top", "main"): [("a", "main")],
+            ("a", "main"): [("b", "main")],
+            ("b", "main"): [("c", "main")],
+        })
+
+        hierarchy = resolve_submodules_hierarchy(get_submodules, "top", "main")
+
+        self.assertEqual(hierarchy, [
+            ("a", "a", "main", "a", [
+                ("b", "b", "main", "b", [
+                    ("c", "c", "main", "c", [])])])])
+
+    def test_shared_submodule_is_looked_up_once(self):
+        get_submodules = FakeSubmodules({
+            ("top", "main"): [("a", "main"), ("b", "main")],
+            ("a", "main"): [("common", "main")],
+            ("b", "main"): [("common", "main")],
+        })
+
+        hierarchy = resolve_submodules_hierarchy(get_submodules, "top", "main")
+
+        self.assertEqual(get_submodules.calls.count(("common", "main")), 1)
+        self.assertEqual(hierarchy[0][4], hierarchy[1][4])
+
+    def test_levels_are_looked_up_in_one_call(self):
+        get_submodules = FakeSubmodules({
+            ("top", "main"): [("a", "main"), ("b", "main")],
+            ("a", "main"): [("c", "main")],
+        })
+        levels = []
+
+        def get_level_submodules(repo_branches):
+            levels.append(list(repo_branches))
+            return [get_submodules(*repo_branch) for repo_branch in repo_branches]
+
+        with patch("submodule_hierarchy.ThreadPoolExecutor") as mock_executor:
+            hierarchy = resolve_submodules_hierarchy(None, "top", "main", get_level_submodules=get_level_submodules)
+
+        mock_executor.assert_not_called()
+        self.assertEqual(levels, [[("top", "main")], [("a", "main"), ("b", "main")], [("c", "main")]])
+        self.assertEqual(hierarchy[0][4], [("c", "c", "main", "c", [])])
+
+    @patch("submodule_hierarchy.print_message")
+    def test_cycle_ends_the_branch(self, mock_print_message):
+        get_submodules = FakeSubmodules({
+            ("top", "main"): [("a", "main")],
+            ("a", "main"): [("top", "main")],
+        })
+
+        hierarchy = resolve_submodules_hierarchy(get_submodules, "top", "main")
+
+        self.assertEqual(hierarchy, [("a", "a", "main", "a", [("top", "top", "main", "top", None)])])
+        mock_print_message.assert_called_once()
+
+
+class FakeBranchCreation:
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def get_commit_sha(self, repo_name, branch_name):
+        return f"sha-{repo_name}"
+
+    def create_branch(self, repo_name, new_branch_name, commit_sha):
+        with self.lock:
+            self.events.append(("create", repo_name, new_branch_name, commit_sha))
+
+    def update_submodules(self, repo_name, new_branch_name, changes):
+        with self.lock:
+            self.events.append(("update", repo_name, new_branch_name, sorted(changes)))
+        return True
+
+    def create(self, hierarchy, rename_branch=lambda branch: branch.replace("Release/1.0", "Release/2.0")):
+        return create_branch_hierarchy(hierarchy, "top", "Release/1.0", rename_branch,
+                                       self.get_commit_sha, self.create_branch, self.update_submodules)
+
+
+class TestCreateBranchHierarchy(unittest.TestCase):
+
+    def test_leaves_are_created_before_their_parents(self):
+        creation = FakeBranchCreation()
+        hierarchy = resolve_submodules_hierarchy(FakeSubmodules({
+            ("top", "Release/1.0"): [("a", "Release/1.0"), ("c", "Release/1.0")],
+            ("a", "Release/1.0"): [("b", "Release/1.0")],
+        }), "top", "Release/1.0")
+
+        created = creation.create(hierarchy)
+
+        self.assertEqual(created, 4)
+        order = [event[1] for event in creation.events]
+        self.assertLess(order.index("b"), order.index("a"))
+        self.assertEqual(order[-2:], ["top", "top"])
+        # Parent that got a commit is re-pointed by branch head, leaves by their known SHA
+        self.assertIn(("update", "top", "Release/2.0", [("a", "a", "Release/2.0", None), ("c", "c", "Release/2.0", "sha-c")]), creation.events)
+        self.assertIn(("update", "a", "Release/2.0", [("b", "b", "Release/2.0", "sha-b")]), creation.events)
+
+    def test_shared_submodule_branch_is_created_once(self):
+        creation = FakeBranchCreation()
+        hierarchy = resolve_submodules_hierarchy(FakeSubmodules({
+            ("top", "Release/1.0"): [("a", "Release/1.0"), ("b", "Release/1.0")],
+            ("a", "Release/1.0"): [("common", "Release/1.0")],
+            ("b", "Release/1.0"): [("common", "Release/1.0")],
+        }), "top", "Release/1.0")
+
+        creation.create(hierarchy)
+
+        self.assertEqual([event[1] for event in creation.events if event[0] == "create"].count("common"), 1)
+
+    def test_submodule_with_unchanged_branch_name_is_kept(self):
+        creation = FakeBranchCreation()
+        hierarchy = resolve_submodules_hierarchy(FakeSubmodules({
+            ("top", "Release/1.0"): [("a", "Release/1.0"), ("lib", "main")],
+            ("lib", "main"): [("lib-dep", "Release/1.0")],
+        }), "top", "Release/1.0")
+
+        created = creation.create(hierarchy)
+
+        self.assertEqual(created, 2)
+        self.assertNotIn("lib", [event[1] for event in creation.events])
+        self.assertNotIn("lib-dep", [event[1] for event in creation.events])
+
+    def test_missing_head_stops_before_parents(self):
+        creation = FakeBranchCreation()
+        creation.get_commit_sha = lambda repo_name, branch_name: None if repo_name == "a" else f"sha-{repo_name}"
+        hierarchy = [("a", "a", "Release/1.0", "a", [])]
+
+        with self.assertRaises(Exception):
+            creation.create(hierarchy)
+
+        self.assertEqual(creation.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
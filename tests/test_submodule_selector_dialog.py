@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import call, patch, Mock
+from BranchBrowser import RepoBranchListBoxInfo, SubmoduleSelectorDialog
+from branch_index import BranchIndex
+
+
+class FakeCombobox:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class FakeListbox:
+    def __init__(self):
+        self.items = []
+        self.colors = {}
+
+    def size(self):
+        return len(self.items)
+
+    def insert(self, index, *items):
+        self.items.extend(str(item) for item in items)
+
+    def itemconfig(self, index, options):
+        self.colors[index] = options['fg']
+
+
+class TestSubmoduleSelectorBranches(unittest.TestCase):
+    ORG = "TestOrg"
+
+    def setUp(self):
+        # Only the branch loading is tested, the dialog window isn't created
+        self.dialog = SubmoduleSelectorDialog.__new__(SubmoduleSelectorDialog)
+        self.dialog.org_name = self.ORG
+        self.dialog.github_client = Mock()
+        self.dialog.github_client.get_organization_repo_branches.side_effect = self.get_branches
+        self.dialog.github_client.get_cached_organization_repo_branches.side_effect = lambda *key: self.cached_lists.get(key)
+        self.cached_lists = {}
+        self.dialog.is_filter_disabled = False
+        self.dialog.branch_indexes = {}
+        self.dialog.repos_combobox = FakeCombobox("sub1")
+        self.dialog.branch_type_combobox = FakeCombobox("Features")
+        self.dialog.team_version_combobox = FakeCombobox("team3")
+
+    # Session cache of the client: lists are kept until they're dropped from cached_lists
+    def get_branches(self, org_name, repo_name, prefix='', cached=False):
+        key = (org_name, repo_name, prefix)
+        if key not in self.cached_lists:
+            branches = ["main", "Release/1.0", "Features/team3/1.0/Push/BUG-1", "Features/team30/1.0/Push/BUG-2"]
+            self.cached_lists[key] = [branch for branch in branches if branch.startswith(prefix)]
+        return self.cached_lists[key]
+
+    def test_only_filtered_namespace_is_fetched(self):
+        self.dialog.load_branches()
+
+        self.assertEqual(self.dialog.branches, ["Features/team3/1.0/Push/BUG-1"])
+        self.dialog.github_client.get_organization_repo_branches.assert_called_once_with(self.ORG, "sub1", "Features/team3/", cached=True)
+
+    def test_index_is_reused_while_the_list_is_cached(self):
+        self.dialog.load_branches()
+        index = self.dialog.branch_index
+        self.dialog.load_branches()
+
+        self.assertIs(self.dialog.branch_index, index)
+
+    def test_index_is_rebuilt_after_the_cached_list_is_dropped(self):
+        self.dialog.load_branches()
+        index = self.dialog.branch_index
+        # A branch created in another dialog drops the cached lists of the repository
+        self.cached_lists.clear()
+        self.dialog.load_branches()
+
+        self.assertIsNot(self.dialog.branch_index, index)
+        self.assertEqual(self.dialog.github_client.get_organization_repo_branches.call_count, 2)
+
+    def test_feature_versions_of_other_teams_are_ignored(self):
+        self.dialog.branch_index = BranchIndex(["Features/team3/1.10/BUG-1", "Features/team3/1.9/Push/BUG-2", "Features/team30/2.0/BUG-3"])
+
+        self.assertEqual(self.dialog.extract_feature_versions("team3"), ["1.9", "1.10"])
+
+    def test_loaded_branches_are_classified_once(self):
+        self.dialog.is_filter_disabled = True
+        self.dialog.load_branches()
+        all_branches_index = self.dialog.branch_index
+        self.dialog.is_filter_disabled = False
+        self.dialog.load_branches()
+
+        self.assertIs(self.dialog.branch_index, all_branches_index)
+        self.assertEqual(self.dialog.branch_index.branches("Features", "team3"), ["Features/team3/1.0/Push/BUG-1"])
+
+    def test_branches_of_submodules_are_prefetched(self):
+        self.dialog.repo_name = "top"
+        self.dialog.repo_branch_left_lb_info_list = [RepoBranchListBoxInfo("sub2", "main"), RepoBranchListBoxInfo("sub1", "main"),
+                                                     RepoBranchListBoxInfo("sub1", "Release/1.0")]
+        task = Mock()
+        with patch("BranchBrowser.get_task_runtime") as mock_runtime:
+            self.dialog.prefetch_submodules_branches()
+            name, function, repo_names = mock_runtime.return_value.submit.call_args[0]
+            function(task, repo_names)
+
+        self.assertEqual(repo_names, ["sub1", "sub2"])
+        self.assertEqual(self.dialog.github_client.get_organization_repo_branches.call_args_list,
+                         [call(self.ORG, "sub1", cached=True), call(self.ORG, "sub2", cached=True)])
+        self.assertEqual(task.step.call_count, 2)
+
+    @patch("BranchBrowser.simpledialog.Dialog.cancel")
+    @patch("BranchBrowser.print_message")
+    @patch("BranchBrowser.GitHubRepoSubmoduleManager")
+    def test_update_reports_number_of_updated_submodules(self, mock_manager, mock_print_message, mock_cancel):
+        self.dialog.repo_name, self.dialog.branch_name = "top", "main"
+        self.dialog.repo_branch_left_lb_info_list = [RepoBranchListBoxInfo("sub1", "main"), RepoBranchListBoxInfo("sub2", "main")]
+        mock_manager.return_value.update_submodules.return_value = ["sub1", "sub2"]
+
+        with patch("BranchBrowser.token", "token", create=True):
+            self.dialog.update_action()
+
+        self.assertIn("Updated <b>2</b> submodules (sub1, sub2)", mock_print_message.call_args[0][1])
+
+
+class TestSubmoduleSelectorRightListbox(unittest.TestCase):
+
+    def setUp(self):
+        self.dialog = SubmoduleSelectorDialog.__new__(SubmoduleSelectorDialog)
+        self.dialog.repo_branch_right_lb_info_map = {}
+        self.dialog.left_items = {"R:sub1 B:branch-3"}
+        self.dialog.right_page_pending = False
+        self.dialog.repo_branches_right_listbox = FakeListbox()
+        self.dialog.after_idle = lambda function: function()
+        self.dialog.right_repo_name = "sub1"
+        self.dialog.right_branches = [f"branch-{i}" for i in range(450)]
+
+    def test_branches_are_rendered_page_by_page(self):
+        self.dialog.show_next_branches_page()
+
+        self.assertEqual(self.dialog.repo_branches_right_listbox.size(), 200)
+        self.assertEqual(self.dialog.repo_branches_right_listbox.colors, {3: 'red'})
+
+        self.dialog.on_right_listbox_scroll("0.5", "0.8")
+        self.assertEqual(self.dialog.repo_branches_right_listbox.size(), 200)
+        self.dialog.on_right_listbox_scroll("0.8", "1.0")
+        self.dialog.on_right_listbox_scroll("0.9", "1.0")
+        self.dialog.on_right_listbox_scroll("0.95", "1.0")
+
+        self.assertEqual(self.dialog.repo_branches_right_listbox.items, [f"R:sub1 B:branch-{i}" for i in range(450)])
+        self.assertEqual(self.dialog.repo_branch_right_lb_info_map["R:sub1 B:branch-449"].position, 449)
+
+
+if __name__ == '__main__':
+    unittest.main()
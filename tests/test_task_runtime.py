@@ -0,0 +1,142 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, Mock
+from github_transport import GitHubTransport
+from task_runtime import (TASK_CANCELLED, TASK_DONE, TASK_FAILED, TaskRuntime, TaskCancelled,
+                          bind_current_task, current_task)
+
+
+class TestTaskRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.runtime = TaskRuntime(max_workers=2)
+
+    def tearDown(self):
+        self.runtime.shutdown()
+
+    def test_task_reports_steps_and_finishes(self):
+        def work(task, count):
+            task.set_total(count)
+            for _ in range(count):
+                task.step()
+
+        task = self.runtime.submit("work", work, 3)
+        task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_DONE)
+        self.assertEqual((task.done_steps, task.total_steps), (3, 3))
+        self.assertIsNone(task.eta())
+
+    @patch("task_runtime.print_message")
+    def test_cancelled_task_stops_at_next_step(self, mock_print_message):
+        started = threading.Event()
+        release = threading.Event()
+        steps = []
+
+        def work(task):
+            started.set()
+            release.wait(5)
+            task.step() # Cancelled meanwhile, raises
+            steps.append('after cancel')
+
+        task = self.runtime.submit("work", work)
+        started.wait(5)
+        self.runtime.cancel(task.task_id)
+        release.set()
+        task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_CANCELLED)
+        self.assertEqual(steps, [])
+
+    @patch("task_runtime.print_message")
+    def test_failed_task_is_reported(self, mock_print_message):
+        def work(task):
+            raise ValueError("boom")
+
+        task = self.runtime.submit("work", work)
+        task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_FAILED)
+        self.assertIn("boom", mock_print_message.call_args[0][1])
+
+    def test_workers_are_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        release = threading.Event()
+
+        def work(task):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(0.05)
+            with lock:
+                running[0] -= 1
+
+        tasks = [self.runtime.submit(f"work {i}", work) for i in range(6)]
+        for task in tasks:
+            task.future.result(timeout=5)
+
+        self.assertEqual(peak[0], 2)
+
+    def test_finished_tasks_are_pruned(self):
+        runtime = TaskRuntime(max_workers=1, max_finished=2)
+        tasks = [runtime.submit(f"work {i}", lambda task: None) for i in range(4)]
+        for task in tasks:
+            task.future.result(timeout=5)
+        runtime.shutdown()
+
+        self.assertEqual([task.name for task in runtime.list_tasks()], ["work 2", "work 3"])
+
+    def test_listeners_are_notified(self):
+        listener = Mock()
+        self.runtime.add_listener(listener)
+
+        task = self.runtime.submit("work", lambda task: task.step())
+        task.future.result(timeout=5)
+
+        self.assertGreaterEqual(listener.call_count, 3) # submitted, started, step, finished
+
+    def test_transport_calls_are_counted_and_check_cancellation(self):
+        transport = GitHubTransport()
+        url = "https://api.github.com/repos/org/repo"
+
+        def work(task):
+            transport.request("GET", url)
+            transport.request("GET", url)
+            task.token.cancel()
+            transport.request("GET", url)
+
+        with patch.object(transport.session, "request", return_value=Mock(status_code=200, headers={})) as mock_request, \
+             patch("task_runtime.print_message"):
+            task = self.runtime.submit("work", work)
+            task.future.result(timeout=5)
+
+        self.assertEqual(task.state, TASK_CANCELLED)
+        self.assertEqual(task.calls, 3)
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_bind_current_task_carries_task_to_other_threads(self):
+        def work(task):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                return list(executor.map(bind_current_task(lambda _: current_task()), range(2)))
+
+        results = []
+        task = self.runtime.submit("work", lambda task: results.extend(work(task)))
+        task.future.result(timeout=5)
+
+        self.assertEqual(results, [task, task])
+        self.assertIsNone(current_task())
+
+    def test_cancellation_token_raises(self):
+        task = self.runtime.submit("work", lambda task: None)
+        task.future.result(timeout=5)
+        task.token.cancel()
+
+        with self.assertRaises(TaskCancelled):
+            task.raise_if_cancelled()
+
+
+if __name__ == '__main__':
+    unittest.main()
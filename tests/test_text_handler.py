@@ -0,0 +1,81 @@
+import threading
+import unittest
+from unittest.mock import patch, Mock
+from BranchBrowser import TextHandler, parse_tagged_text
+
+
+class FakeText:
+    # Minimal stand-in for tk.Text keeping inserted lines
+    def __init__(self):
+        self.lines = ['']
+        self.insert_calls = 0
+        self.after = Mock()
+
+    def insert(self, index, *args):
+        self.insert_calls += 1
+        text = ''.join(args[::2])
+        *complete, last = (self.lines.pop() + text).split('\n')
+        self.lines.extend(complete)
+        self.lines.append(last)
+
+    def index(self, index):
+        return f"{len(self.lines)}.0"
+
+    def delete(self, start, end):
+        del self.lines[:int(end.split('.')[0]) - 1]
+
+    def cget(self, option):
+        return "TkDefaultFont"
+
+    def config(self, *args, **kwargs):
+        pass
+
+    tag_configure = see = config
+
+
+class TestTextHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = FakeText()
+        with patch("BranchBrowser.font.Font"):
+            self.handler = TextHandler(self.widget, max_lines=3)
+
+    def test_writes_are_inserted_in_one_batch_on_drain(self):
+        print("[INFO] first", file=self.handler)
+        print("[ERROR] second", file=self.handler)
+        self.assertEqual(self.widget.insert_calls, 0)
+
+        self.handler.drain()
+
+        self.assertEqual(self.widget.insert_calls, 1)
+        self.assertTrue(self.widget.lines[0].endswith(" [INFO] first"))
+        self.assertTrue(self.widget.lines[1].endswith(" [ERROR] second"))
+
+    def test_lines_from_threads_are_not_interleaved(self):
+        self.handler.write("[INFO] main thread")
+        thread = threading.Thread(target=print, args=("[INFO] worker thread",), kwargs={"file": self.handler})
+        thread.start()
+        thread.join()
+        self.handler.write("\n")
+
+        self.handler.drain()
+
+        self.assertTrue(self.widget.lines[0].endswith(" [INFO] worker thread"))
+        self.assertTrue(self.widget.lines[1].endswith(" [INFO] main thread"))
+
+    def test_log_is_bounded_to_max_lines(self):
+        for i in range(5):
+            print(f"[INFO] message {i}", file=self.handler)
+
+        self.handler.drain()
+
+        self.assertEqual(len(self.widget.lines) - 1, 3)
+        self.assertTrue(self.widget.lines[0].endswith("message 2"))
+
+    def test_bold_and_color_tags(self):
+        self.assertEqual(parse_tagged_text("a <b>b</b> c", "info"),
+                         ["a ", ("info",), "b", ("bold", "info"), " c", ("info",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch, Mock
+from BranchBrowser import TreeviewTooltip
+
+ORG = "TestOrg"
+REPO = "TestRepo"
+BRANCH = "Release/1.0"
+
+
+class TestTreeviewTooltip(unittest.TestCase):
+
+    def setUp(self):
+        self.github_client = Mock()
+        self.github_client.get_organization_repo_branch_head_sha.return_value = "sha1"
+        self.tooltip_func = Mock(return_value="R:TestRepo B:Release/1.0\n")
+        self.treeview = Mock()
+        self.tooltip = TreeviewTooltip(self.github_client, Mock(), Mock(), self.treeview, self.tooltip_func)
+
+    @patch("BranchBrowser.post_to_ui")
+    def test_resolved_text_is_posted_to_ui_thread(self, mock_post_to_ui):
+        self.tooltip.resolve_tooltip(self.tooltip.tooltip_request, ORG, REPO, BRANCH)
+
+        self.tooltip_func.assert_called_once_with(self.github_client, ORG, REPO, BRANCH)
+        mock_post_to_ui.assert_called_once_with(self.tooltip.on_tooltip_resolved, 0, "R:TestRepo B:Release/1.0\n", key='tooltip')
+
+    def test_same_head_commit_is_served_from_cache(self):
+        self.tooltip.resolve_tooltip(self.tooltip.tooltip_request, ORG, REPO, BRANCH)
+        self.tooltip.resolve_tooltip(self.tooltip.tooltip_request, ORG, REPO, BRANCH)
+
+        self.tooltip_func.assert_called_once()
+
+    def test_new_head_commit_is_resolved_again(self):
+        self.tooltip.resolve_tooltip(self.tooltip.tooltip_request, ORG, REPO, BRANCH)
+        self.github_client.get_organization_repo_branch_head_sha.return_value = "sha2"
+        self.tooltip.resolve_tooltip(self.tooltip.tooltip_request, ORG, REPO, BRANCH)
+
+        self.assertEqual(self.tooltip_func.call_count, 2)
+
+    def test_superseded_request_is_not_resolved(self):
+        request = self.tooltip.tooltip_request
+        self.tooltip.hide_tooltip()
+
+        self.tooltip.resolve_tooltip(request, ORG, REPO, BRANCH)
+
+        self.tooltip_func.assert_not_called()
+
+    def test_superseded_queued_request_makes_no_call(self):
+        request = self.tooltip.tooltip_request
+        self.tooltip.hide_tooltip()
+
+        self.tooltip.resolve_tooltip(request, ORG, REPO, BRANCH)
+
+        self.github_client.get_organization_repo_branch_head_sha.assert_not_called()
+
+    def test_tooltips_are_resolved_on_a_bounded_pool(self):
+        self.assertEqual(self.tooltip.executor._max_workers, 2)
+
+    def test_result_of_superseded_request_is_ignored(self):
+        tip_label = Mock()
+        self.tooltip.tip_window = Mock()
+        self.tooltip.tip_label = tip_label
+
+        self.tooltip.on_tooltip_resolved(self.tooltip.tooltip_request - 1, "old text")
+
+        tip_label.config.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import threading
+import unittest
+from unittest.mock import patch, Mock
+import ui_dispatcher
+from ui_dispatcher import UiDispatcher, post_to_ui
+
+
+class TestUiDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Mock()
+        self.dispatcher = UiDispatcher(self.root, interval_ms=10)
+
+    def test_posted_updates_run_in_order_on_process(self):
+        calls = []
+        self.dispatcher.post(calls.append, 1)
+        self.dispatcher.post(calls.append, 2)
+        self.assertEqual(calls, [])
+
+        self.dispatcher.process()
+
+        self.assertEqual(calls, [1, 2])
+        self.root.after.assert_called_once_with(10, self.dispatcher.process)
+
+    def test_updates_with_same_key_are_coalesced(self):
+        rebuild = Mock()
+        for i in range(5):
+            self.dispatcher.post(rebuild, i, key='refresh_tree')
+
+        self.dispatcher.process()
+
+        rebuild.assert_called_once_with(4)
+        self.assertEqual(self.dispatcher.coalesced, 4)
+
+    def test_posting_from_worker_threads(self):
+        calls = []
+        threads = [threading.Thread(target=self.dispatcher.post, args=(calls.append, i)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.dispatcher.process()
+
+        self.assertEqual(sorted(calls), list(range(10)))
+
+    @patch("ui_dispatcher.print_message")
+    def test_failing_update_does_not_stop_others(self, mock_print_message):
+        after_failure = Mock()
+        self.dispatcher.post(Mock(side_effect=Exception("TclError")))
+        self.dispatcher.post(after_failure)
+
+        self.dispatcher.process()
+
+        after_failure.assert_called_once()
+        mock_print_message.assert_called_once()
+
+    def test_post_to_ui_runs_right_away_without_dispatcher(self):
+        update = Mock()
+        with patch.object(ui_dispatcher, "_dispatcher", None):
+            post_to_ui(update, 1, key='x')
+
+        update.assert_called_once_with(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
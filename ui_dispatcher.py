@@ -0,0 +1,83 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+from message_type import MessageType, print_message
+
+
+DEFAULT_DISPATCH_INTERVAL_MS = 20
+
+
+class UiDispatcher:
+    """
+    Runs UI updates posted from worker threads on the Tk main loop.
+
+    Tk is not thread-safe, so workers only post callables here and the UI thread applies them
+    on an after() timer. Updates posted with the same key are coalesced: one still waiting is
+    replaced by the newer one, e.g. several refresh requests in a row rebuild the tree once.
+
+    Attributes:
+        root (tk.Tk): Root window whose main loop applies the updates.
+        interval_ms (int): How often posted updates are applied.
+    """
+
+    def __init__(self, root, interval_ms=DEFAULT_DISPATCH_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.pending = OrderedDict() # key -> (function, args), in posting order
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.coalesced = 0
+
+    def start(self):
+        self.root.after(self.interval_ms, self.process)
+
+    def post(self, function, *args, key=None):
+        """
+        Queue function(*args) to run on the UI thread, callable from any thread.
+
+        Args:
+            function (callable): UI update.
+            key (hashable): Updates with the same key replace each other while waiting, None never coalesces.
+        """
+        with self.lock:
+            if key is None:
+                key = ('unique', next(self.ids))
+            elif key in self.pending:
+                del self.pending[key]
+                self.coalesced += 1
+            self.pending[key] = (function, args)
+
+    def process(self):
+        with self.lock:
+            updates = list(self.pending.values())
+            self.pending.clear()
+        for function, args in updates:
+            try:
+                function(*args)
+            except Exception as e:
+                print_message(MessageType.ERROR, f"UI update failed: {e}")
+        self.root.after(self.interval_ms, self.process)
+
+
+_dispatcher = None
+
+
+def start_dispatcher(root, interval_ms=DEFAULT_DISPATCH_INTERVAL_MS):
+    """Create the shared dispatcher for the root window and start applying updates."""
+    global _dispatcher
+    _dispatcher = UiDispatcher(root, interval_ms)
+    _dispatcher.start()
+    return _dispatcher
+
+
+def post_to_ui(function, *args, key=None):
+    """
+    Post a UI update to the shared dispatcher.
+
+    Without a started dispatcher (no main loop yet, tests) the update runs right away.
+    """
+    if _dispatcher is None:
+        function(*args)
+    else:
+        _dispatcher.post(function, *args, key=key)